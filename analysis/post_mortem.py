@@ -0,0 +1,247 @@
+"""
+SPREAD POST-MORTEM - INTRADAY RANGE
+===================================
+Standalone script - does NOT affect dashboard or data fetcher.
+Replaces the per-expiry feb/mar/jun_spread_analysis.py scripts.
+
+Every trade in POST_MORTEM_DEFS (vix_spread_registry.py) whose spread has
+expired is reviewed in one run:
+  - ONE HistoricalDataRequest (PX_LAST / PX_HIGH / PX_LOW ...) for all legs
+    and futures of all those spreads, entry date to last expiry
+  - Spread_Close / Widest / Narrowest and the P&L columns per spread
+  - if `vix_data_fetcher.py --bars` has stored 1-minute bars for both legs,
+    the best / worst spread that actually traded each day (Bar_* columns)
+  - data/{key}_spread_intraday.csv for each, read by the dashboard expanders
+
+Adding an expiry is one line in POST_MORTEM_DEFS - no new script.
+
+Usage (from the repo root):
+  python analysis/post_mortem.py                # every expired post-mortem
+  python analysis/post_mortem.py "Mar 2026"     # only these spreads (expired or not)
+"""
+
+import argparse
+import datetime
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from vix_gateway import connect_gateway
+from vix_spread_registry import POST_MORTEM_CONFIG
+from vix_bar_store import intraday_exits
+
+# --- CONFIG ---
+FIELDS = ["PX_LAST", "PX_HIGH", "PX_LOW", "PX_BID", "PX_ASK", "PX_MID"]
+BAR_INTERVAL = 1  # Minutes - bars used for the Bar_* (actually traded) exits
+
+
+# --- FETCH (one request for every spread) ---
+def fetch_raw(configs, session=None):
+    """Daily FIELDS for every leg + futures of `configs` in a single request (missing = 0)."""
+    tickers = list(dict.fromkeys(tk for pm in configs for tk in (pm["long"], pm["short"], pm["futures"])))
+    start = min(pm["entry_date"] for pm in configs).replace("-", "")
+    end = max(pm["expiry_date"] for pm in configs).replace("-", "")
+    print(f"Fetching {len(tickers)} tickers for {len(configs)} spreads: {tickers}")
+    print(f"Period: {start} to {end}")
+    print(f"Fields: {FIELDS}\n")
+
+    # Reuse the gateway's warmed session if it's running (python vix_gateway.py)
+    gateway = connect_gateway() if session is None else None
+    if gateway is not None:
+        try:
+            raw_df = gateway.get_raw_history(tickers, FIELDS, start, end)
+        finally:
+            gateway.close()
+    else:
+        from vix_data_fetcher import BloombergEngine
+        engine = BloombergEngine(session=session)
+        try:
+            raw_df = engine.get_raw_history(tickers, FIELDS, start, end)
+        finally:
+            engine.close()
+    return raw_df.fillna(0.0)
+
+
+# --- POST-MORTEM FRAME ---
+def leg_labels(pm):
+    """{column label: ticker} - 'C20', 'C25', 'Futures' as in the CSV column names."""
+    return {
+        f"C{pm['long_strike']:g}": pm["long"],
+        f"C{pm['short_strike']:g}": pm["short"],
+        "Futures": pm["futures"],
+    }
+
+
+def build_post_mortem(raw_df, pm):
+    """One row per date from entry to expiry where any of the spread's instruments has data."""
+    labels = leg_labels(pm)
+    window = raw_df[(raw_df["Date"] >= pm["entry_date"]) & (raw_df["Date"] <= pm["expiry_date"])
+                    & raw_df["Ticker"].isin(labels.values())]
+    wide = window.drop_duplicates(["Date", "Ticker"]).set_index(["Date", "Ticker"])[FIELDS].unstack("Ticker")
+    wide = wide.sort_index()
+
+    result = pd.DataFrame({"Date": wide.index})
+    for label, ticker in labels.items():
+        for f in FIELDS:
+            result[f"{label}_{f}"] = wide[(f, ticker)].to_numpy() if (f, ticker) in wide.columns else float("nan")
+
+    # --- CALCULATE SPREAD SCENARIOS (a leg with no print that day counts as 0 = no value) ---
+    long_label, short_label = list(labels)[:2]
+    def px(label, f):
+        return result[f"{label}_{f}"].fillna(0.0)
+
+    long_last, short_last = px(long_label, "PX_LAST"), px(short_label, "PX_LAST")
+    long_high, long_low = px(long_label, "PX_HIGH"), px(long_label, "PX_LOW")
+    short_high, short_low = px(short_label, "PX_HIGH"), px(short_label, "PX_LOW")
+
+    # Close-to-close spread
+    result["Spread_Close"] = (long_last - short_last).where((long_last != 0) & (short_last != 0))
+    # WIDEST possible spread = Long High - Short Low
+    result["Spread_Widest"] = (long_high - short_low).where((long_high != 0) & (short_low != 0))
+    # NARROWEST possible spread = Long Low - Short High
+    result["Spread_Narrowest"] = (long_low - short_high).where((long_low != 0) & (short_high != 0))
+
+    # Futures data
+    result["Futures_Last"] = px("Futures", "PX_LAST")
+    result["Futures_High"] = px("Futures", "PX_HIGH")
+    result["Futures_Low"] = px("Futures", "PX_LOW")
+
+    # --- P&L ANALYSIS ---
+    entry_price = pm["entry_price"]
+    for name, col in [("PnL_Close", "Spread_Close"), ("PnL_Best_Exit", "Spread_Widest"),
+                      ("PnL_Worst_Intraday", "Spread_Narrowest")]:
+        result[name] = result[col] - entry_price
+        result[f"{name}_Pct"] = (result[name] / entry_price * 100).round(1)
+
+    return add_bar_exits(result, pm)
+
+
+def add_bar_exits(result, pm):
+    """
+    Bar_Best / Bar_Worst (+ times, P&L): the widest / narrowest spread at which both legs
+    actually printed in the same minute. Left out when no bars are stored for the legs.
+    """
+    end = (datetime.date.fromisoformat(pm["expiry_date"]) + datetime.timedelta(days=1)).isoformat()
+    exits = intraday_exits(pm["long"], pm["short"], BAR_INTERVAL, start=pm["entry_date"], end=end)
+    if exits.empty:
+        return result
+    exits = exits.drop(columns="Close").rename(columns={
+        "Best": "Bar_Best", "Best_Time": "Bar_Best_Time", "Worst": "Bar_Worst", "Worst_Time": "Bar_Worst_Time"})
+    result = result.merge(exits, on="Date", how="left")
+    result["PnL_Bar_Best"] = result["Bar_Best"] - pm["entry_price"]
+    result["PnL_Bar_Best_Pct"] = (result["PnL_Bar_Best"] / pm["entry_price"] * 100).round(1)
+    return result
+
+
+def print_summary(result, pm):
+    """Print formatted summary table."""
+    entry_price = pm["entry_price"]
+    print("=" * 100)
+    print(f"{pm['name'].upper()} C{pm['long_strike']:g}/C{pm['short_strike']:g} SPREAD ANALYSIS  |  "
+          f"Entry: ${entry_price:.2f} on {pm['entry_date']}")
+    print("=" * 100)
+
+    # Find extremes
+    valid = result.dropna(subset=["Spread_Widest"])
+    if valid.empty:
+        print("No valid data!")
+        return
+
+    best_row = valid.loc[valid["Spread_Widest"].idxmax()]
+    worst_row = valid.loc[valid["Spread_Narrowest"].idxmin()]
+
+    print(f"\nBest possible exit (intraday widest spread):")
+    print(f"  Date:       {best_row['Date']}")
+    print(f"  Spread:     ${best_row['Spread_Widest']:.2f}")
+    print(f"  P&L:        +${best_row['PnL_Best_Exit']:.2f}  (+{best_row['PnL_Best_Exit_Pct']:.1f}%)")
+    print(f"  Futures:    High {best_row['Futures_High']:.2f} / Low {best_row['Futures_Low']:.2f}")
+
+    if valid["Spread_Close"].notna().any():
+        peak_close_row = valid.loc[valid["Spread_Close"].idxmax()]
+        print(f"\nBest close-to-close exit:")
+        print(f"  Date:       {peak_close_row['Date']}")
+        print(f"  Spread:     ${peak_close_row['Spread_Close']:.2f}")
+        print(f"  P&L:        +${peak_close_row['PnL_Close']:.2f}  (+{peak_close_row['PnL_Close_Pct']:.1f}%)")
+
+    if "Bar_Best" in result.columns and result["Bar_Best"].notna().any():
+        bar_row = result.loc[result["Bar_Best"].idxmax()]
+        print(f"\nBest traded exit ({BAR_INTERVAL}m bars, both legs printed):")
+        print(f"  Date:       {bar_row['Date']} {bar_row['Bar_Best_Time']} ET")
+        print(f"  Spread:     ${bar_row['Bar_Best']:.2f}")
+        print(f"  P&L:        ${bar_row['PnL_Bar_Best']:+.2f}  ({bar_row['PnL_Bar_Best_Pct']:+.1f}%)")
+
+    print(f"\nWorst intraday moment:")
+    print(f"  Date:       {worst_row['Date']}")
+    print(f"  Spread:     ${worst_row['Spread_Narrowest']:.2f}")
+    print(f"  P&L:        ${worst_row['PnL_Worst_Intraday']:.2f}  ({worst_row['PnL_Worst_Intraday_Pct']:.1f}%)")
+
+    # Spike days
+    spike_threshold = pm["spike_threshold"]
+    spike_days = valid[valid["Spread_Widest"] > spike_threshold]
+    if not spike_days.empty:
+        print(f"\nDays with widest spread > ${spike_threshold:.2f}: {len(spike_days)}")
+        for _, s in spike_days.sort_values("Spread_Widest", ascending=False).iterrows():
+            print(f"  {s['Date']}  Widest: ${s['Spread_Widest']:.2f}  Close: ${s['Spread_Close']:.2f}  Futures: {s['Futures_Low']:.2f}-{s['Futures_High']:.2f}")
+
+    print(f"\n{'Date':<12} {'Futures':>8} {'F.High':>8} {'F.Low':>8} | {'Close':>7} {'Widest':>8} {'Narrow':>8} | {'PnL Cls':>8} {'PnL Best':>9} {'PnL Wrst':>9}")
+    print("-" * 100)
+    table = result.fillna(0.0)
+    for r in table.itertuples(index=False):
+        print(f"{r.Date:<12} {r.Futures_Last:>8.2f} {r.Futures_High:>8.2f} {r.Futures_Low:>8.2f} | "
+              f"{r.Spread_Close:>7.2f} {r.Spread_Widest:>8.2f} {r.Spread_Narrowest:>8.2f} | "
+              f"{r.PnL_Close:>+8.2f} {r.PnL_Best_Exit:>+9.2f} {r.PnL_Worst_Intraday:>+9.2f}")
+
+    print("=" * 100)
+    print("Widest  = Long High - Short Low  (best realistic exit)")
+    print("Narrow  = Long Low  - Short High (worst intraday moment)")
+    print("Note: Actual fill depends on liquidity and bid-ask spreads")
+
+
+# --- MAIN ---
+def main(names=None, session=None, quiet=False):
+    today = datetime.date.today().isoformat()
+    if names:
+        unknown = set(names) - {pm["name"] for pm in POST_MORTEM_CONFIG}
+        if unknown:
+            print(f"❌ Not in POST_MORTEM_DEFS: {sorted(unknown)}")
+            return False
+        configs = [pm for pm in POST_MORTEM_CONFIG if pm["name"] in names]
+    else:
+        configs = [pm for pm in POST_MORTEM_CONFIG if pm["expiry_date"] < today]
+    if not configs:
+        print("No expired spreads to review.")
+        return True
+
+    raw_df = fetch_raw(configs, session)
+    if raw_df.empty:
+        print("No data received!")
+        return False
+
+    written = []
+    for pm in configs:
+        result = build_post_mortem(raw_df, pm)
+        if result.empty:
+            print(f"⚠️ No data for {pm['name']} - skipped")
+            continue
+        Path(pm["csv"]).parent.mkdir(parents=True, exist_ok=True)
+        result.to_csv(pm["csv"], index=False)
+        written.append(pm["csv"])
+        print(f"\nSaved {pm['name']} to {pm['csv']} ({len(result)} days)\n")
+        if not quiet:
+            print_summary(result, pm)
+
+    print(f"\n\nDone! Files created:")
+    for path in written:
+        print(f"  {path}")
+    print(f"Refresh Streamlit to see the post-mortems.")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Post-mortem CSVs for expired spreads (one Bloomberg request)")
+    parser.add_argument("names", nargs="*", help="Spread names from POST_MORTEM_DEFS (default: every expired one)")
+    parser.add_argument("--quiet", action="store_true", help="Write the CSVs without printing the summaries")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.names, quiet=args.quiet) else 1)
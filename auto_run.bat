@@ -1,15 +1,19 @@
 @echo off
+:: Starts the resident fetch scheduler - register this once with Task Scheduler
+:: "At log on" (no repeat). vix_scheduler.py decides when to fetch.
+
 :: 1. Go to the correct project folder
 cd /d "C:\Users\Admin\Desktop\joe\VIX dashboard"
 
 :: 2. Force UTF-8 so emojis don't crash the script
 set PYTHONIOENCODING=utf-8
 
-:: 3. Run the script and capture ALL output to log
-echo ========================================== >> logs\fetch_log.txt
-echo Run started at %date% %time% >> logs\fetch_log.txt
-python vix_data_fetcher.py >> logs\fetch_log.txt 2>&1
+:: 3. Run the scheduler and capture ALL output to log
+if not exist logs mkdir logs
+echo ========================================== >> logs\scheduler_log.txt
+echo Scheduler started at %date% %time% >> logs\scheduler_log.txt
+python -u vix_scheduler.py >> logs\scheduler_log.txt 2>&1
 
-:: 4. Log completion
-echo Run finished at %date% %time% >> logs\fetch_log.txt
-echo ========================================== >> logs\fetch_log.txt
\ No newline at end of file
+:: 4. Log exit (only reached if the scheduler stops)
+echo Scheduler exited at %date% %time% >> logs\scheduler_log.txt
+echo ========================================== >> logs\scheduler_log.txt
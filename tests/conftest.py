@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The modules live at the repo root, not in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Streamlit / xbbg scripts kept for manual dashboard debugging - not pytest suites
+collect_ignore = ["dash_test.py", "vix_dashboard_test.py"]
@@ -158,7 +158,7 @@ TRANSLATIONS = {
         "pm_close_label": "Close Spread",
         "pm_widest_label": "Intraday Widest (C20H - C25L)",
         "pm_entry_line": "Entry $0.63",
-        "pm_no_data": "Run feb_spread_analysis.py on Bloomberg to generate intraday data.",
+        "pm_no_data": "Run analysis/post_mortem.py on Bloomberg to generate intraday data.",
         "pm_lesson_1_title": "Set Limit Orders",
         "pm_lesson_1": "A GTC sell at $1.50 would have filled on 5 different days.",
         "pm_lesson_2_title": "Don't Trust the Close",
@@ -272,7 +272,7 @@ TRANSLATIONS = {
         "pm_close_label": "收盘价差",
         "pm_widest_label": "盘中最宽 (C20高 - C25低)",
         "pm_entry_line": "入场 $0.63",
-        "pm_no_data": "请在Bloomberg终端运行 feb_spread_analysis.py 以生成盘中数据。",
+        "pm_no_data": "请在Bloomberg终端运行 analysis/post_mortem.py 以生成盘中数据。",
         "pm_lesson_1_title": "设置限价单",
         "pm_lesson_1": "在$1.50的GTC卖单会在5个不同交易日成交。",
         "pm_lesson_2_title": "不要只看收盘价",
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from vix_bar_store import BAR_DTYPE, append_bars, daily_extremes, read_bars, spread_bars
+
+
+def bars(times, closes):
+    out = np.zeros(len(times), dtype=BAR_DTYPE)
+    out["time"] = times
+    out["close"] = closes
+    return out
+
+
+def epoch(ts):
+    return int(pd.Timestamp(ts, tz="America/New_York").timestamp())
+
+
+def test_spread_bars_pairs_exact_times_by_default():
+    long_bars = bars([60, 120, 180], [2.0, 2.5, 3.0])
+    short_bars = bars([60, 180], [0.5, 1.0])
+    times, spread = spread_bars(long_bars, short_bars)
+    assert times.tolist() == [60, 180]
+    assert spread.tolist() == [1.5, 2.0]
+
+
+def test_spread_bars_max_age_allows_an_older_short_bar():
+    long_bars = bars([60, 120, 300], [2.0, 2.5, 3.0])
+    short_bars = bars([60], [0.5])
+    times, spread = spread_bars(long_bars, short_bars, max_age=60)
+    assert times.tolist() == [60, 120]  # 300 is 240s after the last short bar
+    assert spread.tolist() == [1.5, 2.0]
+
+
+def test_spread_bars_short_leg_never_from_the_future():
+    times, spread = spread_bars(bars([60], [2.0]), bars([120], [0.5]), max_age=600)
+    assert len(times) == 0 and len(spread) == 0
+
+
+def test_spread_bars_empty_leg():
+    times, spread = spread_bars(bars([], []), bars([60], [0.5]))
+    assert len(times) == 0 and len(spread) == 0
+
+
+def test_daily_extremes_per_eastern_day():
+    times = [epoch("2026-03-02 09:31"), epoch("2026-03-02 11:00"), epoch("2026-03-02 15:59"),
+             epoch("2026-03-03 09:31"), epoch("2026-03-03 10:15")]
+    out = daily_extremes(np.array(times), np.array([1.0, 1.8, 1.2, 0.9, 0.7]))
+    assert out.to_dict("records") == [
+        {"Date": "2026-03-02", "Close": 1.2, "Best": 1.8, "Best_Time": "11:00", "Worst": 1.0, "Worst_Time": "09:31"},
+        {"Date": "2026-03-03", "Close": 0.7, "Best": 0.9, "Best_Time": "09:31", "Worst": 0.7, "Worst_Time": "10:15"},
+    ]
+
+
+def test_daily_extremes_empty():
+    out = daily_extremes(np.array([], dtype=np.int64), np.array([]))
+    assert out.empty and list(out.columns) == ["Date", "Close", "Best", "Best_Time", "Worst", "Worst_Time"]
+
+
+def test_append_bars_only_adds_newer_bars(tmp_path):
+    assert append_bars("UXH26 Index", 1, bars([60, 120], [1.0, 2.0]), root=tmp_path) == 2
+    assert append_bars("UXH26 Index", 1, bars([120, 180, 180], [9.0, 3.0, 3.0]), root=tmp_path) == 1
+    stored = read_bars("UXH26 Index", 1, root=tmp_path)
+    assert stored["time"].tolist() == [60, 120, 180]
+    assert stored["close"].tolist() == [1.0, 2.0, 3.0]
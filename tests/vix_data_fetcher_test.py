@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+import vix_data_fetcher as fetcher
+from vix_bbg_replay import ReplaySession
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the fetcher against a scratch data/ and logs/ (all its paths are relative)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_replay(full_refresh=False):
+    published = []
+    assert fetcher.main(full_refresh=full_refresh, session=ReplaySession(synthetic=True), publish=published.append)
+    assert published == [fetcher.PUBLISH_PATHS]
+    return pd.read_parquet(fetcher.STORE_PATH)
+
+
+def test_incremental_run_keeps_the_full_refresh_wide_view(workdir):
+    full = run_replay(full_refresh=True)
+    assert not full.empty
+    incremental = run_replay()
+    pd.testing.assert_frame_equal(full, incremental)
+
+
+def raw_history(rows):
+    """History frame from {field: value} rows; fields not given are NaN (not returned by Bloomberg)."""
+    frame = pd.DataFrame(rows, columns=["Date", "Ticker"] + fetcher.RAW_FIELDS)
+    return frame.astype({f: float for f in fetcher.RAW_FIELDS})
+
+
+def test_resolve_prices_priority():
+    nan = float("nan")
+    history = raw_history([
+        {"Date": "2026-03-02", "Ticker": "A", "PX_LAST": 1.5, "PX_MID": 1.4, "PX_BID": 1.3, "PX_ASK": 1.5, "PX_SETTLE": 1.45},
+        {"Date": "2026-03-02", "Ticker": "B", "PX_LAST": 0.0, "PX_MID": 1.4, "PX_SETTLE": 1.45},
+        {"Date": "2026-03-02", "Ticker": "C", "PX_LAST": nan, "PX_BID": 1.2, "PX_ASK": 1.6, "PX_SETTLE": 1.45},
+        {"Date": "2026-03-02", "Ticker": "D", "PX_BID": 0.0, "PX_ASK": 1.6, "PX_SETTLE": 1.45},
+        {"Date": "2026-03-02", "Ticker": "E", "VOLUME": 0.0},
+    ])
+    out = fetcher.resolve_prices(history)
+    assert out["Price"].tolist() == [1.5, 1.4, pytest.approx(1.4), 1.45, 0.0]
+    assert out["PriceSource"].tolist() == ["PX_LAST", "PX_MID", "CALC_MID", "PX_SETTLE", "NONE"]
+    assert list(out.columns[:6]) == ["Date", "Ticker", "Price", "PriceSource", "Volume", "OI"]
+
+
+def test_resolve_prices_volume_falls_back_to_px_volume():
+    history = raw_history([
+        {"Date": "2026-03-02", "Ticker": "A", "PX_LAST": 1.0, "VOLUME": 120.0, "PX_VOLUME": 90.0, "OPEN_INT": 5000.0},
+        {"Date": "2026-03-02", "Ticker": "B", "PX_LAST": 1.0, "VOLUME": 0.0, "PX_VOLUME": 90.0},
+        {"Date": "2026-03-02", "Ticker": "C", "PX_LAST": 1.0},
+    ])
+    out = fetcher.resolve_prices(history)
+    assert out["Volume"].tolist() == [120.0, 90.0, 0.0]
+    assert out["OI"].tolist() == [5000.0, 0.0, 0.0]
+
+
+def test_resolve_prices_keeps_stored_values_for_rows_without_raw_fields():
+    history = raw_history([
+        {"Date": "2026-03-02", "Ticker": "A", "PX_LAST": 1.5, "VOLUME": 10.0},
+        {"Date": "2026-03-02", "Ticker": "B"},
+        {"Date": "2026-03-02", "Ticker": "C"},
+    ])
+    history["Price"] = [9.0, 2.25, float("nan")]
+    history["Volume"] = [9.0, 40.0, 0.0]
+    history["OI"] = [9.0, 700.0, 0.0]
+    out = fetcher.resolve_prices(history)
+    assert out["Price"].tolist()[:2] == [1.5, 2.25]
+    assert out["PriceSource"].tolist() == ["PX_LAST", "STORED", "NONE"]
+    assert out["Volume"].tolist() == [10.0, 40.0, 0.0]
+    assert out["OI"].tolist() == [0.0, 700.0, 0.0]
+
+
+def test_quality_flags_per_row_bits():
+    history = fetcher.resolve_prices(raw_history([
+        {"Date": "2026-03-02", "Ticker": "A", "PX_LAST": 1.5, "VOLUME": 10.0},
+        {"Date": "2026-03-02", "Ticker": "B", "VOLUME": 10.0},
+        {"Date": "2026-03-02", "Ticker": "C", "PX_MID": 1.4, "VOLUME": 10.0},
+        {"Date": "2026-03-02", "Ticker": "D", "PX_LAST": 1.5},
+        {"Date": "2026-03-02", "Ticker": "E", "PX_LAST": 1.0, "PX_BID": 0.6, "PX_ASK": 1.4, "VOLUME": 10.0},
+    ]))
+    assert fetcher.quality_flags(history).tolist() == [
+        0,
+        fetcher.QF_NO_PRICE,
+        fetcher.QF_NOT_TRADED,
+        fetcher.QF_NO_VOLUME,
+        fetcher.QF_WIDE_QUOTE,
+    ]
+
+
+def test_quality_flags_stale_runs_are_counted_per_ticker_in_date_order():
+    prices = {"A": [1.0, 1.0, 1.0, 1.2], "B": [2.0, 2.0, 0.0, 0.0]}
+    days = ["2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05"]
+    rows = [{"Date": d, "Ticker": t, "PX_LAST": p, "VOLUME": 10.0}
+            for d in reversed(days) for t, ps in prices.items() for p in [ps[days.index(d)]]]
+    history = fetcher.resolve_prices(raw_history(rows))
+    stale = pd.Series(fetcher.quality_flags(history) & fetcher.QF_STALE > 0,
+                      index=pd.MultiIndex.from_frame(history[["Ticker", "Date"]])).sort_index()
+    assert stale["A"].tolist() == [False, False, True, False]
+    assert stale["B"].tolist() == [False, False, False, False]  # A run of missing prices isn't stale
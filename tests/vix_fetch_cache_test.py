@@ -0,0 +1,61 @@
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from vix_fetch_cache import FetchCache, request_key, split_window
+
+TODAY = datetime.date(2026, 3, 4)
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("20260201", "20260228", ("20260228", None)),            # Fully settled
+    ("20260201", "20260304", ("20260303", "20260304")),      # Reaches today
+    ("20260201", "20260320", ("20260303", "20260304")),      # Ends in the future
+    ("20260304", "20260320", (None, "20260304")),            # Starts today
+    ("2026-02-01", "2026-02-28", ("20260228", None)),        # Dashed dates
+])
+def test_split_window(start, end, expected):
+    assert split_window(start, end, today=TODAY) == expected
+
+
+def test_request_key_ignores_field_order_and_date_format():
+    assert request_key("UXH6 Index", ["PX_LAST", "PX_BID"], "2026-02-01", "2026-02-28") == \
+        request_key(" UXH6 Index", ["PX_BID", "PX_LAST"], "20260201", "20260228", "daily")
+
+
+def test_closed_window_round_trip_in_the_callers_field_order(tmp_path):
+    cache = FetchCache(root=tmp_path)
+    dates = np.array(["2026-02-26", "2026-02-27"], dtype="datetime64[D]")
+    values = np.array([[20.1, 20.4], [1000.0, 1200.0]])
+    cache.put("UXH6 Index", ["PX_LAST", "VOLUME"], "20260201", "20260227", dates, values)
+
+    got_dates, got_values = cache.get("UXH6 Index", ["VOLUME", "PX_LAST"], "20260201", "20260227")
+    assert got_dates.tolist() == dates.tolist()
+    assert got_values.tolist() == [[1000.0, 1200.0], [20.1, 20.4]]
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_open_window_is_never_stored(tmp_path):
+    cache = FetchCache(root=tmp_path)
+    end = datetime.date.today().strftime("%Y%m%d")
+    cache.put("UXH6 Index", ["PX_LAST"], "20260201", end, np.array([], dtype="datetime64[D]"), np.empty((1, 0)))
+    assert cache.entries() == []
+    assert cache.get("UXH6 Index", ["PX_LAST"], "20260201", end) is None
+    assert cache.misses == 1
+
+
+def test_evict_drops_least_recently_used(tmp_path):
+    cache = FetchCache(root=tmp_path)
+    dates = np.array(["2026-02-27"], dtype="datetime64[D]")
+    for i, security in enumerate(["UXG6 Index", "UXH6 Index", "UXJ6 Index"]):
+        cache.put(security, ["PX_LAST"], "20260201", "20260227", dates, np.array([[20.0]]))
+        path = cache._path(request_key(security, ["PX_LAST"], "20260201", "20260227"))
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+    cache.get("UXG6 Index", ["PX_LAST"], "20260201", "20260227")  # Oldest becomes most recent
+
+    one = cache.entries()[0].stat().st_size
+    assert cache.evict(target=one) == 2
+    assert cache.get("UXG6 Index", ["PX_LAST"], "20260201", "20260227") is not None
+    assert cache.get("UXH6 Index", ["PX_LAST"], "20260201", "20260227") is None
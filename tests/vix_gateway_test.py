@@ -0,0 +1,39 @@
+import pytest
+
+from vix_gateway import Gateway, validate_job
+
+
+@pytest.mark.parametrize("op, args", [
+    ("history", {"tickers": ["UXH6 Index"], "start_date": "20260101"}),
+    ("fetch_all", {"history_tickers": [], "start_date": "20260101", "snapshot_tickers": [],
+                   "backfill_tickers": [], "backfill_start": None}),
+    ("stats", {}),
+])
+def test_validate_job_accepts_known_ops(op, args):
+    validate_job(op, args)
+
+
+@pytest.mark.parametrize("op, args", [
+    ("drop_tables", {}),
+    (["history"], {}),
+    ("history", ["UXH6 Index"]),
+    ("history", {"tickers": ["UXH6 Index"]}),
+    ("history", {"tickers": ["UXH6 Index"], "start_date": "20260101", "extra": 1}),
+    ("history", {"tickers": "UXH6 Index", "start_date": "20260101"}),
+    ("history", {"tickers": [1], "start_date": "20260101"}),
+    ("greeks_snapshot", {"tickers": None}),
+])
+def test_validate_job_rejects_malformed_jobs(op, args):
+    with pytest.raises(ValueError):
+        validate_job(op, args)
+
+
+def test_submit_fails_only_the_bad_callers_future():
+    gateway = Gateway(lambda: None)
+    bad = gateway.submit("history", {"tickers": "UXH6 Index"})
+    with pytest.raises(ValueError):
+        bad.result(timeout=0)
+
+    good = gateway.submit("history", {"tickers": ["UXH6 Index"], "start_date": "20260101"})
+    assert gateway.submit("history", {"start_date": "20260101", "tickers": ["UXH6 Index"]}) is good
+    assert gateway.stats == {"jobs": 1, "deduplicated": 1, "batches": 0, "reconnects": 0}
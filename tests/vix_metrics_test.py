@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from vix_metrics import RunMetrics, load_metrics, summarize
+
+
+def test_record_and_phase_append_one_json_line_each(tmp_path):
+    path = tmp_path / "logs" / "metrics.jsonl"
+    metrics = RunMetrics(path, run_id="run-1")
+    metrics.record("connect", 0.25, tickers=3)
+    with metrics.phase("parse", tickers=3) as extra:
+        extra["messages"] = 7
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["run"], r["phase"]) for r in records] == [("run-1", "connect"), ("run-1", "parse")]
+    assert records[0]["seconds"] == 0.25
+    assert (records[1]["tickers"], records[1]["messages"]) == (3, 7)
+    assert records[1]["seconds"] >= 0
+
+
+def test_phase_is_recorded_when_the_block_raises(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    with pytest.raises(RuntimeError):
+        with RunMetrics(path, run_id="run-1").phase("send"):
+            raise RuntimeError("session down")
+    assert json.loads(path.read_text(encoding="utf-8"))["phase"] == "send"
+
+
+def test_load_metrics_last_runs_and_truncated_lines(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    for run in ["run-1", "run-2", "run-3"]:
+        RunMetrics(path, run_id=run).record("parse", 1.0)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"run": "run-4", "pha')  # Killed mid-write
+
+    assert load_metrics(path)["run"].tolist() == ["run-1", "run-2", "run-3"]
+    assert load_metrics(path, last_runs=2)["run"].tolist() == ["run-2", "run-3"]
+    assert load_metrics(tmp_path / "missing.jsonl") is None
+
+
+def test_summarize_per_phase(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    for i, seconds in enumerate([1.0, 2.0, 3.0]):
+        metrics = RunMetrics(path, run_id=f"run-{i}")
+        metrics.record("parse", seconds, messages=10 * (i + 1))
+        metrics.record("pivot", 0.5)
+
+    out = summarize(load_metrics(path))
+    assert list(out.index) == ["parse", "pivot"]
+    assert out.loc["parse", "n"] == 3
+    assert out.loc["parse", "p50"] == 2.0
+    assert out.loc["parse", "max"] == 3.0
+    assert out.loc["parse", "messages (p50)"] == 20.0
+    assert "tickers (p50)" not in out.columns
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+import vix_scheduler as scheduler
+from vix_scheduler import MARKET_TZ, cboe_holidays, is_trading_day, next_trigger, needs_catch_up
+
+D = datetime.date
+
+
+def at(day, hour, minute=0):
+    return datetime.datetime.combine(day, datetime.time(hour, minute), tzinfo=MARKET_TZ)
+
+
+def test_cboe_holidays_2025():
+    assert cboe_holidays(2025) == {
+        D(2025, 1, 1), D(2025, 1, 20), D(2025, 2, 17), D(2025, 4, 18), D(2025, 5, 26),
+        D(2025, 6, 19), D(2025, 7, 4), D(2025, 9, 1), D(2025, 11, 27), D(2025, 12, 25),
+    }
+
+
+@pytest.mark.parametrize("year, good_friday", [(2024, D(2024, 3, 29)), (2025, D(2025, 4, 18)), (2026, D(2026, 4, 3))])
+def test_good_friday(year, good_friday):
+    assert good_friday in cboe_holidays(year)
+
+
+def test_juneteenth_only_from_2022():
+    assert D(2021, 6, 18) not in cboe_holidays(2021) and D(2021, 6, 19) not in cboe_holidays(2021)
+    assert D(2022, 6, 20) in cboe_holidays(2022)  # Sunday -> observed Monday
+    assert D(2026, 6, 19) in cboe_holidays(2026)
+
+
+def test_observed_weekend_holidays():
+    assert D(2026, 7, 3) in cboe_holidays(2026)    # July 4 on a Saturday
+    assert D(2022, 12, 26) in cboe_holidays(2022)  # Christmas on a Sunday
+    assert D(2021, 12, 31) not in cboe_holidays(2021) | cboe_holidays(2022)  # Saturday New Year isn't made up
+
+
+def test_next_trigger_skips_good_friday_and_the_weekend():
+    when, reason = next_trigger(at(D(2025, 4, 17), 18, 0))
+    assert when == at(D(2025, 4, 21), 17, 30)
+    assert reason == "daily settlement"
+
+
+def test_next_trigger_on_an_expiry_morning():
+    when, reason = next_trigger(at(D(2026, 2, 18), 8, 0))
+    assert when == at(D(2026, 2, 18), 10, 0)
+    assert reason.startswith("expiry settlement") and "Feb 2026" in reason
+
+
+def test_next_trigger_intraday():
+    assert next_trigger(at(D(2025, 4, 21), 9, 45), intraday_minutes=30) == (at(D(2025, 4, 21), 10, 0), "intraday")
+    # After the session close only the settlement run is left
+    assert next_trigger(at(D(2025, 4, 21), 16, 20), intraday_minutes=30)[0] == at(D(2025, 4, 21), 17, 30)
+
+
+@pytest.mark.parametrize("now, stored, expected", [
+    (at(D(2025, 4, 21), 12, 0), D(2025, 4, 17), False),  # Good Friday + weekend: Thu is the last settled day
+    (at(D(2025, 4, 21), 18, 0), D(2025, 4, 17), True),   # Monday's settlement is out
+    (at(D(2025, 4, 21), 18, 0), D(2025, 4, 21), False),
+    (at(D(2025, 4, 19), 12, 0), D(2025, 4, 16), True),
+    (at(D(2025, 4, 19), 12, 0), None, True),             # No store yet
+])
+def test_needs_catch_up(monkeypatch, now, stored, expected):
+    monkeypatch.setattr(scheduler, "last_stored_date", lambda: stored)
+    assert needs_catch_up(now) is expected
+
+
+def test_is_trading_day():
+    assert is_trading_day(D(2025, 4, 17))
+    assert not is_trading_day(D(2025, 4, 18))  # Good Friday
+    assert not is_trading_day(D(2025, 4, 19))  # Saturday
@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+
+from vix_spread_registry import (build_registry, futures_ticker, option_ticker, parse_option_ticker,
+                                 shared_instruments, unique_instruments)
+
+FEB = datetime.date(2026, 2, 18)
+
+
+def test_option_ticker():
+    assert option_ticker(FEB, 20) == "VIX US 02/18/26 C20 Index"
+    assert option_ticker(FEB, 22.5, "P") == "VIX US 02/18/26 P22.5 Index"
+
+
+@pytest.mark.parametrize("strike, kind", [(20, "C"), (22.5, "C"), (15, "P")])
+def test_parse_option_ticker_round_trips(strike, kind):
+    assert parse_option_ticker(option_ticker(FEB, strike, kind)) == (FEB, kind, float(strike))
+
+
+@pytest.mark.parametrize("ticker", ["UXG26 Index", "VIX Index", "VIX US 02/18/26 X20 Index", "VIX US 2/18/26 C20 Index"])
+def test_parse_option_ticker_rejects_non_options(ticker):
+    assert parse_option_ticker(ticker) is None
+
+
+def test_futures_ticker():
+    assert futures_ticker(FEB) == "UXG26"
+    assert futures_ticker(datetime.date(2026, 12, 16)) == "UXZ26"
+
+
+def test_unique_instruments_lists_shared_tickers_once():
+    spreads = build_registry({
+        "Mar 2026":       ("2026-03-18", 20, 25),
+        "Mar 2026 20-40": ("2026-03-18", 20, 40),
+        "Feb 2026":       ("2026-02-18", 20, 25),
+    })
+    futures, options = unique_instruments(spreads)
+    assert futures == ["UXH26 Index", "UXG26 Index"]
+    assert options == [
+        "VIX US 03/18/26 C20 Index", "VIX US 03/18/26 C25 Index",
+        "VIX US 03/18/26 C40 Index",
+        "VIX US 02/18/26 C20 Index", "VIX US 02/18/26 C25 Index",
+    ]
+    assert shared_instruments(spreads) == {
+        "UXH26 Index": ["Mar 2026", "Mar 2026 20-40"],
+        "VIX US 03/18/26 C20 Index": ["Mar 2026", "Mar 2026 20-40"],
+    }
+
+
+def test_build_spread_column_names():
+    conf = build_registry({"May 2026": ("2026-05-19", 25, 35)})["May 2026"]
+    assert conf["prefix"] == "May_2026"
+    assert conf["futures"] == "UXK26 Index" and conf["futures_col"] == "May_2026_VIX_Futures"
+    assert conf["columns"]["Spread"] == "May_2026_Spread"
+    assert conf["columns"]["Futures_to_C35"] == "May_2026_Futures_to_C35"
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from vix_store import VersionedFrames, merge_long
+
+
+def long_rows(*rows):
+    df = pd.DataFrame(rows, columns=["Date", "Ticker", "Field", "Value"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def as_dict(long_df):
+    return {(d.strftime("%Y-%m-%d"), tk, f): v for d, tk, f, v in long_df.itertuples(index=False)}
+
+
+def test_merge_long_replaces_only_re_received_ticker_dates():
+    existing = long_rows(
+        ("2026-03-02", "A", "Price", 1.0),
+        ("2026-03-03", "A", "Price", 2.0),
+        ("2026-03-04", "A", "Price", 3.0),
+        ("2026-03-03", "B", "Price", 9.0),
+    )
+    # A's history was only partly salvaged: 03-03 came back, 03-04 didn't
+    new = long_rows(("2026-03-03", "A", "Price", 2.5))
+    merged = as_dict(merge_long(existing, new, "20260303"))
+    assert merged == {
+        ("2026-03-02", "A", "Price"): 1.0,
+        ("2026-03-03", "A", "Price"): 2.5,
+        ("2026-03-04", "A", "Price"): 3.0,
+        ("2026-03-03", "B", "Price"): 9.0,
+    }
+
+
+def test_merge_long_drops_fields_missing_from_a_re_received_day():
+    existing = long_rows(
+        ("2026-03-03", "A", "Price", 2.0),
+        ("2026-03-03", "A", "Delta", 0.4),
+    )
+    new = long_rows(("2026-03-03", "A", "Price", 2.1))
+    assert as_dict(merge_long(existing, new, "20260303")) == {("2026-03-03", "A", "Price"): 2.1}
+
+
+def test_merge_long_nan_deletes_a_stored_value():
+    existing = long_rows(
+        ("2026-03-03", "A", "Price", 2.0),
+        ("2026-03-03", "A", "Delta", 0.4),
+    )
+    new = long_rows(
+        ("2026-03-03", "A", "Price", 2.0),
+        ("2026-03-03", "A", "Delta", np.nan),  # e.g. a Greek missing from the snapshot
+    )
+    assert as_dict(merge_long(existing, new, "20260303")) == {("2026-03-03", "A", "Price"): 2.0}
+
+
+def test_merge_long_without_existing_store():
+    new = long_rows(("2026-03-03", "A", "Price", 2.0), ("2026-03-03", "A", "Price", 2.2))
+    assert as_dict(merge_long(None, new, "20260303")) == {("2026-03-03", "A", "Price"): 2.2}
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))  # Explicit mtimes - filesystem clocks can be coarser than the test
+
+
+def csv_frames(max_stale=2):
+    return VersionedFrames(lambda path, key: pd.read_csv(path), max_stale=max_stale)
+
+
+def test_versioned_frames_reload_only_on_new_content(tmp_path):
+    path = tmp_path / "store.csv"
+    write(path, "x\n1\n", 1_000_000)
+    frames = csv_frames()
+
+    v1, df = frames.get(path)
+    assert df["x"].tolist() == [1]
+    assert frames.get(path, held=v1)[0] == v1
+    write(path, "x\n1\n", 1_000_001)  # Rewritten with identical content
+    assert frames.get(path, held=v1)[0] == v1
+    assert frames.loads == 1
+
+    write(path, "x\n2\n", 1_000_002)
+    v2, df = frames.get(path, held=v1)
+    assert v2 != v1 and df["x"].tolist() == [2]
+    assert frames.loads == 2
+
+
+def test_versioned_frames_missing_file(tmp_path):
+    assert csv_frames().get(tmp_path / "missing.csv") == (None, None)
+
+
+def test_versioned_frames_hand_out_shallow_copies(tmp_path):
+    path = tmp_path / "store.csv"
+    write(path, "x\n1\n", 1_000_000)
+    frames = csv_frames()
+    _, df = frames.get(path)
+    df["y"] = 5  # A reader adding a column must not leak into the shared frame
+    _, again = frames.get(path)
+    assert list(again.columns) == ["x"]
+
+
+def test_versioned_frames_evict_released_and_excess_stale_versions(tmp_path):
+    path = tmp_path / "store.csv"
+    frames = csv_frames(max_stale=1)
+    write(path, "x\n0\n", 1_000_000)
+    v0, _ = frames.get(path)
+    write(path, "x\n1\n", 1_000_001)
+    v1, _ = frames.get(path)  # New reader; v0 is still held
+    assert v0 in frames._frames
+
+    frames.release(v0)
+    assert v0 not in frames._frames
+
+    write(path, "x\n2\n", 1_000_002)
+    frames.get(path)
+    write(path, "x\n3\n", 1_000_003)
+    v3, _ = frames.get(path)
+    # v1 and v2 are still held (readers that never came back) - only max_stale=1 of them is kept
+    assert len(frames._frames) == 2 and v3 in frames._frames and v1 not in frames._frames
@@ -0,0 +1,177 @@
+"""
+Append-only intraday bar store.
+
+One binary file per (ticker, bar interval) under data/bars/, holding fixed-size
+BAR_DTYPE records sorted by time. Readers memory-map the file and slice by
+time with a binary search, so months of 1-minute bars are never loaded
+whole - only the pages of the requested window are touched.
+
+Filled by `python vix_data_fetcher.py --bars` (IntradayBarRequest).
+
+  bars = read_bars("VIX US 03/18/26 C20 Index", 1, start="2026-03-02", end="2026-03-03")
+  times, spread = spread_bars(long_bars, short_bars)        # timestamp-aligned long - short
+  intraday_exits(long_ticker, short_ticker, 1)              # per-day best / worst achievable spread
+
+Usage:
+  python vix_bar_store.py "VIX US 03/18/26 C20 Index" "VIX US 03/18/26 C25 Index" --interval 5
+"""
+import argparse
+import datetime
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BAR_STORE_DIR = Path("data/bars")
+BAR_INTERVALS = [1, 5]  # Minutes
+MARKET_TZ = "America/New_York"
+
+# time = bar start, UTC epoch seconds. 32 bytes per bar.
+BAR_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("volume", "<f4"),
+    ("num_events", "<i4"),
+])
+
+
+def bar_path(ticker, interval, root=BAR_STORE_DIR):
+    return Path(root) / f"{interval}m" / (ticker.replace(" ", "_").replace("/", "-") + ".bin")
+
+
+def open_bars(ticker, interval, root=BAR_STORE_DIR):
+    """Read-only memmap of every stored bar (None if nothing is stored)."""
+    path = bar_path(ticker, interval, root)
+    if not path.exists() or path.stat().st_size < BAR_DTYPE.itemsize:
+        return None
+    n = path.stat().st_size // BAR_DTYPE.itemsize  # Ignore a torn trailing record
+    return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(n,))
+
+
+def last_sync(ticker, interval, root=BAR_STORE_DIR):
+    """When the series was last appended to (datetime, naive UTC), or None."""
+    path = bar_path(ticker, interval, root)
+    if not path.exists():
+        return None
+    return datetime.datetime.fromtimestamp(path.stat().st_mtime, datetime.timezone.utc).replace(tzinfo=None)
+
+
+def last_bar_time(ticker, interval, root=BAR_STORE_DIR):
+    """UTC epoch seconds of the newest stored bar, or None."""
+    bars = open_bars(ticker, interval, root)
+    return int(bars["time"][-1]) if bars is not None else None
+
+
+def append_bars(ticker, interval, bars, root=BAR_STORE_DIR):
+    """
+    Append `bars` (BAR_DTYPE array) newer than the last stored bar. Overlapping or
+    out-of-order bars are dropped, so re-running a window is harmless. The file's mtime
+    is bumped even when nothing is new - it records when the series was last synced.
+    Returns rows written.
+    """
+    bars = np.sort(np.asarray(bars, dtype=BAR_DTYPE), order="time")
+    if len(bars):
+        bars = bars[np.concatenate(([True], np.diff(bars["time"]) > 0))]
+    last = last_bar_time(ticker, interval, root)
+    if last is not None:
+        bars = bars[bars["time"] > last]
+    path = bar_path(ticker, interval, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not len(bars):
+        path.touch()
+        return 0
+    # Drop a torn record from an interrupted append before adding to the file
+    size = path.stat().st_size if path.exists() else 0
+    if size % BAR_DTYPE.itemsize:
+        os.truncate(path, size - size % BAR_DTYPE.itemsize)
+    with open(path, "ab") as f:
+        f.write(bars.tobytes())
+    return len(bars)
+
+
+def _epoch(ts):
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(MARKET_TZ)
+    return int(ts.timestamp())
+
+
+def read_bars(ticker, interval, start=None, end=None, root=BAR_STORE_DIR):
+    """
+    Bars with start <= time < end (timestamps/strings, naive = US/Eastern) as an
+    in-memory BAR_DTYPE array. Only that slice of the file is read.
+    """
+    bars = open_bars(ticker, interval, root)
+    if bars is None:
+        return np.empty(0, dtype=BAR_DTYPE)
+    times = bars["time"]
+    lo = np.searchsorted(times, _epoch(start)) if start is not None else 0
+    hi = np.searchsorted(times, _epoch(end)) if end is not None else len(bars)
+    return np.array(bars[lo:hi])
+
+
+# --- SPREAD BARS ---
+def spread_bars(long_bars, short_bars, max_age=0):
+    """
+    (times, long close - short close) on the long leg's bar times. A short bar counts
+    if it is at most max_age seconds older (0 = both legs must have a bar at that
+    exact time), so every value is a pair of prices that traded together.
+    """
+    if not len(long_bars) or not len(short_bars):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    t_long, t_short = long_bars["time"], short_bars["time"]
+    idx = np.searchsorted(t_short, t_long, side="right") - 1  # Latest short bar at or before each long bar
+    ok = idx >= 0
+    ok[ok] = t_long[ok] - t_short[idx[ok]] <= max_age
+    spread = long_bars["close"][ok].astype(np.float64) - short_bars["close"][idx[ok]].astype(np.float64)
+    return t_long[ok], spread
+
+
+def daily_extremes(times, values):
+    """Per trading day (US/Eastern): close, best / worst value and when they happened."""
+    if not len(times):
+        return pd.DataFrame(columns=["Date", "Close", "Best", "Best_Time", "Worst", "Worst_Time"])
+    ts = pd.to_datetime(times, unit="s", utc=True).tz_convert(MARKET_TZ)
+    df = pd.DataFrame({"Time": ts, "Value": values, "Date": ts.strftime("%Y-%m-%d")})
+    day = df.groupby("Date", sort=True)
+    best, worst = df.loc[day["Value"].idxmax()], df.loc[day["Value"].idxmin()]
+    return pd.DataFrame({
+        "Date": best["Date"].to_numpy(),
+        "Close": day["Value"].last().to_numpy(),
+        "Best": best["Value"].to_numpy(),
+        "Best_Time": best["Time"].dt.strftime("%H:%M").to_numpy(),
+        "Worst": worst["Value"].to_numpy(),
+        "Worst_Time": worst["Time"].dt.strftime("%H:%M").to_numpy(),
+    })
+
+
+def intraday_exits(long_ticker, short_ticker, interval=1, start=None, end=None, max_age=0, root=BAR_STORE_DIR):
+    """Daily best / worst achievable spread from stored bars (see spread_bars / daily_extremes)."""
+    times, spread = spread_bars(read_bars(long_ticker, interval, start, end, root),
+                                read_bars(short_ticker, interval, start, end, root), max_age)
+    return daily_extremes(times, spread)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily intraday best / worst spread from the bar store")
+    parser.add_argument("long_ticker")
+    parser.add_argument("short_ticker")
+    parser.add_argument("--interval", type=int, default=1, choices=BAR_INTERVALS)
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--max-age", type=int, default=0, help="Seconds a short-leg bar may lag the long leg")
+    args = parser.parse_args()
+
+    exits = intraday_exits(args.long_ticker, args.short_ticker, args.interval, args.start, args.end, args.max_age)
+    if exits.empty:
+        print(f"No overlapping {args.interval}m bars stored - run `python vix_data_fetcher.py --bars` first")
+        return
+    print(exits.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,640 @@
+"""
+BLOOMBERG REPLAY / SYNTHETIC TRANSPORT
+======================================
+Stand-in for blpapi.Session so the fetch pipeline can run without a
+Terminal on localhost:8194 (profiling, regression checks, any Linux box).
+
+  RecordingSession  wraps a live blpapi.Session and captures every
+                    HistoricalDataRequest / ReferenceDataRequest /
+                    IntradayBarRequest response to a JSON fixture on disk.
+  ReplaySession     answers the same requests from recorded fixtures (or
+                    synthetic random-walk data) with configurable latency,
+                    partial-response chunking and randomly missing fields.
+                    //blp/mktdata subscriptions get synthetic BID/ASK/LAST ticks.
+
+Usage:
+  engine = BloombergEngine(session=ReplaySession(["data/replay/history.json"], latency=0.2))
+  engine = BloombergEngine(record_to="data/replay/history.json")   # live + record
+
+Benchmark fetch + pivot offline:
+  python vix_bbg_replay.py --synthetic --latency 0.25 --points-per-message 20 --missing 0.05
+"""
+
+import argparse
+import datetime
+import json
+import random
+import time
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+
+try:
+    import blpapi
+except ImportError:
+    blpapi = None
+
+
+# --- blpapi SHIM (only used when the real package is not installed) ---
+class _ShimName(str):
+    """Plays the role of blpapi.Name: compares / hashes like its string."""
+
+
+class _ShimCorrelationId:
+    def __init__(self, value):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+
+class _ShimSubscriptionList:
+    def __init__(self):
+        self.entries = []  # (topic, fields, correlation id)
+
+    def add(self, topic, fields=(), options="", correlationId=None):
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        self.entries.append((topic, list(fields), correlationId))
+
+
+blpapi_shim = SimpleNamespace(
+    Name=_ShimName,
+    CorrelationId=_ShimCorrelationId,
+    SubscriptionList=_ShimSubscriptionList,
+    Event=SimpleNamespace(SESSION_STATUS=2, SUBSCRIPTION_STATUS=3, RESPONSE=5, PARTIAL_RESPONSE=6,
+                          SUBSCRIPTION_DATA=8, TIMEOUT=10),
+)
+
+_api = blpapi if blpapi is not None else blpapi_shim
+_names = {}
+
+
+def _name(key):
+    # Real blpapi.Name objects are interned by the library, so elements built
+    # here hash/compare equal to the names the engine interned at import.
+    key = str(key)
+    if key not in _names:
+        _names[key] = _api.Name(key)
+    return _names[key]
+
+
+# --- ELEMENT / MESSAGE / EVENT STAND-INS ---
+class ReplayElement:
+    """Minimal blpapi.Element look-alike over plain dict / list / scalar data."""
+
+    def __init__(self, key, value):
+        self._key = key
+        self._value = value
+
+    def name(self):
+        return _name(self._key)
+
+    def hasElement(self, key):
+        return isinstance(self._value, dict) and str(key) in self._value
+
+    def getElement(self, key):
+        return ReplayElement(str(key), self._value[str(key)])
+
+    def elements(self):
+        return [ReplayElement(k, v) for k, v in self._value.items()]
+
+    def numValues(self):
+        return len(self._value) if isinstance(self._value, list) else 1
+
+    def getValueAsElement(self, i):
+        return ReplayElement(self._key, self._value[i])
+
+    def getValue(self):
+        return self._value
+
+    def isNull(self):
+        return self._value is None
+
+    def getValueAsFloat(self):
+        if isinstance(self._value, bool) or not isinstance(self._value, (int, float)):
+            raise ValueError(f"{self._key} is not numeric: {self._value!r}")
+        return float(self._value)
+
+    def getValueAsString(self):
+        return str(self._value)
+
+    def getValueAsDatetime(self):
+        # Dates come back as date, bar times as (naive UTC) datetime - like blpapi
+        value = str(self._value)
+        if len(value) > 10:
+            return datetime.datetime.fromisoformat(value)
+        return datetime.date.fromisoformat(value)
+
+    def getElementAsFloat(self, key):
+        return self.getElement(key).getValueAsFloat()
+
+    def getElementAsString(self, key):
+        return self.getElement(key).getValueAsString()
+
+    def getElementAsDatetime(self, key):
+        return self.getElement(key).getValueAsDatetime()
+
+
+class ReplayMessage(ReplayElement):
+    def __init__(self, correlation_id, body, message_type="message"):
+        super().__init__(message_type, body)
+        self._cid = correlation_id
+
+    def correlationIds(self):
+        return [self._cid]
+
+    def messageType(self):
+        return self.name()
+
+
+class ReplayEvent:
+    def __init__(self, event_type, messages=()):
+        self._type = event_type
+        self._messages = list(messages)
+
+    def eventType(self):
+        return self._type
+
+    def __iter__(self):
+        return iter(self._messages)
+
+
+class ReplayRequest:
+    def __init__(self, request_type):
+        self.request_type = request_type
+        self.params = {"securities": [], "fields": []}
+
+    def append(self, key, value):
+        self.params.setdefault(key, []).append(value)
+
+    def set(self, key, value):
+        self.params[key] = value
+
+
+class _ReplayService:
+    def createRequest(self, request_type):
+        return ReplayRequest(request_type)
+
+
+# --- RECORDED / SYNTHETIC DATA ---
+def _element_to_py(el):
+    """Convert a real blpapi.Element tree into JSON-friendly python data."""
+    if el.isArray():
+        nested = el.datatype() in (blpapi.DataType.SEQUENCE, blpapi.DataType.CHOICE)
+        return [_element_to_py(el.getValueAsElement(i)) if nested else _scalar(el.getValue(i))
+                for i in range(el.numValues())]
+    if el.isComplexType():
+        return {str(sub.name()): _element_to_py(sub) for sub in el.elements()}
+    return _scalar(el.getValue())
+
+
+def _scalar(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class FixtureStore:
+    """Per-security index over recorded responses, so any chunking / date window can be replayed."""
+
+    def __init__(self, paths=()):
+        self.history = {}    # security -> {date: point dict}
+        self.reference = {}  # security -> fieldData dict
+        self.bars = {}       # (security, interval) -> {time: bar dict}
+        for path in paths:
+            self.load(path)
+
+    def load(self, path):
+        for exchange in json.loads(Path(path).read_text()):
+            if exchange["type"] == "IntradayBarRequest":
+                req = exchange["request"]
+                bars = self.bars.setdefault((req["security"], int(req["interval"])), {})
+                for body in exchange["messages"]:
+                    for bar in body.get("barData", {}).get("barTickData", []):
+                        bars[bar["time"]] = bar
+                continue
+            for body in exchange["messages"]:
+                sec_data = body.get("securityData")
+                if sec_data is None:
+                    continue
+                if exchange["type"] == "HistoricalDataRequest":
+                    points = self.history.setdefault(sec_data["security"], {})
+                    for point in sec_data.get("fieldData", []):
+                        points[point["date"][:10]] = point
+                elif exchange["type"] == "ReferenceDataRequest":
+                    for item in sec_data:
+                        self.reference[item["security"]] = item.get("fieldData", {})
+
+    def bar_points(self, security, interval, start, end):
+        bars = self.bars.get((security, interval))
+        if bars is None:
+            return None
+        return [bars[t] for t in sorted(bars) if start <= t < end]
+
+    def history_points(self, security, start, end):
+        points = self.history.get(security)
+        if points is None:
+            return None
+        return [points[d] for d in sorted(points) if start <= d <= end]
+
+
+def _synthetic_level(security):
+    if security.startswith("VIX US"):
+        return 1.5
+    if security.startswith("VVIX"):
+        return 95.0
+    return 19.0  # UX futures / VIX spot
+
+
+SYNTHETIC_EPOCH = datetime.date(2024, 1, 1)
+
+
+def synthetic_history(security, start, end):
+    """
+    Deterministic random walk per security over business days in [start, end].
+    The walk always starts at SYNTHETIC_EPOCH, so a given (security, date) gets
+    the same values whatever window is requested - incremental runs line up.
+    """
+    rng = random.Random(zlib.crc32(security.encode()))
+    level = _synthetic_level(security)
+    is_option = security.startswith("VIX US")
+    points = []
+    first = datetime.date.fromisoformat(start)
+    day = min(first, SYNTHETIC_EPOCH)
+    last = datetime.date.fromisoformat(end)
+    while day <= last:
+        if day.weekday() < 5:
+            level = max(0.05, level * (1 + rng.gauss(0, 0.04)))
+            half = level * 0.04
+            point = {
+                "date": day.isoformat(),
+                "PX_LAST": round(level, 2),
+                "PX_MID": round(level, 3),
+                "PX_BID": round(level - half, 2),
+                "PX_ASK": round(level + half, 2),
+                # Hashed, not drawn from rng, so the walk itself is unchanged
+                "PX_HIGH": round(level * (1.02 + zlib.crc32(f"{security}H{day}".encode()) % 100 / 1000), 2),
+                "PX_LOW": round(level * (0.98 - zlib.crc32(f"{security}L{day}".encode()) % 100 / 1000), 2),
+                "VOLUME": float(rng.randint(0, 5000)),
+                "OPEN_INT": float(rng.randint(100, 50000)),
+            }
+            if is_option:
+                point.update({
+                    "IVOL_MID": round(rng.uniform(60, 110), 3),
+                    "DELTA_MID": round(rng.uniform(0.1, 0.7), 3),
+                    "GAMMA_MID": round(rng.uniform(0.003, 0.01), 4),
+                    "VEGA_MID": round(rng.uniform(0.02, 0.07), 3),
+                    "THETA_MID": round(-rng.uniform(0.005, 0.015), 4),
+                })
+            if day >= first:
+                points.append(point)
+        day += datetime.timedelta(days=1)
+    return points
+
+
+def synthetic_bars(security, interval, start, end):
+    """
+    Deterministic TRADE bars (interval minutes, 09:30-16:15 ET) for naive-UTC datetimes
+    [start, end). Each day walks from the synthetic daily close of the day before;
+    options only trade in some bars, like the real illiquid legs.
+    """
+    from zoneinfo import ZoneInfo
+
+    et, utc = ZoneInfo("America/New_York"), datetime.timezone.utc
+    is_option = security.startswith("VIX US")
+    closes = {p["date"]: p["PX_LAST"] for p in
+              synthetic_history(security, (start.date() - datetime.timedelta(days=7)).isoformat(), end.date().isoformat())}
+    bars, prev_close = [], None
+    day = start.date() - datetime.timedelta(days=7)
+    while day <= end.date():
+        if day.isoformat() in closes and day >= start.date() - datetime.timedelta(days=1):
+            rng = random.Random(zlib.crc32(f"{security}|{day}|{interval}".encode()))
+            level = prev_close or closes[day.isoformat()]
+            t = datetime.datetime.combine(day, datetime.time(9, 30), et)
+            close_at = datetime.datetime.combine(day, datetime.time(16, 15), et)
+            while t < close_at:
+                t_utc = t.astimezone(utc).replace(tzinfo=None)
+                o = level
+                level = max(0.05, level * (1 + rng.gauss(0, 0.004 * interval ** 0.5)))
+                # Same draws for every slot whatever the window, so windows line up
+                traded = not is_option or rng.random() < 0.35
+                wiggle = abs(rng.gauss(0, 0.002)) * level
+                volume, events = rng.randint(1, 200), rng.randint(1, 20)
+                if start <= t_utc < end and traded:
+                    bars.append({
+                        "time": t_utc.isoformat(), "open": round(o, 2), "close": round(level, 2),
+                        "high": round(max(o, level) + wiggle, 2), "low": round(max(0.05, min(o, level) - wiggle), 2),
+                        "volume": volume, "numEvents": events,
+                    })
+                t += datetime.timedelta(minutes=interval)
+        if day.isoformat() in closes:
+            prev_close = closes[day.isoformat()]
+        day += datetime.timedelta(days=1)
+    return bars
+
+
+# --- REPLAY SESSION ---
+class ReplaySession:
+    """
+    Drop-in for a started blpapi.Session. Each request's messages are
+    scheduled on its own timeline starting at send time, so several
+    in-flight requests overlap just like against the real Terminal.
+
+    latency             seconds before a request's first message
+    message_latency     extra seconds between consecutive messages
+    points_per_message  split a security's fieldData across PARTIAL_RESPONSEs
+    missing             probability each field is dropped from a point
+    synthetic           generate data for securities not in the fixtures
+    tick_rate           synthetic subscription ticks per second (across all topics)
+    stall               probability a request stops after a random prefix of its
+                        messages and never sends its final RESPONSE
+    flaky               probability each history security answers with a transient
+                        securityError instead of data
+    """
+
+    def __init__(self, fixtures=(), latency=0.0, message_latency=0.0, points_per_message=None,
+                 missing=0.0, synthetic=False, seed=0, tick_rate=50.0, stall=0.0, flaky=0.0):
+        self.store = fixtures if isinstance(fixtures, FixtureStore) else FixtureStore(fixtures)
+        self.latency = latency
+        self.message_latency = message_latency
+        self.points_per_message = points_per_message
+        self.missing = missing
+        self.synthetic = synthetic
+        self._rng = random.Random(seed)
+        self._queue = []  # (ready_at, seq, event)
+        self._seq = 0
+        self.tick_rate = tick_rate
+        self.stall = stall
+        self.flaky = flaky
+        self._subscriptions = {}  # correlation id value -> [cid, fields, last level]
+        self._next_tick = 0.0
+        self.requests_sent = 0
+        self.messages_sent = 0
+        self.ticks_sent = 0
+
+    # blpapi.Session surface used by BloombergEngine
+    def start(self):
+        return True
+
+    def openService(self, name):
+        return True
+
+    def getService(self, name):
+        return _ReplayService()
+
+    def stop(self):
+        self._queue.clear()
+        self._subscriptions.clear()
+
+    def subscribe(self, subscription_list):
+        ready = time.time() + self.latency
+        for topic, fields, cid in subscription_list.entries:
+            security = topic.replace("//blp/mktdata/", "")
+            known = security in self.store.history or security in self.store.reference
+            if not (known or self.synthetic):
+                self._push(ready, ReplayEvent(_api.Event.SUBSCRIPTION_STATUS, [ReplayMessage(
+                    cid, {"reason": {"category": "BAD_SEC", "description": "Unknown/Invalid security"}},
+                    "SubscriptionFailure")]))
+                continue
+            history = synthetic_history(security, SYNTHETIC_EPOCH.isoformat(), datetime.date.today().isoformat())
+            level = history[-1]["PX_LAST"] if history else _synthetic_level(security)
+            self._subscriptions[cid.value()] = [cid, fields, level]
+            self._push(ready, ReplayEvent(_api.Event.SUBSCRIPTION_STATUS,
+                                          [ReplayMessage(cid, {}, "SubscriptionStarted")]))
+        self._next_tick = ready
+
+    def unsubscribe(self, subscription_list):
+        for _, _, cid in subscription_list.entries:
+            self._subscriptions.pop(cid.value(), None)
+
+    def _tick(self):
+        """One synthetic quote update for a random subscribed topic (a random subset of its fields)."""
+        sub = self._subscriptions[self._rng.choice(list(self._subscriptions))]
+        cid, fields, level = sub
+        level = max(0.05, level * (1 + self._rng.gauss(0, 0.002)))
+        sub[2] = level
+        half = max(0.01, level * 0.02)
+        quote = {"BID": round(level - half, 2), "ASK": round(level + half, 2), "LAST_PRICE": round(level, 2)}
+        body = {k: v for k, v in quote.items() if k in fields and self._rng.random() < 0.7}
+        self.ticks_sent += 1
+        return ReplayEvent(_api.Event.SUBSCRIPTION_DATA, [ReplayMessage(cid, body or quote, "MarketDataEvents")])
+
+    def cancel(self, correlation_id):
+        key = correlation_id.value()
+        self._queue = [q for q in self._queue
+                       if not any(m.correlationIds()[0].value() == key for m in q[2])]
+
+    def sendRequest(self, request, correlationId=None):
+        self.requests_sent += 1
+        if request.request_type == "HistoricalDataRequest":
+            bodies = self._history_bodies(request)
+        elif request.request_type == "ReferenceDataRequest":
+            bodies = self._reference_bodies(request)
+        elif request.request_type == "IntradayBarRequest":
+            bodies = self._bar_bodies(request)
+        else:
+            raise NotImplementedError(f"ReplaySession does not serve {request.request_type}")
+
+        ready = time.time() + self.latency
+        if bodies and self._rng.random() < self.stall:
+            bodies = bodies[:self._rng.randrange(len(bodies))]
+            for body in bodies:
+                self._push(ready, ReplayEvent(_api.Event.PARTIAL_RESPONSE, [ReplayMessage(correlationId, body)]))
+                ready += self.message_latency
+            return
+        for i, body in enumerate(bodies):
+            final = i == len(bodies) - 1
+            event_type = _api.Event.RESPONSE if final else _api.Event.PARTIAL_RESPONSE
+            self._push(ready, ReplayEvent(event_type, [ReplayMessage(correlationId, body)]))
+            ready += self.message_latency
+        if not bodies:
+            self._push(ready, ReplayEvent(_api.Event.RESPONSE, [ReplayMessage(correlationId, {})]))
+
+    def nextEvent(self, timeout=0):
+        if self._subscriptions and self.tick_rate:
+            horizon = time.time() + timeout / 1000.0
+            while self._next_tick <= horizon:
+                self._push(self._next_tick, self._tick())
+                self._next_tick += self._rng.expovariate(self.tick_rate)
+        if self._queue:
+            self._queue.sort(key=lambda q: (q[0], q[1]))
+            wait = self._queue[0][0] - time.time()
+            if wait <= timeout / 1000.0:
+                if wait > 0:
+                    time.sleep(wait)
+                self.messages_sent += 1
+                return self._queue.pop(0)[2]
+        time.sleep(timeout / 1000.0)
+        return ReplayEvent(_api.Event.TIMEOUT)
+
+    def _push(self, ready, event):
+        self._seq += 1
+        self._queue.append((ready, self._seq, event))
+
+    def _drop_missing(self, fields):
+        if not self.missing:
+            return fields
+        return {k: v for k, v in fields.items()
+                if k in ("date", "security") or self._rng.random() >= self.missing}
+
+    def _history_bodies(self, request):
+        p = request.params
+        start = _iso(p.get("startDate"))
+        end = _iso(p.get("endDate") or datetime.date.today().strftime("%Y%m%d"))
+        wanted = set(p["fields"]) | {"date"}
+        bodies = []
+        for seq, security in enumerate(p["securities"]):
+            if self._rng.random() < self.flaky:
+                bodies.append({"securityData": {
+                    "security": security, "sequenceNumber": seq,
+                    "securityError": {"category": "TIMEOUT", "message": "Request timed out on server"},
+                    "fieldData": [],
+                }})
+                continue
+            points = self.store.history_points(security, start, end)
+            if points is None and self.synthetic:
+                points = synthetic_history(security, start, end)
+            if points is None:
+                bodies.append({"securityData": {
+                    "security": security, "sequenceNumber": seq,
+                    "securityError": {"category": "BAD_SEC", "message": "Unknown/Invalid security"},
+                    "fieldData": [],
+                }})
+                continue
+            points = [self._drop_missing({k: v for k, v in pt.items() if k in wanted}) for pt in points]
+            step = self.points_per_message or max(len(points), 1)
+            for lo in range(0, max(len(points), 1), step):
+                bodies.append({"securityData": {
+                    "security": security, "sequenceNumber": seq,
+                    "fieldData": points[lo:lo + step],
+                }})
+        return bodies
+
+    def _bar_bodies(self, request):
+        p = request.params
+        security, interval = p["security"], int(p["interval"])
+        start, end = _naive_utc(p["startDateTime"]), _naive_utc(p["endDateTime"])
+        bars = self.store.bar_points(security, interval, start.isoformat(), end.isoformat())
+        if bars is None and self.synthetic:
+            bars = synthetic_bars(security, interval, start, end)
+        if bars is None:
+            return [{"responseError": {"category": "BAD_SEC", "message": f"Unknown/Invalid security {security}"}}]
+        step = self.points_per_message or max(len(bars), 1)
+        return [{"barData": {"barTickData": bars[lo:lo + step]}} for lo in range(0, max(len(bars), 1), step)]
+
+    def _reference_bodies(self, request):
+        p = request.params
+        wanted = set(p["fields"])
+        items = []
+        for security in p["securities"]:
+            fields = self.store.reference.get(security)
+            if fields is None and self.synthetic:
+                history = synthetic_history(security, SYNTHETIC_EPOCH.isoformat(), datetime.date.today().isoformat())
+                fields = dict(history[-1]) if history else {}
+                fields["IVOL_LAST"] = fields.get("IVOL_MID")
+            if fields is None:
+                items.append({"security": security,
+                              "securityError": {"category": "BAD_SEC", "message": "Unknown/Invalid security"}})
+                continue
+            items.append({"security": security,
+                          "fieldData": self._drop_missing({k: v for k, v in fields.items()
+                                                           if k in wanted and v is not None})})
+        return [{"securityData": items}] if items else []
+
+
+def _naive_utc(value):
+    value = value if isinstance(value, datetime.datetime) else datetime.datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _iso(yyyymmdd):
+    s = str(yyyymmdd)
+    return f"{s[:4]}-{s[4:6]}-{s[6:8]}" if "-" not in s else s
+
+
+# --- RECORDER ---
+class RecordingSession:
+    """
+    Wraps a live blpapi.Session and writes every request/response exchange
+    to a JSON fixture that FixtureStore / ReplaySession can load.
+    """
+
+    def __init__(self, session, path):
+        self._session = session
+        self.path = Path(path)
+        self._open = {}       # correlation value -> exchange
+        self._exchanges = []
+
+    def __getattr__(self, attr):
+        return getattr(self._session, attr)
+
+    def sendRequest(self, request, correlationId=None):
+        spec = request.asElement()
+        exchange = {"type": str(spec.name()), "request": _element_to_py(spec), "messages": []}
+        self._exchanges.append(exchange)
+        if correlationId is not None:
+            self._open[correlationId.value()] = exchange
+        return self._session.sendRequest(request, correlationId=correlationId)
+
+    def nextEvent(self, timeout=0):
+        event = self._session.nextEvent(timeout)
+        for msg in event:
+            for cid in msg.correlationIds():
+                exchange = self._open.get(cid.value())
+                if exchange is not None:
+                    exchange["messages"].append(_element_to_py(msg.asElement()))
+        if event.eventType() == _api.Event.RESPONSE:
+            self.save()
+        return event
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self._exchanges, indent=1))
+
+    def stop(self):
+        self.save()
+        return self._session.stop()
+
+
+# --- OFFLINE BENCHMARK ---
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetch + pivot against a replay transport")
+    parser.add_argument("fixtures", nargs="*", help="JSON fixtures written by RecordingSession")
+    parser.add_argument("--synthetic", action="store_true", help="Synthesize securities missing from fixtures")
+    parser.add_argument("--start", default=None, help="History start YYYYMMDD (default: fetcher START_DATE)")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--message-latency", type=float, default=0.0)
+    parser.add_argument("--points-per-message", type=int, default=None)
+    parser.add_argument("--missing", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=0.0, help="Probability a request never completes")
+    parser.add_argument("--flaky", type=float, default=0.0, help="Probability of a transient securityError")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import vix_data_fetcher as fetcher
+
+    tickers, option_tickers = fetcher.collect_tickers()
+    start = args.start or fetcher.START_DATE
+
+    for run in range(1, args.repeat + 1):
+        session = ReplaySession(args.fixtures, latency=args.latency, message_latency=args.message_latency,
+                                points_per_message=args.points_per_message, missing=args.missing,
+                                synthetic=args.synthetic, seed=run, stall=args.stall, flaky=args.flaky)
+        engine = fetcher.BloombergEngine(session=session)
+        t0 = time.perf_counter()
+        raw_df, greeks = engine.fetch_all(tickers, start, option_tickers)
+        t1 = time.perf_counter()
+        wide = fetcher.build_wide_frame(raw_df) if not raw_df.empty else raw_df
+        t2 = time.perf_counter()
+        print(f"run {run}: fetch {t1 - t0:.3f}s ({session.requests_sent} requests, "
+              f"{session.messages_sent} events, {len(raw_df)} points) | pivot {t2 - t1:.3f}s "
+              f"({wide.shape[0]} x {wide.shape[1]})")
+
+
+if __name__ == "__main__":
+    main()
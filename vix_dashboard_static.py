@@ -3,9 +3,14 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import json
 from pathlib import Path
 from datetime import datetime
 
+from vix_store import read_store, read_chain, chain_strikes, chain_vertical, QF_OUT_OF_RANGE, QF_STALE
+from vix_store import store_source, file_fingerprint, VersionedFrames, FileWatcher
+from vix_spread_registry import SPREADS_CONFIG, POST_MORTEM_CONFIG
+
 # --- 1. PAGE CONFIG ---
 st.set_page_config(
     page_title="VIX Spread Terminal",
@@ -15,97 +20,33 @@ st.set_page_config(
 )
 
 # --- 2. CONFIGURATION ---
-CSV_PATH = Path("data/vix_spread_data.csv")
-
-# --- UPDATED: Added futures ticker reference for each spread ---
-SPREADS_CONFIG = {
-    "Feb 2026": {
-        "prefix": "Feb_2026",
-        "expiry_date": "2026-02-18",
-        "futures_col": "Feb_2026_VIX_Futures",  # Column name in CSV
-        "futures_ticker": "UXG26",  # For display
-        "long_strike": 20,
-        "short_strike": 25,
-    },
-    "Mar 2026": {
-        "prefix": "Mar_2026", 
-        "expiry_date": "2026-03-18",
-        "futures_col": "Mar_2026_VIX_Futures",
-        "futures_ticker": "UXH26",
-        "long_strike": 20,
-        "short_strike": 25,
-    },
-    "Mar 2026 20-40": {
-        "prefix": "Mar_2026_20-40",
-        "expiry_date": "2026-03-18",
-        "futures_col": "Mar_2026_20-40_VIX_Futures",
-        "futures_ticker": "UXH26",
-        "long_strike": 20,
-        "short_strike": 40,
-    },
-    "May 2026": {
-        "prefix": "May_2026",
-        "expiry_date": "2026-05-19",
-        "futures_col": "May_2026_VIX_Futures",
-        "futures_ticker": "UXK26",
-        "long_strike": 25,
-        "short_strike": 35,
-    },
-    "Jun 2026": {
-        "prefix": "Jun_2026",
-        "expiry_date": "2026-06-17",
-        "futures_col": "Jun_2026_VIX_Futures",
-        "futures_ticker": "UXM26",
-        "long_strike": 20,
-        "short_strike": 25,
-    },
-}
+STORE_PATH = Path("data/vix_spread_data.parquet")  # Falls back to the CSV export if missing
+LIVE_MARKS_PATH = Path("data/vix_live_marks.json")  # Written by `vix_data_fetcher.py --stream`
+LIVE_MARKS_MAX_AGE = 300  # Seconds - older snapshots mean the stream isn't running
+CHAIN_PATH = Path("data/vix_chain.npz")  # Written by `vix_data_fetcher.py --chain`
 
+# Spread tickers, strikes and column names come from the shared registry (same as the fetcher)
 SPREADS_CONFIG_NAMES = {
     "en": {"Feb 2026": "Feb 2026", "Mar 2026": "Mar 2026", "Mar 2026 20-40": "Mar 2026 (20/40)", "May 2026": "May 2026 (25/35)", "Jun 2026": "Jun 2026 (20/25)"},
     "zh": {"Feb 2026": "2026年2月", "Mar 2026": "2026年3月", "Mar 2026 20-40": "2026年3月 (20/40)", "May 2026": "2026年5月 (25/35)", "Jun 2026": "2026年6月 (20/25)"}
 }
-SPREAD_KEYS = ["Feb 2026", "Mar 2026", "Mar 2026 20-40", "May 2026", "Jun 2026"]
+SPREAD_KEYS = list(SPREADS_CONFIG)
+SPREAD_MASK_FLAGS = QF_OUT_OF_RANGE | QF_STALE  # Spread marks with these quality flags are hidden
+LAZY_TABS = True  # Build only the selected spread's charts/analytics; other spreads show summary cards
+
+# Open positions: spread -> (session key, default entry price, input max, entry date or None = sidebar date).
+# Every entry price is edited in the sidebar, whichever spread tab is selected.
+POSITION_INPUTS = {
+    "Feb 2026":       ("feb", 0.63, 5.0, None),
+    "Mar 2026":       ("mar", 0.91, 5.0, None),
+    "Mar 2026 20-40": ("mar_2040", 1.45, 20.0, None),
+    "May 2026":       ("may", 0.61, 20.0, "2026-04-15"),
+    "Jun 2026":       ("jun", 0.34, 5.0, "2026-05-28"),
+}
 
 # --- POST-MORTEM CONFIGS (one per expired spread) ---
-POST_MORTEM_CONFIG = [
-    {
-        "csv": "data/feb_spread_intraday.csv",
-        "label_en": "📋 Feb 2026 C20/C25 Post-Mortem (Expired)",
-        "label_zh": "📋 2026年2月 C20/C25 交易复盘（已到期）",
-        "entry_price": 0.63,
-        "entry_info": "Jan 16 | UXG26: 18.38",
-        "futures_ticker": "UXG26",
-        "long_strike": 20,
-        "short_strike": 25,
-        "spike_threshold": 1.50,
-        "key": "feb",
-    },
-    {
-        "csv": "data/mar_spread_intraday.csv",
-        "label_en": "📋 Mar 2026 C20/C25 Post-Mortem (Expired)",
-        "label_zh": "📋 2026年3月 C20/C25 交易复盘（已到期）",
-        "entry_price": 0.91,
-        "entry_info": "Jan 16 | UXH26",
-        "futures_ticker": "UXH26",
-        "long_strike": 20,
-        "short_strike": 25,
-        "spike_threshold": 1.82,
-        "key": "mar",
-    },
-    {
-        "csv": "data/mar_2040_spread_intraday.csv",
-        "label_en": "📋 Mar 2026 C20/C40 Post-Mortem (Expired)",
-        "label_zh": "📋 2026年3月 C20/C40 交易复盘（已到期）",
-        "entry_price": 1.45,
-        "entry_info": "Jan 16 | UXH26",
-        "futures_ticker": "UXH26",
-        "long_strike": 20,
-        "short_strike": 40,
-        "spike_threshold": 2.90,
-        "key": "mar2040",
-    },
-]
+# POST_MORTEM_CONFIG comes from the registry too: one entry per POST_MORTEM_DEFS trade, whose
+# CSV is written by `python analysis/post_mortem.py`
 
 # --- 3. TRANSLATIONS ---
 TRANSLATIONS = {
@@ -113,7 +54,7 @@ TRANSLATIONS = {
         "page_title": "VIX Spread Terminal",
         "header_subtitle": "VIX Bullish Call Spread Monitor",
         "header_title": "Multi-Expiry Terminal",
-        "live_data": "STATIC DATA",
+        "live_data": "AUTO-UPDATING",
         "configuration": "Configuration",
         "language": "Language",
         "active_spreads": "Active Spreads",
@@ -123,6 +64,10 @@ TRANSLATIONS = {
         "days": "days",
         "refresh": "Reload CSV",
         "last_updated": "Last Data Point",
+        "live_marks": "Live Marks",
+        "strike_explorer": "Strike Explorer (option chain)",
+        "long_call": "Long call",
+        "short_call": "Short call",
         "long_leg": "Long Leg (C20)",
         "short_leg": "Short Leg (C25)",
         "net_spread": "Net Spread",
@@ -178,6 +123,7 @@ TRANSLATIONS = {
         "contango": "Contango",
         "key_dates": "Key Dates",
         "trade_simulation": "Trade Simulation",
+        "select_spread": "Spread",
         "trading_days_note": "Trading days shown (excl. weekends)",
         "since_listing": "Since Listing",
         "distance_to_be": "Distance to Breakeven",
@@ -249,7 +195,7 @@ TRANSLATIONS = {
         "page_title": "VIX价差终端",
         "header_subtitle": "VIX看涨期权价差监控",
         "header_title": "多到期日终端",
-        "live_data": "静态数据",
+        "live_data": "自动更新",
         "configuration": "配置",
         "language": "语言",
         "active_spreads": "活跃价差",
@@ -259,6 +205,10 @@ TRANSLATIONS = {
         "days": "天",
         "refresh": "重新加载CSV",
         "last_updated": "最新数据",
+        "live_marks": "实时报价",
+        "strike_explorer": "行权价探索（期权链）",
+        "long_call": "买入看涨",
+        "short_call": "卖出看涨",
         "long_leg": "多头 (C20)",
         "short_leg": "空头 (C25)",
         "net_spread": "净价差",
@@ -314,6 +264,7 @@ TRANSLATIONS = {
         "contango": "升水",
         "key_dates": "关键日期",
         "trade_simulation": "交易模拟",
+        "select_spread": "价差",
         "trading_days_note": "显示交易日（不含周末）",
         "since_listing": "自上市以来",
         "distance_to_be": "距离保本点",
@@ -607,40 +558,129 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 6. DATA LOADER ---
-@st.cache_data
-def load_data(csv_path):
-    if not csv_path.exists():
-        return None
+# The store is cached per file version (mtime/size, then content hash), not per path: a
+# fetcher rewrite shows up on the next rerun without clearing anything, and every session
+# shares one cleaned frame per version (one server, many viewers).
+@st.cache_resource
+def shared_store_frames():
+    return VersionedFrames(clean_store)
+
+def load_data(store_path, prefixes=None):
+    """
+    Typed, date-sorted frame from the columnar store. `prefixes` (a tuple) projects
+    to the shared columns plus those spreads' `{prefix}_*` columns only.
+    """
     try:
-        df = pd.read_csv(csv_path)
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.sort_values("Date")
-        cols_to_convert = [c for c in df.columns if c != "Date"]
-        for col in cols_to_convert:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Clean data: Remove rows where spread data is 0 or missing
-        spread_cols = [col for col in df.columns if col.endswith("_Spread")]
-        for col in spread_cols:
-            df.loc[df[col] == 0, col] = pd.NA
-
-        # Sanity filter: A bullish call spread must be within [0, K2 - K1].
-        # Values outside this range come from stale Bloomberg quotes on
-        # illiquid legs and distort z-score / percentile / histograms.
-        for conf in SPREADS_CONFIG.values():
-            col = f"{conf['prefix']}_Spread"
-            if col in df.columns:
-                width = conf["short_strike"] - conf["long_strike"]
-                df.loc[(df[col] < 0) | (df[col] > width), col] = pd.NA
-
-        if spread_cols:
-            df = df.dropna(subset=spread_cols, how='all')
-
+        source = store_source(store_path)
+        if source is None:
+            return None
+        version, df = shared_store_frames().get(source, key=prefixes, held=st.session_state.get("data_version"))
+        st.session_state.data_version = version
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+@st.cache_resource
+def store_watcher():
+    """One watcher thread for the whole server - sessions subscribe instead of polling."""
+    return FileWatcher()
+
+@st.cache_resource
+def push_rerun_state():
+    """Server-wide: set to disabled once the Streamlit internals push reruns rely on are missing."""
+    return {"disabled": False}
+
+def _rerun_session(session_id):
+    """
+    Ask Streamlit to rerun a connected session (called from the watcher thread); False once
+    it's gone. Uses Streamlit's private session manager (see the pin in requirements.txt):
+    if that API has changed, push reruns are switched off with one warning and the
+    dashboard keeps working, refreshing on the next interaction instead.
+    """
+    state = push_rerun_state()
+    if state["disabled"]:
+        return False
+    try:
+        from streamlit.runtime import Runtime
+        info = Runtime.instance()._session_mgr.get_active_session_info(session_id)
+        if info is None:
+            return False
+        info.session.request_rerun(None)
+    except Exception as e:
+        state["disabled"] = True
+        print(f"⚠️ Push reruns disabled - Streamlit session API unavailable ({type(e).__name__}: {e})")
+        return False
+    return True
+
+def rerun_on_store_change():
+    """
+    Subscribe this session to the store version it is showing: it reruns (server push) once
+    the fetcher writes different content, and never while the data is unchanged.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None or push_rerun_state()["disabled"]:
+        return
+    wanted = {str(STORE_PATH): None}  # No store yet (or only the CSV export) -> rerun when it appears
+    version = st.session_state.get("data_version")
+    if version is not None:
+        wanted[version[0]] = version[1]
+    session_id = ctx.session_id
+    store_watcher().watch(session_id, wanted, lambda: _rerun_session(session_id))
+
+def clean_store(path, prefixes=None):
+    """Read + clean one store version (runs once per version and projection, shared by all sessions)."""
+    df = read_store(path, prefixes=prefixes)
+    if df is None:
+        return None
+
+    # Clean data: Remove rows where spread data is 0 or missing
+    spread_cols = [col for col in df.columns if col.endswith("_Spread")]
+    for col in spread_cols:
+        df.loc[df[col] == 0, col] = pd.NA
+
+    # Quality mask: the fetcher flags every spread mark at ingest ({prefix}_Spread_Quality,
+    # vix_store QF_*). Outside [0, K2 - K1] or a stale leg price -> not a real mark; it would
+    # distort z-score / percentile / histograms.
+    for conf in SPREADS_CONFIG.values():
+        cols = conf["columns"]
+        col = cols["Spread"]
+        if col not in df.columns:
+            continue
+        if cols["Spread_Quality"] in df.columns:
+            bad = (df[cols["Spread_Quality"]] & SPREAD_MASK_FLAGS) != 0
+        else:  # Store written before quality flags - range check only
+            width = conf["short_strike"] - conf["long_strike"]
+            bad = (df[col] < 0) | (df[col] > width)
+        df.loc[bad, col] = pd.NA
+
+    if spread_cols:
+        df = df.dropna(subset=spread_cols, how='all')
+
+    return df
+
+@st.cache_data
+def load_chain(path, fingerprint=None):
+    """
+    Option chain cubes from `vix_data_fetcher.py --chain`, or None if it hasn't been run.
+    Pass file_fingerprint(path) so a re-fetched chain isn't served from the cache.
+    """
+    try:
+        return read_chain(path)
+    except Exception as e:
+        st.warning(f"Could not read option chain: {e}")
+        return None
+
+def load_live_marks(path):
+    """Latest streaming snapshot, or None if the stream isn't running (missing / stale file)."""
+    try:
+        if not path.exists() or datetime.now().timestamp() - path.stat().st_mtime > LIVE_MARKS_MAX_AGE:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
 # --- P&L CALCULATION HELPER ---
 def calculate_pnl(entry_price: float, current_price: float, entry_date: str, current_date: str, expiry_date: str):
     """Calculate P&L metrics for a trade."""
@@ -680,19 +720,19 @@ def create_spread_chart(df: pd.DataFrame, spread_name: str, lang: str,
                         entry_price: float = None, entry_date: str = None,
                         current_futures: float = None, long_iv: float = None,
                         short_iv: float = None, expiry_date: str = None):
-    prefix = SPREADS_CONFIG[spread_name]["prefix"]
+    cols = SPREADS_CONFIG[spread_name]["columns"]
     K1 = SPREADS_CONFIG[spread_name]["long_strike"]
     K2 = SPREADS_CONFIG[spread_name]["short_strike"]
     spread_width = K2 - K1
 
-    if f"{prefix}_Spread" not in df.columns:
+    if cols["Spread"] not in df.columns:
         return go.Figure()
 
     plot_df = pd.DataFrame(index=df["Date"])
-    plot_df["Spread"] = df[f"{prefix}_Spread"].values
-    plot_df["Long"] = df[f"{prefix}_Long_Price"].values
-    plot_df["Short"] = df[f"{prefix}_Short_Price"].values
-    plot_df["Volume"] = df[f"{prefix}_Total_Volume"].values
+    plot_df["Spread"] = df[cols["Spread"]].values
+    plot_df["Long"] = df[cols["Long_Price"]].values
+    plot_df["Short"] = df[cols["Short_Price"]].values
+    plot_df["Volume"] = df[cols["Total_Volume"]].values
     plot_df = plot_df.apply(pd.to_numeric, errors='coerce')
 
     has_volume = plot_df["Volume"].sum() > 0
@@ -1016,26 +1056,78 @@ def create_payoff_chart(entry_price, lang, current_futures=None, long_strike=20,
 
     return fig
 
+# --- FIGURE CACHE ---
+# Built figures are memoized on their inputs, with the store version standing in for the data.
+# A rerun that doesn't change a chart's inputs (another spread's entry price, a store push with
+# identical content, switching back to a spread) reuses the built figure.
+FIGURE_CACHE_SIZE = 64  # Figures kept server-wide, least recently used dropped first
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _shared_figure(kind, key, _build):
+    return _build()
+
+def cached_figure(kind, key, _build):
+    """
+    Figure from the shared LRU: `_build()` only runs for a new (kind, key). Each caller gets
+    its own copy, so tweaking a returned figure never leaks into other sessions or reruns.
+    """
+    return go.Figure(_shared_figure(kind, key, _build))
+
+def figure_key(*inputs):
+    """Key for a figure drawn from df_chart: store version + lookback window + the chart's own inputs."""
+    return (st.session_state.get("data_version"), lookback_days, today, st.session_state.language) + inputs
+
+def create_term_structure_chart(latest_ts, prev_ts, state_color):
+    ts_fig = go.Figure()
+    x_labels = list(latest_ts.keys())
+    y_latest = [latest_ts[c] for c in x_labels]
+    y_prev = [prev_ts.get(c, latest_ts[c]) for c in x_labels]
+
+    ts_fig.add_trace(go.Scatter(
+        x=x_labels, y=y_prev,
+        mode='lines+markers', name='Prev',
+        line=dict(color='rgba(158,158,158,0.5)', width=1.5, dash='dot'),
+        marker=dict(size=6),
+        hovertemplate='%{x}: %{y:.2f}<extra>Prev</extra>'
+    ))
+    ts_fig.add_trace(go.Scatter(
+        x=x_labels, y=y_latest,
+        mode='lines+markers+text', name='Current',
+        line=dict(color=state_color, width=2.5),
+        marker=dict(size=9),
+        text=[f"{v:.2f}" for v in y_latest],
+        textposition="top center",
+        textfont=dict(size=10),
+        hovertemplate='%{x}: %{y:.2f}<extra>Current</extra>'
+    ))
+    ts_fig.update_layout(
+        height=260,
+        plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="JetBrains Mono, Noto Sans SC, monospace", size=11),
+        margin=dict(l=40, r=20, t=30, b=30),
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1, bgcolor='rgba(0,0,0,0)'),
+        hovermode='x unified'
+    )
+    ts_fig.update_xaxes(gridcolor='rgba(128,128,128,0.15)', showgrid=True)
+    ts_fig.update_yaxes(gridcolor='rgba(128,128,128,0.15)', showgrid=True)
+    return ts_fig
+
 # --- 8. SIDEBAR ---
 
 # Initialize session state for trade simulation
 if 'trade_entry_date' not in st.session_state:
     st.session_state.trade_entry_date = datetime.strptime("2026-01-16", "%Y-%m-%d").date()
-if 'feb_entry_price' not in st.session_state:
-    st.session_state.feb_entry_price = 0.63
-if 'mar_entry_price' not in st.session_state:
-    st.session_state.mar_entry_price = 0.91
-if 'mar_2040_entry_price' not in st.session_state:
-    st.session_state.mar_2040_entry_price = 1.45
-if 'may_entry_price' not in st.session_state:
-    st.session_state.may_entry_price = 0.61
-if 'jun_entry_price' not in st.session_state:
-    st.session_state.jun_entry_price = 0.34
+for _key, _default, _, _ in POSITION_INPUTS.values():
+    if f'{_key}_entry_price' not in st.session_state:
+        st.session_state[f'{_key}_entry_price'] = _default
 
 today = datetime.now().date()
 
 # Load data early
-full_df = load_data(CSV_PATH)
+full_df = load_data(STORE_PATH)
+rerun_on_store_change()
+chain = load_chain(CHAIN_PATH, file_fingerprint(CHAIN_PATH))
 
 # --- UPDATED: Check for VIX Futures data instead of spot ---
 def get_futures_data(df, spread_name):
@@ -1070,15 +1162,37 @@ if full_df is not None and "VIX_Spot" in full_df.columns:
         latest_vix_spot = float(spot_val)
         vix_spot_available = True
 
-# Get futures for each spread
-feb_futures, feb_futures_prev, feb_futures_change = get_futures_data(full_df, "Feb 2026")
-mar_futures, mar_futures_prev, mar_futures_change = get_futures_data(full_df, "Mar 2026")
-mar_2040_futures, mar_2040_futures_prev, mar_2040_futures_change = get_futures_data(full_df, "Mar 2026 20-40")
-may_futures, may_futures_prev, may_futures_change = get_futures_data(full_df, "May 2026")
-jun_futures, jun_futures_prev, jun_futures_change = get_futures_data(full_df, "Jun 2026")
+# Latest / change of each futures contract, once per contract however many spreads share it
+futures_quotes = {}
+for _spread_name, _conf in SPREADS_CONFIG.items():
+    if _conf["futures_ticker"] not in futures_quotes:
+        _fut, _, _fut_change = get_futures_data(full_df, _spread_name)
+        if _fut and _fut > 0:
+            futures_quotes[_conf["futures_ticker"]] = (_conf["expiry_date"], _fut, _fut_change)
 
-# Debug output (can remove later)
-# st.write(f"DEBUG: Feb Futures = {feb_futures}, Mar Futures = {mar_futures}, VIX Spot = {latest_vix_spot}")
+@st.fragment
+def render_entry_inputs():
+    """
+    Sidebar entry price inputs for every open position. Editing one reruns just this fragment;
+    a changed price then reruns the page once, since the header breakeven strip, the P&L block
+    and the spread chart all read it.
+    """
+    changed = False
+    for spread_name, (key, _, entry_max, _) in POSITION_INPUTS.items():
+        if spread_name not in SPREADS_CONFIG:
+            continue
+        entry = st.number_input(
+            t(f'{key}_entry'),
+            min_value=0.0, max_value=entry_max,
+            value=st.session_state[f'{key}_entry_price'],
+            step=0.01, format="%.2f",
+            key=f"{key}_entry_input"
+        )
+        if entry != st.session_state[f'{key}_entry_price']:
+            st.session_state[f'{key}_entry_price'] = entry
+            changed = True
+    if changed:
+        st.rerun(scope="app")
 
 with st.sidebar:
     # Language toggle
@@ -1108,55 +1222,8 @@ with st.sidebar:
         key="entry_date_input"
     )
     st.session_state.trade_entry_date = trade_entry_date
+    render_entry_inputs()
     
-    col_feb_entry, col_mar_entry = st.columns(2)
-    with col_feb_entry:
-        feb_entry = st.number_input(
-            t('feb_entry'),
-            min_value=0.0, max_value=5.0,
-            value=st.session_state.feb_entry_price,
-            step=0.01, format="%.2f",
-            key="feb_entry_input"
-        )
-        st.session_state.feb_entry_price = feb_entry
-    
-    with col_mar_entry:
-        mar_entry = st.number_input(
-            t('mar_entry'),
-            min_value=0.0, max_value=5.0,
-            value=st.session_state.mar_entry_price,
-            step=0.01, format="%.2f",
-            key="mar_entry_input"
-        )
-        st.session_state.mar_entry_price = mar_entry
-    
-    mar_2040_entry = st.number_input(
-        t('mar_2040_entry'),
-        min_value=0.0, max_value=20.0,
-        value=st.session_state.mar_2040_entry_price,
-        step=0.01, format="%.2f",
-        key="mar_2040_entry_input"
-    )
-    st.session_state.mar_2040_entry_price = mar_2040_entry
-
-    may_entry = st.number_input(
-        t('may_entry'),
-        min_value=0.0, max_value=20.0,
-        value=st.session_state.may_entry_price,
-        step=0.01, format="%.2f",
-        key="may_entry_input"
-    )
-    st.session_state.may_entry_price = may_entry
-
-    jun_entry = st.number_input(
-        t('jun_entry'),
-        min_value=0.0, max_value=5.0,
-        value=st.session_state.jun_entry_price,
-        step=0.01, format="%.2f",
-        key="jun_entry_input"
-    )
-    st.session_state.jun_entry_price = jun_entry
-
     st.markdown("---")
     
     # Data Settings
@@ -1172,8 +1239,7 @@ with st.sidebar:
     st.markdown("")
     
     if st.button(t('refresh'), width='stretch'):
-        st.cache_data.clear()
-        st.rerun()
+        st.rerun()  # Loaders key on file versions - a rerun picks up rewritten files
 
 active_spreads = SPREAD_KEYS.copy()
 
@@ -1182,175 +1248,69 @@ active_spreads = SPREAD_KEYS.copy()
 if full_df is not None:
     active_spreads = [
         s for s in active_spreads
-        if f"{SPREADS_CONFIG[s]['prefix']}_Spread" in full_df.columns
+        if SPREADS_CONFIG[s]["columns"]["Spread"] in full_df.columns
     ]
 
-# Build TRADE_CONFIG
-TRADE_CONFIG = {
-    "Feb 2026": {
-        "entry_date": st.session_state.trade_entry_date.strftime("%Y-%m-%d"),
-        "entry_price": st.session_state.feb_entry_price,
-        "expiry_date": "2026-02-18",
-    },
-    "Mar 2026": {
-        "entry_date": st.session_state.trade_entry_date.strftime("%Y-%m-%d"),
-        "entry_price": st.session_state.mar_entry_price,
-        "expiry_date": "2026-03-18",
-    },
-    "Mar 2026 20-40": {
-        "entry_date": st.session_state.trade_entry_date.strftime("%Y-%m-%d"),
-        "entry_price": st.session_state.mar_2040_entry_price,
-        "expiry_date": "2026-03-18",
-    },
-    "May 2026": {
-        "entry_date": "2026-04-15",
-        "entry_price": st.session_state.may_entry_price,
-        "expiry_date": "2026-05-19",
-    },
-    "Jun 2026": {
-        "entry_date": "2026-05-28",
-        "entry_price": st.session_state.jun_entry_price,
-        "expiry_date": "2026-06-17",
-    },
-}
+def trade_config(spread_name):
+    """Entry date / price / expiry of the position held in `spread_name`, or None."""
+    if spread_name not in POSITION_INPUTS:
+        return None
+    key, _, _, entry_date = POSITION_INPUTS[spread_name]
+    return {
+        "entry_date": entry_date or st.session_state.trade_entry_date.strftime("%Y-%m-%d"),
+        "entry_price": st.session_state[f'{key}_entry_price'],
+        "expiry_date": SPREADS_CONFIG[spread_name]["expiry_date"],
+    }
 
-# --- UPDATED: Calculate breakeven distances using FUTURES ---
-feb_be = 20 + st.session_state.feb_entry_price
-mar_be = 20 + st.session_state.mar_entry_price
-mar_2040_be = 20 + st.session_state.mar_2040_entry_price
-may_be = 25 + st.session_state.may_entry_price
-jun_be = 20 + st.session_state.jun_entry_price
+def breakeven_html(spread_name, entry_price, futures):
+    """Breakeven (long strike + debit) and the futures' distance to it, with a tooltip."""
+    key = POSITION_INPUTS[spread_name][0]
+    be = SPREADS_CONFIG[spread_name]["long_strike"] + entry_price
+    if not futures or futures <= 0:
+        return f'<span style="opacity:0.6;">{t(f"{key}_be_label")}:</span> {be:.2f}'
+    distance = ((be - futures) / futures) * 100
+    be_color = "#ef5350" if distance > 0 else "#26a69a"
+    if st.session_state.language == 'en':
+        tooltip_main = f"VIX futures needs to rise {distance:.1f}% to reach breakeven" if distance > 0 else f"VIX futures is {abs(distance):.1f}% above breakeven"
+        tooltip_hint = "Below breakeven - Loss zone" if distance > 0 else "Above breakeven - Profit zone"
+        be_label_text = "Breakeven"
+    else:
+        tooltip_main = f"VIX期货需上涨 {distance:.1f}% 才能达到保本点" if distance > 0 else f"VIX期货已高于保本点 {abs(distance):.1f}%"
+        tooltip_hint = "低于保本点 - 亏损区" if distance > 0 else "高于保本点 - 盈利区"
+        be_label_text = "保本点"
+    return f'''<span class="tooltip-container"><span style="opacity:0.6;">{t(f"{key}_be_label")}:</span> <span style="color:{be_color};">{be:.2f} ({distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {be:.2f}</div><div class="tooltip-value">{tooltip_main}</div><div class="tooltip-hint">{tooltip_hint}</div></span></span>'''
 
-# Use corresponding futures for each spread's breakeven calculation
-feb_distance = ((feb_be - feb_futures) / feb_futures) * 100 if feb_futures and feb_futures > 0 else None
-mar_distance = ((mar_be - mar_futures) / mar_futures) * 100 if mar_futures and mar_futures > 0 else None
-mar_2040_distance = ((mar_2040_be - mar_2040_futures) / mar_2040_futures) * 100 if mar_2040_futures and mar_2040_futures > 0 else None
-may_distance = ((may_be - may_futures) / may_futures) * 100 if may_futures and may_futures > 0 else None
-jun_distance = ((jun_be - jun_futures) / jun_futures) * 100 if jun_futures and jun_futures > 0 else None
 
 # --- 9. MAIN DASHBOARD ---
 
 # Header with VIX Futures info
-futures_available = feb_futures is not None or mar_futures is not None or mar_2040_futures is not None or may_futures is not None or jun_futures is not None
-
-# Build header HTML
-header_parts = []
-header_parts.append(f'<div class="header-subtitle">{t("header_subtitle")}</div>')
-header_parts.append(f'<div class="header-title">{t("header_title")}</div>')
-
-# Build futures section
 futures_section = ""
-if futures_available:
+if futures_quotes or vix_spot_available:
     futures_items = []
-    
-    # Get translated month labels
-    if st.session_state.language == 'zh':
-        feb_label = "2月"
-        mar_label = "3月"
-        may_label = "5月"
-        jun_label = "6月"
-    else:
-        feb_label = "FEB"
-        mar_label = "MAR"
-        may_label = "MAY"
-        jun_label = "JUN"
-    
+
     # VIX Spot (only if valid)
     if vix_spot_available and latest_vix_spot and latest_vix_spot > 0:
         futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">VIX SPOT</div><div style="font-size:18px;font-weight:600;">{latest_vix_spot:.2f}</div></div>')
-    
-    # Feb Futures
-    if feb_futures and feb_futures > 0:
-        f_color = "#26a69a" if feb_futures_change >= 0 else "#ef5350"
-        f_arrow = "+" if feb_futures_change >= 0 else ""
-        futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">{feb_label} UXG26</div><div style="font-size:18px;font-weight:600;">{feb_futures:.2f}</div><div style="font-size:11px;color:{f_color};">{f_arrow}{feb_futures_change:.2f}</div></div>')
-    
-    # Mar Futures
-    if mar_futures and mar_futures > 0:
-        f_color = "#26a69a" if mar_futures_change >= 0 else "#ef5350"
-        f_arrow = "+" if mar_futures_change >= 0 else ""
-        futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">{mar_label} UXH26</div><div style="font-size:18px;font-weight:600;">{mar_futures:.2f}</div><div style="font-size:11px;color:{f_color};">{f_arrow}{mar_futures_change:.2f}</div></div>')
-
-    # May Futures
-    if may_futures and may_futures > 0:
-        f_color = "#26a69a" if may_futures_change >= 0 else "#ef5350"
-        f_arrow = "+" if may_futures_change >= 0 else ""
-        futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">{may_label} UXK26</div><div style="font-size:18px;font-weight:600;">{may_futures:.2f}</div><div style="font-size:11px;color:{f_color};">{f_arrow}{may_futures_change:.2f}</div></div>')
-
-    # Jun Futures
-    if jun_futures and jun_futures > 0:
-        f_color = "#26a69a" if jun_futures_change >= 0 else "#ef5350"
-        f_arrow = "+" if jun_futures_change >= 0 else ""
-        futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">{jun_label} UXM26</div><div style="font-size:18px;font-weight:600;">{jun_futures:.2f}</div><div style="font-size:11px;color:{f_color};">{f_arrow}{jun_futures_change:.2f}</div></div>')
+
+    # One block per futures contract in the registry, labelled with its month and ticker
+    for fut_ticker, (expiry_date, fut_val, fut_change) in futures_quotes.items():
+        expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
+        month_label = f"{expiry.month}月" if st.session_state.language == 'zh' else expiry.strftime("%b").upper()
+        f_color = "#26a69a" if fut_change >= 0 else "#ef5350"
+        f_arrow = "+" if fut_change >= 0 else ""
+        futures_items.append(f'<div style="text-align:center;"><div style="opacity:0.6;font-size:10px;">{month_label} {fut_ticker}</div><div style="font-size:18px;font-weight:600;">{fut_val:.2f}</div><div style="font-size:11px;color:{f_color};">{f_arrow}{fut_change:.2f}</div></div>')
 
     if futures_items:
         futures_section = '<div style="display:flex;gap:24px;font-family:monospace;">' + ''.join(futures_items) + '</div>'
 
-# Build breakeven section with tooltips
-be_section = ""
+# Breakeven strip from the entry prices in session_state (render_entry_inputs reruns the page
+# when one changes, so the strip always matches the sidebar)
 be_items = []
-if feb_futures and feb_futures > 0 and feb_distance is not None:
-    be_color = "#ef5350" if feb_distance > 0 else "#26a69a"
-    # Tooltip text based on language
-    if st.session_state.language == 'en':
-        feb_tooltip_main = f"VIX futures needs to rise {feb_distance:.1f}% to reach breakeven" if feb_distance > 0 else f"VIX futures is {abs(feb_distance):.1f}% above breakeven"
-        feb_tooltip_hint = "Below breakeven - Loss zone" if feb_distance > 0 else "Above breakeven - Profit zone"
-        be_label_text = "Breakeven"
-    else:
-        feb_tooltip_main = f"VIX期货需上涨 {feb_distance:.1f}% 才能达到保本点" if feb_distance > 0 else f"VIX期货已高于保本点 {abs(feb_distance):.1f}%"
-        feb_tooltip_hint = "低于保本点 - 亏损区" if feb_distance > 0 else "高于保本点 - 盈利区"
-        be_label_text = "保本点"
-    be_items.append(f'''<span class="tooltip-container"><span style="opacity:0.6;">{t("feb_be_label")}:</span> <span style="color:{be_color};">{feb_be:.2f} ({feb_distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {feb_be:.2f}</div><div class="tooltip-value">{feb_tooltip_main}</div><div class="tooltip-hint">{feb_tooltip_hint}</div></span></span>''')
-
-if mar_futures and mar_futures > 0 and mar_distance is not None:
-    be_color = "#ef5350" if mar_distance > 0 else "#26a69a"
-    # Tooltip text based on language
-    if st.session_state.language == 'en':
-        mar_tooltip_main = f"VIX futures needs to rise {mar_distance:.1f}% to reach breakeven" if mar_distance > 0 else f"VIX futures is {abs(mar_distance):.1f}% above breakeven"
-        mar_tooltip_hint = "Below breakeven - Loss zone" if mar_distance > 0 else "Above breakeven - Profit zone"
-        be_label_text = "Breakeven"
-    else:
-        mar_tooltip_main = f"VIX期货需上涨 {mar_distance:.1f}% 才能达到保本点" if mar_distance > 0 else f"VIX期货已高于保本点 {abs(mar_distance):.1f}%"
-        mar_tooltip_hint = "低于保本点 - 亏损区" if mar_distance > 0 else "高于保本点 - 盈利区"
-        be_label_text = "保本点"
-    be_items.append(f'''<span class="tooltip-container"><span style="opacity:0.6;">{t("mar_be_label")}:</span> <span style="color:{be_color};">{mar_be:.2f} ({mar_distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {mar_be:.2f}</div><div class="tooltip-value">{mar_tooltip_main}</div><div class="tooltip-hint">{mar_tooltip_hint}</div></span></span>''')
-
-if mar_2040_futures and mar_2040_futures > 0 and mar_2040_distance is not None:
-    be_color = "#ef5350" if mar_2040_distance > 0 else "#26a69a"
-    if st.session_state.language == 'en':
-        m2040_tooltip_main = f"VIX futures needs to rise {mar_2040_distance:.1f}% to reach breakeven" if mar_2040_distance > 0 else f"VIX futures is {abs(mar_2040_distance):.1f}% above breakeven"
-        m2040_tooltip_hint = "Below breakeven - Loss zone" if mar_2040_distance > 0 else "Above breakeven - Profit zone"
-        be_label_text = "Breakeven"
-    else:
-        m2040_tooltip_main = f"VIX期货需上涨 {mar_2040_distance:.1f}% 才能达到保本点" if mar_2040_distance > 0 else f"VIX期货已高于保本点 {abs(mar_2040_distance):.1f}%"
-        m2040_tooltip_hint = "低于保本点 - 亏损区" if mar_2040_distance > 0 else "高于保本点 - 盈利区"
-        be_label_text = "保本点"
-    be_items.append(f'''<span class="tooltip-container"><span style="opacity:0.6;">{t("mar_2040_be_label")}:</span> <span style="color:{be_color};">{mar_2040_be:.2f} ({mar_2040_distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {mar_2040_be:.2f}</div><div class="tooltip-value">{m2040_tooltip_main}</div><div class="tooltip-hint">{m2040_tooltip_hint}</div></span></span>''')
-
-if may_futures and may_futures > 0 and may_distance is not None:
-    be_color = "#ef5350" if may_distance > 0 else "#26a69a"
-    if st.session_state.language == 'en':
-        may_tooltip_main = f"VIX futures needs to rise {may_distance:.1f}% to reach breakeven" if may_distance > 0 else f"VIX futures is {abs(may_distance):.1f}% above breakeven"
-        may_tooltip_hint = "Below breakeven - Loss zone" if may_distance > 0 else "Above breakeven - Profit zone"
-        be_label_text = "Breakeven"
-    else:
-        may_tooltip_main = f"VIX期货需上涨 {may_distance:.1f}% 才能达到保本点" if may_distance > 0 else f"VIX期货已高于保本点 {abs(may_distance):.1f}%"
-        may_tooltip_hint = "低于保本点 - 亏损区" if may_distance > 0 else "高于保本点 - 盈利区"
-        be_label_text = "保本点"
-    be_items.append(f'''<span class="tooltip-container"><span style="opacity:0.6;">{t("may_be_label")}:</span> <span style="color:{be_color};">{may_be:.2f} ({may_distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {may_be:.2f}</div><div class="tooltip-value">{may_tooltip_main}</div><div class="tooltip-hint">{may_tooltip_hint}</div></span></span>''')
-
-if jun_futures and jun_futures > 0 and jun_distance is not None:
-    be_color = "#ef5350" if jun_distance > 0 else "#26a69a"
-    if st.session_state.language == 'en':
-        jun_tooltip_main = f"VIX futures needs to rise {jun_distance:.1f}% to reach breakeven" if jun_distance > 0 else f"VIX futures is {abs(jun_distance):.1f}% above breakeven"
-        jun_tooltip_hint = "Below breakeven - Loss zone" if jun_distance > 0 else "Above breakeven - Profit zone"
-        be_label_text = "Breakeven"
-    else:
-        jun_tooltip_main = f"VIX期货需上涨 {jun_distance:.1f}% 才能达到保本点" if jun_distance > 0 else f"VIX期货已高于保本点 {abs(jun_distance):.1f}%"
-        jun_tooltip_hint = "低于保本点 - 亏损区" if jun_distance > 0 else "高于保本点 - 盈利区"
-        be_label_text = "保本点"
-    be_items.append(f'''<span class="tooltip-container"><span style="opacity:0.6;">{t("jun_be_label")}:</span> <span style="color:{be_color};">{jun_be:.2f} ({jun_distance:+.1f}%)</span><span class="tooltip-text"><div class="tooltip-label">{be_label_text}: {jun_be:.2f}</div><div class="tooltip-value">{jun_tooltip_main}</div><div class="tooltip-hint">{jun_tooltip_hint}</div></span></span>''')
-
+for _spread_name, (_key, _, _, _) in POSITION_INPUTS.items():
+    _quote = futures_quotes.get(SPREADS_CONFIG[_spread_name]["futures_ticker"]) if _spread_name in SPREADS_CONFIG else None
+    if _quote:
+        be_items.append(breakeven_html(_spread_name, st.session_state[f'{_key}_entry_price'], _quote[1]))
+be_section = ""
 if be_items:
     be_section = '<div style="font-family:monospace;font-size:11px;">' + ' | '.join(be_items) + '</div>'
 
@@ -1387,6 +1347,18 @@ current_date_str = latest['Date'].strftime('%Y-%m-%d')
 
 st.caption(f"{t('last_updated')}: {current_date_str}")
 
+# --- LIVE MARKS (only while the fetcher's --stream mode is publishing) ---
+live = load_live_marks(LIVE_MARKS_PATH)
+if live:
+    live_spreads = [(s, live["spreads"].get(SPREADS_CONFIG[s]["prefix"])) for s in active_spreads]
+    live_spreads = [(s, m) for s, m in live_spreads if m and m.get("mid") is not None]
+    if live_spreads:
+        st.caption(f"🔴 {t('live_marks')} · {live['time'][11:]}")
+        for col, (s, m) in zip(st.columns(len(live_spreads)), live_spreads):
+            col.metric(SPREADS_CONFIG_NAMES[st.session_state.language][s], f"{m['mid']:.2f}")
+            if m.get("bid") is not None and m.get("ask") is not None:
+                col.caption(f"{m['bid']:.2f} / {m['ask']:.2f}")
+
 # --- VIX TERM STRUCTURE + VVIX ---
 ts_cols = [f"UX{i}" for i in range(1, 9) if f"UX{i}" in full_df.columns]
 if ts_cols:
@@ -1421,39 +1393,8 @@ if ts_cols:
             </span>
             """, unsafe_allow_html=True)
 
-            ts_fig = go.Figure()
-            x_labels = list(latest_ts.keys())
-            y_latest = [latest_ts[c] for c in x_labels]
-            y_prev = [prev_ts.get(c, latest_ts[c]) for c in x_labels]
-
-            ts_fig.add_trace(go.Scatter(
-                x=x_labels, y=y_prev,
-                mode='lines+markers', name='Prev',
-                line=dict(color='rgba(158,158,158,0.5)', width=1.5, dash='dot'),
-                marker=dict(size=6),
-                hovertemplate='%{x}: %{y:.2f}<extra>Prev</extra>'
-            ))
-            ts_fig.add_trace(go.Scatter(
-                x=x_labels, y=y_latest,
-                mode='lines+markers+text', name='Current',
-                line=dict(color=state_color, width=2.5),
-                marker=dict(size=9),
-                text=[f"{v:.2f}" for v in y_latest],
-                textposition="top center",
-                textfont=dict(size=10),
-                hovertemplate='%{x}: %{y:.2f}<extra>Current</extra>'
-            ))
-            ts_fig.update_layout(
-                height=260,
-                plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="JetBrains Mono, Noto Sans SC, monospace", size=11),
-                margin=dict(l=40, r=20, t=30, b=30),
-                showlegend=True,
-                legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1, bgcolor='rgba(0,0,0,0)'),
-                hovermode='x unified'
-            )
-            ts_fig.update_xaxes(gridcolor='rgba(128,128,128,0.15)', showgrid=True)
-            ts_fig.update_yaxes(gridcolor='rgba(128,128,128,0.15)', showgrid=True)
+            ts_fig = cached_figure("term_structure", (st.session_state.get("data_version"),),
+                                   lambda: create_term_structure_chart(latest_ts, prev_ts, state_color))
             st.plotly_chart(ts_fig, use_container_width=True, key="term_structure_chart")
 
         with col_vvix:
@@ -1492,7 +1433,7 @@ st.markdown("---")
 
 # --- POST-MORTEM SECTIONS (renders for each expired spread with CSV data) ---
 @st.cache_data
-def load_pm_data(path):
+def load_pm_data(path, fingerprint=None):
     df = pd.read_csv(path)
     df["Date"] = pd.to_datetime(df["Date"])
     return df
@@ -1503,7 +1444,7 @@ def render_post_mortem(pm_conf):
     if not csv_path.exists():
         return
 
-    pm_df = load_pm_data(csv_path)
+    pm_df = load_pm_data(csv_path, file_fingerprint(csv_path))
     entry_price = pm_conf["entry_price"]
     K1 = pm_conf["long_strike"]
     K2 = pm_conf["short_strike"]
@@ -1691,416 +1632,548 @@ def render_post_mortem(pm_conf):
 for _pm_conf in POST_MORTEM_CONFIG:
     render_post_mortem(_pm_conf)
 
-# --- TABS & METRICS ---
-tab_names = [SPREADS_CONFIG_NAMES[st.session_state.language][s] for s in active_spreads]
-tabs = st.tabs(tab_names)
-
-for tab, spread_name in zip(tabs, active_spreads):
-    with tab:
-        prefix = SPREADS_CONFIG[spread_name]["prefix"]
-        
-        # Get current futures for this spread from the config
-        futures_col = SPREADS_CONFIG[spread_name]["futures_col"]
-        futures_ticker = SPREADS_CONFIG[spread_name]["futures_ticker"]
-        
-        # Get current futures value - handle NaN and 0
-        current_futures = None
-        prev_futures_val = None
-        if futures_col in full_df.columns:
-            fut_val = latest.get(futures_col, None)
-            if fut_val is not None and not pd.isna(fut_val) and fut_val > 0:
-                current_futures = float(fut_val)
-                # Get previous futures value
-                prev_fut = prev.get(futures_col, None)
-                if prev_fut is not None and not pd.isna(prev_fut) and prev_fut > 0:
-                    prev_futures_val = float(prev_fut)
-                else:
-                    prev_futures_val = current_futures
-        
-        # 1. PREPARE DATA
-        def get_val(row, key, default=0.0):
-            val = row.get(key, default)
-            if val is None or (isinstance(val, float) and pd.isna(val)):
-                return default
-            return float(val)
-            
-        cur_long = get_val(latest, f"{prefix}_Long_Price")
-        cur_short = get_val(latest, f"{prefix}_Short_Price")
-        cur_spread = get_val(latest, f"{prefix}_Spread")
-        cur_l_vol = get_val(latest, f"{prefix}_Long_Volume")
-        cur_s_vol = get_val(latest, f"{prefix}_Short_Volume")
-        cur_l_oi = get_val(latest, f"{prefix}_Long_OI")
-        cur_s_oi = get_val(latest, f"{prefix}_Short_OI")
-
-        prev_long = get_val(prev, f"{prefix}_Long_Price")
-        prev_short = get_val(prev, f"{prefix}_Short_Price")
-        prev_spread = get_val(prev, f"{prefix}_Spread")
-        
-        d_long = cur_long - prev_long
-        d_short = cur_short - prev_short
-        d_spread = cur_spread - prev_spread
-        
-        # Calculate Valuation
-        spread_history = df_chart[f"{prefix}_Spread"].dropna()
-        z_score, percentile = calculate_valuation(spread_history, cur_spread)
+# --- SPREAD TAB FRAGMENTS ---
+# The interactive parts of each tab are fragments: the payoff simulator and the strike explorer
+# rerun only that block, not the header, the other charts and tabs. Entry prices come from the
+# sidebar (render_entry_inputs).
+def render_position(spread_name, df_chart, cur_spread, current_futures, long_iv, short_iv):
+    """Breakeven, P&L block and spread chart - everything that reads the entry price."""
+    prefix = SPREADS_CONFIG[spread_name]["prefix"]
+    trade_conf = trade_config(spread_name)
+    if trade_conf:
+        st.markdown(f'<div style="font-family:monospace;font-size:11px;margin-bottom:8px;">'
+                    f'{breakeven_html(spread_name, trade_conf["entry_price"], current_futures)}</div>',
+                    unsafe_allow_html=True)
+
+        # DTE / Days Held are calendar-live (tick down even if CSV is stale).
+        # Current price stays tied to the latest CSV row (data-driven).
+        live_today_str = datetime.now().strftime("%Y-%m-%d")
+        pnl_data = calculate_pnl(
+            entry_price=trade_conf["entry_price"],
+            current_price=cur_spread,
+            entry_date=trade_conf["entry_date"],
+            current_date=live_today_str,
+            expiry_date=trade_conf["expiry_date"]
+        )
 
-        # 2. RENDER METRICS (4 COLUMNS - added futures)
-        c1, c2, c3, c4 = st.columns(4)
-        
-        def render_metric(col, label, val, delta, vol=None, is_futures=False, oi=None):
-            delta_cls = "positive" if delta > 0 else "negative" if delta < 0 else "neutral"
-            sign = "+" if delta > 0 else ""
-            arrow = "▲" if delta > 0 else "▼" if delta < 0 else "−"
-
-            html = [
-                f'<div class="metric-card">',
-                f'<div class="metric-label">{label}</div>',
-                f'<div class="metric-value">{val:.2f}</div>',
-                f'<div class="metric-delta delta-{delta_cls}">{arrow} {sign}{delta:.2f}</div>'
-            ]
-            if vol is not None:
-                liq = f'{t("volume")}: {int(vol):,}'
-                if oi is not None and oi > 0:
-                    liq += f' &nbsp;|&nbsp; {t("oi_label")}: {int(oi):,}'
-                html.append(f'<div class="volume-text">{liq}</div>')
-            else:
-                html.append('<div class="volume-text">&nbsp;</div>')
-            html.append('</div>')
-            col.markdown("".join(html), unsafe_allow_html=True)
-        
-        # Show VIX Futures for this spread (FIRST COLUMN)
-        if current_futures is not None and current_futures > 0:
-            d_futures = current_futures - prev_futures_val if prev_futures_val else 0
-            render_metric(c1, f"{t('vix_futures')} ({futures_ticker})", current_futures, d_futures, is_futures=True)
-        else:
-            c1.markdown(f"""
-            <div class="metric-card" style="border-color: rgba(239, 83, 80, 0.4);">
-                <div class="metric-label">{t('vix_futures')} ({futures_ticker})</div>
-                <div class="metric-value" style="font-size: 20px; opacity: 0.5;">N/A</div>
-                <div class="volume-text" style="color: #ef5350;">{t('no_vix_data')}</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        # Dynamic leg labels based on strikes
-        K1 = SPREADS_CONFIG[spread_name]["long_strike"]
-        K2 = SPREADS_CONFIG[spread_name]["short_strike"]
-        if st.session_state.language == 'en':
-            long_label = f"Long Leg (C{K1})"
-            short_label = f"Short Leg (C{K2})"
-        else:
-            long_label = f"多头 (C{K1})"
-            short_label = f"空头 (C{K2})"
-            
-        render_metric(c2, long_label, cur_long, d_long, cur_l_vol, oi=cur_l_oi)
-        render_metric(c3, short_label, cur_short, d_short, cur_s_vol, oi=cur_s_oi)
-        render_metric(c4, t('net_spread'), cur_spread, d_spread)
-        
-        # 3. VALUATION LINE
-        if z_score <= -1.0: status = t('cheap')
-        elif z_score >= 1.0: status = t('expensive')
-        else: status = t('fair')
-        
-        if st.session_state.language == 'en':
-            stat_tooltip_label = "How to read this"
-            stat_tooltip_line1 = "<b>Z-score:</b> Distance from average (in std deviations)"
-            stat_tooltip_line2 = "<b>Percentile:</b> % of historical prices that were lower"
-            stat_tooltip_line3 = "<b>CHEAP:</b> Z ≤ -1 | <b>FAIR:</b> -1 to 1 | <b>RICH:</b> Z ≥ 1"
+        if pnl_data["pnl"] > 0.01:
+            pnl_color = "#26a69a"
+        elif pnl_data["pnl"] < -0.01:
+            pnl_color = "#ef5350"
         else:
-            stat_tooltip_label = "如何解读"
-            stat_tooltip_line1 = "<b>Z分数:</b> 与均值的距离（以标准差计）"
-            stat_tooltip_line2 = "<b>百分位:</b> 历史上低于当前价格的比例"
-            stat_tooltip_line3 = "<b>低估:</b> Z ≤ -1 | <b>合理:</b> -1 到 1 | <b>高估:</b> Z ≥ 1"
-            
+            pnl_color = "#9e9e9e"
+
+        pnl_sign = "+" if pnl_data["pnl"] >= 0 else ""
+        pct_sign = "+" if pnl_data["pnl_pct"] >= 0 else ""
+
+        total_days = pnl_data['days_held_cal'] + pnl_data['dte_cal']
+        progress_pct = (pnl_data['days_held_cal'] / total_days * 100) if total_days > 0 else 0
+
         st.markdown(f"""
-        <div style="text-align: left; margin-top: 8px; margin-bottom: 16px;">
-            <span class="tooltip-container">
-                <span class="volume-text" style="cursor: help;">
-                    {t('valuation_title')}: <b>{status}</b> (Z-score: {z_score:.1f}σ | Percentile: {int(percentile)}%) ⓘ
-                </span>
-                <span class="tooltip-text" style="width: 280px;">
-                    <div class="tooltip-label">{stat_tooltip_label}</div>
-                    <div style="font-size: 11px; line-height: 1.8;">{stat_tooltip_line1}</div>
-                    <div style="font-size: 11px; line-height: 1.8;">{stat_tooltip_line2}</div>
-                    <div class="tooltip-hint">{stat_tooltip_line3}</div>
-                </span>
-            </span>
+        <div style="display: flex; justify-content: space-between; align-items: center; padding: 8px 16px; border: 1px solid rgba(128,128,128,0.25); border-radius: 8px; background: rgba(128,128,128,0.06); margin-bottom: 8px;">
+            <span style="font-size: 12px; font-weight: 600; letter-spacing: 1px; text-transform: uppercase; opacity: 0.8;">📊 {t('pnl_title')}</span>
+            <span style="font-family: 'JetBrains Mono', monospace; font-size: 11px; opacity: 0.6;">{pnl_data['days_held_trd']}d {t('held_to_expiry')} {pnl_data['dte_trd']}d {t('to_expiry')}</span>
         </div>
         """, unsafe_allow_html=True)
 
-        # --- GREEKS SECTION (spread-level net Greeks + leg IVs) ---
-        def _latest_greek(col):
-            if col not in full_df.columns:
-                return None
-            v = latest.get(col)
-            if v is None or pd.isna(v):
-                return None
-            try:
-                fv = float(v)
-            except (TypeError, ValueError):
-                return None
-            return fv if fv != 0 else None
-
-        net_delta = _latest_greek(f"{prefix}_Net_Delta")
-        net_gamma = _latest_greek(f"{prefix}_Net_Gamma")
-        net_vega  = _latest_greek(f"{prefix}_Net_Vega")
-        net_theta = _latest_greek(f"{prefix}_Net_Theta")
-        long_iv   = _latest_greek(f"{prefix}_Long_IV")
-        short_iv  = _latest_greek(f"{prefix}_Short_IV")
-
-        if any(g is not None for g in (net_delta, net_gamma, net_vega, net_theta, long_iv, short_iv)):
-            st.markdown(f"""
-            <div style="margin-top:8px; margin-bottom:6px;">
-                <span class="tooltip-container">
-                    <span style="font-weight:600; cursor:help; font-size:13px;">🔢 {t('greeks_title')} ⓘ</span>
-                    <span class="tooltip-text" style="width:280px;">
-                        <div class="tooltip-label">{t('greeks_title')}</div>
-                        <div style="font-size:11px; line-height:1.6;">{t('greeks_tooltip')}</div>
-                    </span>
-                </span>
-            </div>
-            """, unsafe_allow_html=True)
-
-            g1, g2, g3, g4, g5 = st.columns(5)
+        col_entry, col_pnl, col_time = st.columns([1, 1.2, 1])
 
-            def _render_greek(col, label, val, fmt="{:+.3f}", good_sign=None):
-                if val is None:
-                    col.markdown(f"""
-                    <div class="metric-card" style="padding:14px;">
-                        <div class="metric-label">{label}</div>
-                        <div style="font-family:'JetBrains Mono', monospace; font-size:20px; opacity:0.4;">—</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    return
-                if good_sign is None:
-                    color = "#ffffff"
-                elif good_sign == "pos":
-                    color = "#26a69a" if val >= 0 else "#ef5350"
-                elif good_sign == "neg":
-                    color = "#26a69a" if val <= 0 else "#ef5350"
-                col.markdown(f"""
-                <div class="metric-card" style="padding:14px;">
-                    <div class="metric-label">{label}</div>
-                    <div style="font-family:'JetBrains Mono', monospace; font-size:20px; font-weight:700; color:{color};">{fmt.format(val)}</div>
+        with col_entry:
+            st.markdown(f"""
+            <div style="padding: 0 8px;">
+                <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
+                    <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('entry_date')}</span>
+                    <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{trade_conf['entry_date']}</span>
                 </div>
-                """, unsafe_allow_html=True)
-
-            _render_greek(g1, t('net_delta'), net_delta, "{:+.3f}", "pos")
-            _render_greek(g2, t('net_gamma'), net_gamma, "{:+.4f}")
-            _render_greek(g3, t('net_vega'),  net_vega,  "{:+.3f}", "pos")
-            _render_greek(g4, t('net_theta'), net_theta, "{:+.3f}", None)
-
-            # IV cell shows both legs
-            if long_iv is not None or short_iv is not None:
-                li = f"{long_iv:.1f}" if long_iv is not None else "—"
-                si = f"{short_iv:.1f}" if short_iv is not None else "—"
-                g5.markdown(f"""
-                <div class="metric-card" style="padding:14px;">
-                    <div class="metric-label">{t('iv_long_short')}</div>
-                    <div style="font-family:'JetBrains Mono', monospace; font-size:20px; font-weight:700;">{li} / {si}</div>
+                <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
+                    <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('entry_px')}</span>
+                    <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{trade_conf['entry_price']:.2f}</span>
                 </div>
-                """, unsafe_allow_html=True)
-            else:
-                g5.markdown(f"""
-                <div class="metric-card" style="padding:14px;">
-                    <div class="metric-label">{t('iv_long_short')}</div>
-                    <div style="font-family:'JetBrains Mono', monospace; font-size:20px; opacity:0.4;">—</div>
+                <div style="display: flex; justify-content: space-between; padding: 8px 0;">
+                    <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('current_px')}</span>
+                    <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{cur_spread:.2f}</span>
                 </div>
-                """, unsafe_allow_html=True)
+            </div>
+            """, unsafe_allow_html=True)
 
-        # --- P&L TRACKING SECTION ---
-        trade_conf = TRADE_CONFIG.get(spread_name)
-        if trade_conf:
-            # DTE / Days Held are calendar-live (tick down even if CSV is stale).
-            # Current price stays tied to the latest CSV row (data-driven).
-            live_today_str = datetime.now().strftime("%Y-%m-%d")
-            pnl_data = calculate_pnl(
-                entry_price=trade_conf["entry_price"],
-                current_price=cur_spread,
-                entry_date=trade_conf["entry_date"],
-                current_date=live_today_str,
-                expiry_date=trade_conf["expiry_date"]
-            )
-            
-            if pnl_data["pnl"] > 0.01:
-                pnl_color = "#26a69a"
-            elif pnl_data["pnl"] < -0.01:
-                pnl_color = "#ef5350"
-            else:
-                pnl_color = "#9e9e9e"
-            
-            pnl_sign = "+" if pnl_data["pnl"] >= 0 else ""
-            pct_sign = "+" if pnl_data["pnl_pct"] >= 0 else ""
-            
-            total_days = pnl_data['days_held_cal'] + pnl_data['dte_cal']
-            progress_pct = (pnl_data['days_held_cal'] / total_days * 100) if total_days > 0 else 0
-            
+        with col_pnl:
             st.markdown(f"""
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 8px 16px; border: 1px solid rgba(128,128,128,0.25); border-radius: 8px; background: rgba(128,128,128,0.06); margin-bottom: 8px;">
-                <span style="font-size: 12px; font-weight: 600; letter-spacing: 1px; text-transform: uppercase; opacity: 0.8;">📊 {t('pnl_title')}</span>
-                <span style="font-family: 'JetBrains Mono', monospace; font-size: 11px; opacity: 0.6;">{pnl_data['days_held_trd']}d {t('held_to_expiry')} {pnl_data['dte_trd']}d {t('to_expiry')}</span>
+            <div style="display: flex; flex-direction: column; justify-content: center; align-items: center; background: rgba(128,128,128,0.1); border-radius: 8px; padding: 16px; height: 100%; min-height: 100px;">
+                <div style="font-size: 11px; opacity: 0.6; text-transform: uppercase; margin-bottom: 6px;">{t('pnl')}</div>
+                <div style="font-family: 'JetBrains Mono', monospace; font-size: 28px; font-weight: 700; color: {pnl_color};">{pnl_sign}{pnl_data['pnl']:.2f}</div>
+                <div style="font-family: 'JetBrains Mono', monospace; font-size: 16px; color: {pnl_color}; margin-top: 4px;">{pct_sign}{pnl_data['pnl_pct']:.1f}%</div>
             </div>
             """, unsafe_allow_html=True)
-            
-            col_entry, col_pnl, col_time = st.columns([1, 1.2, 1])
-            
-            with col_entry:
-                st.markdown(f"""
-                <div style="padding: 0 8px;">
-                    <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
-                        <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('entry_date')}</span>
-                        <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{trade_conf['entry_date']}</span>
-                    </div>
-                    <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
-                        <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('entry_px')}</span>
-                        <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{trade_conf['entry_price']:.2f}</span>
-                    </div>
-                    <div style="display: flex; justify-content: space-between; padding: 8px 0;">
-                        <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('current_px')}</span>
-                        <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{cur_spread:.2f}</span>
-                    </div>
+
+        with col_time:
+            st.markdown(f"""
+            <div style="padding: 0 8px;">
+                <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
+                    <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('days_held')}</span>
+                    <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{pnl_data['days_held_trd']}d <span style="opacity:0.5;">({pnl_data['days_held_cal']} {t('cal')})</span></span>
                 </div>
-                """, unsafe_allow_html=True)
-            
-            with col_pnl:
-                st.markdown(f"""
-                <div style="display: flex; flex-direction: column; justify-content: center; align-items: center; background: rgba(128,128,128,0.1); border-radius: 8px; padding: 16px; height: 100%; min-height: 100px;">
-                    <div style="font-size: 11px; opacity: 0.6; text-transform: uppercase; margin-bottom: 6px;">{t('pnl')}</div>
-                    <div style="font-family: 'JetBrains Mono', monospace; font-size: 28px; font-weight: 700; color: {pnl_color};">{pnl_sign}{pnl_data['pnl']:.2f}</div>
-                    <div style="font-family: 'JetBrains Mono', monospace; font-size: 16px; color: {pnl_color}; margin-top: 4px;">{pct_sign}{pnl_data['pnl_pct']:.1f}%</div>
+                <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
+                    <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('dte')}</span>
+                    <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{pnl_data['dte_trd']}d <span style="opacity:0.5;">({pnl_data['dte_cal']} {t('cal')})</span></span>
                 </div>
-                """, unsafe_allow_html=True)
-            
-            with col_time:
-                st.markdown(f"""
-                <div style="padding: 0 8px;">
-                    <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
-                        <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('days_held')}</span>
-                        <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{pnl_data['days_held_trd']}d <span style="opacity:0.5;">({pnl_data['days_held_cal']} {t('cal')})</span></span>
+                <div style="padding: 8px 0;">
+                    <div style="font-size: 10px; opacity: 0.5; margin-bottom: 6px;">{t('time_progress')}</div>
+                    <div style="background: rgba(128,128,128,0.2); border-radius: 4px; height: 6px; overflow: hidden;">
+                        <div style="background: {pnl_color}; height: 100%; width: {progress_pct:.1f}%; border-radius: 4px;"></div>
                     </div>
-                    <div style="display: flex; justify-content: space-between; padding: 8px 0; border-bottom: 1px solid rgba(128,128,128,0.2);">
-                        <span style="font-size: 11px; opacity: 0.6; text-transform: uppercase;">{t('dte')}</span>
-                        <span style="font-family: 'JetBrains Mono', monospace; font-size: 14px;">{pnl_data['dte_trd']}d <span style="opacity:0.5;">({pnl_data['dte_cal']} {t('cal')})</span></span>
-                    </div>
-                    <div style="padding: 8px 0;">
-                        <div style="font-size: 10px; opacity: 0.5; margin-bottom: 6px;">{t('time_progress')}</div>
-                        <div style="background: rgba(128,128,128,0.2); border-radius: 4px; height: 6px; overflow: hidden;">
-                            <div style="background: {pnl_color}; height: 100%; width: {progress_pct:.1f}%; border-radius: 4px;"></div>
-                        </div>
-                        <div style="display: flex; justify-content: space-between; font-size: 9px; opacity: 0.4; margin-top: 4px;">
-                            <span>{t('entry_label')}</span>
-                            <span>{t('expiry_label')}</span>
-                        </div>
+                    <div style="display: flex; justify-content: space-between; font-size: 9px; opacity: 0.4; margin-top: 4px;">
+                        <span>{t('entry_label')}</span>
+                        <span>{t('expiry_label')}</span>
                     </div>
                 </div>
-                """, unsafe_allow_html=True)
-        
-        st.markdown("---")
-        
-        # 4. CHART
-        chart_entry_price = trade_conf["entry_price"] if trade_conf else None
-        chart_entry_date = trade_conf["entry_date"] if trade_conf else None
-        chart_expiry = SPREADS_CONFIG[spread_name]["expiry_date"]
-        fig = create_spread_chart(
+            </div>
+            """, unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    # 4. CHART
+    chart_entry_price = trade_conf["entry_price"] if trade_conf else None
+    chart_entry_date = trade_conf["entry_date"] if trade_conf else None
+    chart_expiry = SPREADS_CONFIG[spread_name]["expiry_date"]
+    fig = cached_figure(
+        "spread", figure_key(spread_name, chart_entry_price, chart_entry_date, current_futures, long_iv, short_iv),
+        lambda: create_spread_chart(
             df_chart, spread_name, st.session_state.language,
             chart_entry_price, chart_entry_date,
             current_futures=current_futures,
             long_iv=long_iv, short_iv=short_iv,
             expiry_date=chart_expiry,
-        )
-        st.plotly_chart(fig, use_container_width=True, key=f"main_chart_{prefix}")
-
-        # --- ANALYTICS SECTION ---
-        with st.expander(f"📊 {t('analytics')}", expanded=True):
-            col_hist, col_calc = st.columns(2)
-            
-            with col_hist:
-                lookback_label = f"{lookback_days} {t('days')}" if lookback_days < 9999 else t('since_listing')
-                st.markdown(f"""
-                <span class="tooltip-container">
-                    <span style="font-weight: 600; cursor: help;">{t('dist_title')} ({lookback_label}) ⓘ</span>
-                    <span class="tooltip-text" style="width: 260px;">
-                        <div class="tooltip-label">{t('dist_title')}</div>
-                        <div style="font-size: 11px; line-height: 1.6;">{t('dist_tooltip')}</div>
-                    </span>
-                </span>
-                """, unsafe_allow_html=True)
-                hist_fig = create_distribution_chart(df_chart, prefix, cur_spread, st.session_state.language)
-                st.plotly_chart(hist_fig, use_container_width=True, key=f"hist_{prefix}")
+        ),
+    )
+    st.plotly_chart(fig, use_container_width=True, key=f"main_chart_{prefix}")
 
-            with col_calc:
-                st.markdown(f"""
-                <span class="tooltip-container">
-                    <span style="font-weight: 600; cursor: help;">{t('calc_title')} ⓘ</span>
-                    <span class="tooltip-text" style="width: 260px;">
-                        <div class="tooltip-label">{t('calc_title')}</div>
-                        <div style="font-size: 11px; line-height: 1.6;">{t('calc_tooltip')}</div>
-                    </span>
+
+@st.fragment
+def render_payoff_calculator(spread_name, cur_spread, current_futures):
+    """Payoff simulator for one spread (its own entry input, independent of the position's)."""
+    prefix = SPREADS_CONFIG[spread_name]["prefix"]
+    futures_ticker = SPREADS_CONFIG[spread_name]["futures_ticker"]
+    trade_conf = trade_config(spread_name)
+    st.markdown(f"""
+    <span class="tooltip-container">
+        <span style="font-weight: 600; cursor: help;">{t('calc_title')} ⓘ</span>
+        <span class="tooltip-text" style="width: 260px;">
+            <div class="tooltip-label">{t('calc_title')}</div>
+            <div style="font-size: 11px; line-height: 1.6;">{t('calc_tooltip')}</div>
+        </span>
+    </span>
+    """, unsafe_allow_html=True)
+
+    # Note about futures vs spot
+    st.caption(f"ℹ️ {t('futures_note')}")
+
+    default_entry = trade_conf["entry_price"] if trade_conf else float(cur_spread)
+    sim_key = f"sim_{prefix}"
+
+    if sim_key not in st.session_state:
+        st.session_state[sim_key] = default_entry
+
+    sim_entry = st.number_input(
+        t('entry_price'), 
+        min_value=0.0, max_value=10.0, 
+        value=st.session_state[sim_key], step=0.05, format="%.2f", 
+        key=f"sim_input_{prefix}"
+    )
+    st.session_state[sim_key] = sim_entry
+
+    # Dynamic strikes from config
+    K1 = SPREADS_CONFIG[spread_name]["long_strike"]
+    K2 = SPREADS_CONFIG[spread_name]["short_strike"]
+    spread_width = float(K2 - K1)
+    max_profit = spread_width - sim_entry
+    max_loss = sim_entry
+    rr_ratio = max_profit / max_loss if max_loss > 0 else 0
+    breakeven = K1 + sim_entry
+
+    # --- UPDATED: Calculate P&L at current FUTURES (not spot) ---
+    if current_futures is not None:
+        if current_futures <= K1:
+            pnl_at_futures = -sim_entry
+        elif current_futures >= K2:
+            pnl_at_futures = spread_width - sim_entry
+        else:
+            pnl_at_futures = (current_futures - K1) - sim_entry
+        pnl_color = "#26a69a" if pnl_at_futures >= 0 else "#ef5350"
+        pnl_sign = "+" if pnl_at_futures >= 0 else ""
+    else:
+        pnl_at_futures = None
+
+    st.markdown(f"""
+    <div style="font-size: 13px; margin: 8px 0; line-height: 1.6;">
+        <span style="color: #26a69a;">{t('max_profit')}: <b>+{max_profit:.2f}</b></span>
+        <span style="opacity: 0.4; margin: 0 8px;">|</span>
+        <span style="color: #ef5350;">{t('max_risk')}: <b>-{max_loss:.2f}</b></span>
+        <span style="opacity: 0.4; margin: 0 8px;">|</span>
+        <span>R/R: <b>1:{rr_ratio:.1f}</b></span>
+        <span style="opacity: 0.4; margin: 0 8px;">|</span>
+        <span style="color: #ffa726;">BE: <b>{breakeven:.2f}</b></span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Show P&L at current FUTURES
+    if pnl_at_futures is not None:
+        st.markdown(f"""
+        <div style="font-size: 12px; margin: 4px 0 8px 0; opacity: 0.8;">
+            {t('current_pnl')} ({futures_ticker}: {current_futures:.2f}): <span style="color: {pnl_color}; font-weight: 600;">{pnl_sign}{pnl_at_futures:.2f}</span>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # --- UPDATED: Payoff chart uses futures price ---
+    payoff_fig = cached_figure(
+        "payoff", (st.session_state.language, sim_entry, current_futures, K1, K2),
+        lambda: create_payoff_chart(sim_entry, st.session_state.language, current_futures, long_strike=K1, short_strike=K2)
+        .update_layout(height=220, margin=dict(t=10, b=20)),
+    )
+    st.plotly_chart(payoff_fig, use_container_width=True, key=f"payoff_{prefix}")
+
+
+@st.fragment
+def render_strike_explorer(spread_name, df_chart):
+    """Any call vertical of this expiry, priced from the stored chain."""
+    prefix = SPREADS_CONFIG[spread_name]["prefix"]
+    chain_expiry = SPREADS_CONFIG[spread_name]["expiry_date"]
+    strikes = chain_strikes(chain, chain_expiry) if chain is not None else []
+    if len(strikes) >= 2:
+        with st.expander(f"🧮 {t('strike_explorer')}", expanded=False):
+            K1 = SPREADS_CONFIG[spread_name]["long_strike"]
+            K2 = SPREADS_CONFIG[spread_name]["short_strike"]
+            col_long, col_short = st.columns(2)
+            k_long = col_long.selectbox(t('long_call'), strikes, format_func=lambda k: f"C{k:g}",
+                                        index=strikes.index(K1) if K1 in strikes else 0,
+                                        key=f"chain_long_{prefix}")
+            k_short = col_short.selectbox(t('short_call'), strikes, format_func=lambda k: f"C{k:g}",
+                                          index=strikes.index(K2) if K2 in strikes else len(strikes) - 1,
+                                          key=f"chain_short_{prefix}")
+            vertical = chain_vertical(chain, chain_expiry, k_long, k_short).dropna()
+            vertical = vertical[vertical.index >= pd.Timestamp(df_chart["Date"].min())]
+            chain_fig = go.Figure(go.Scatter(
+                x=vertical.index, y=vertical.values, mode="lines", line=dict(color="#ffa726", width=2),
+                name=f"C{k_long:g}/C{k_short:g}", hovertemplate='%{x|%Y-%m-%d}: %{y:.2f}<extra></extra>',
+            ))
+            chain_fig.update_layout(
+                height=260, margin=dict(l=20, r=20, t=20, b=20),
+                plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(family="JetBrains Mono, monospace", size=11),
+            )
+            st.plotly_chart(chain_fig, use_container_width=True, key=f"chain_{prefix}")
+
+
+# --- TABS & METRICS ---
+def get_val(row, key, default=0.0):
+    val = row.get(key, default)
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return default
+    return float(val)
+
+def render_spread_tab(spread_name):
+    """Metrics, Greeks, P&L, charts and analytics for one spread - the expensive part of the page."""
+    prefix = SPREADS_CONFIG[spread_name]["prefix"]
+    cols = SPREADS_CONFIG[spread_name]["columns"]
+
+    # Get current futures for this spread from the config
+    futures_col = SPREADS_CONFIG[spread_name]["futures_col"]
+    futures_ticker = SPREADS_CONFIG[spread_name]["futures_ticker"]
+
+    # Get current futures value - handle NaN and 0
+    current_futures = None
+    prev_futures_val = None
+    if futures_col in full_df.columns:
+        fut_val = latest.get(futures_col, None)
+        if fut_val is not None and not pd.isna(fut_val) and fut_val > 0:
+            current_futures = float(fut_val)
+            # Get previous futures value
+            prev_fut = prev.get(futures_col, None)
+            if prev_fut is not None and not pd.isna(prev_fut) and prev_fut > 0:
+                prev_futures_val = float(prev_fut)
+            else:
+                prev_futures_val = current_futures
+
+    # 1. PREPARE DATA
+    cur_long = get_val(latest, cols["Long_Price"])
+    cur_short = get_val(latest, cols["Short_Price"])
+    cur_spread = get_val(latest, cols["Spread"])
+    cur_l_vol = get_val(latest, cols["Long_Volume"])
+    cur_s_vol = get_val(latest, cols["Short_Volume"])
+    cur_l_oi = get_val(latest, cols["Long_OI"])
+    cur_s_oi = get_val(latest, cols["Short_OI"])
+
+    prev_long = get_val(prev, cols["Long_Price"])
+    prev_short = get_val(prev, cols["Short_Price"])
+    prev_spread = get_val(prev, cols["Spread"])
+
+    d_long = cur_long - prev_long
+    d_short = cur_short - prev_short
+    d_spread = cur_spread - prev_spread
+
+    # Calculate Valuation
+    spread_history = df_chart[cols["Spread"]].dropna()
+    z_score, percentile = calculate_valuation(spread_history, cur_spread)
+
+    # 2. RENDER METRICS (4 COLUMNS - added futures)
+    c1, c2, c3, c4 = st.columns(4)
+
+    def render_metric(col, label, val, delta, vol=None, is_futures=False, oi=None):
+        delta_cls = "positive" if delta > 0 else "negative" if delta < 0 else "neutral"
+        sign = "+" if delta > 0 else ""
+        arrow = "▲" if delta > 0 else "▼" if delta < 0 else "−"
+
+        html = [
+            f'<div class="metric-card">',
+            f'<div class="metric-label">{label}</div>',
+            f'<div class="metric-value">{val:.2f}</div>',
+            f'<div class="metric-delta delta-{delta_cls}">{arrow} {sign}{delta:.2f}</div>'
+        ]
+        if vol is not None:
+            liq = f'{t("volume")}: {int(vol):,}'
+            if oi is not None and oi > 0:
+                liq += f' &nbsp;|&nbsp; {t("oi_label")}: {int(oi):,}'
+            html.append(f'<div class="volume-text">{liq}</div>')
+        else:
+            html.append('<div class="volume-text">&nbsp;</div>')
+        html.append('</div>')
+        col.markdown("".join(html), unsafe_allow_html=True)
+
+    # Show VIX Futures for this spread (FIRST COLUMN)
+    if current_futures is not None and current_futures > 0:
+        d_futures = current_futures - prev_futures_val if prev_futures_val else 0
+        render_metric(c1, f"{t('vix_futures')} ({futures_ticker})", current_futures, d_futures, is_futures=True)
+    else:
+        c1.markdown(f"""
+        <div class="metric-card" style="border-color: rgba(239, 83, 80, 0.4);">
+            <div class="metric-label">{t('vix_futures')} ({futures_ticker})</div>
+            <div class="metric-value" style="font-size: 20px; opacity: 0.5;">N/A</div>
+            <div class="volume-text" style="color: #ef5350;">{t('no_vix_data')}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Dynamic leg labels based on strikes
+    K1 = SPREADS_CONFIG[spread_name]["long_strike"]
+    K2 = SPREADS_CONFIG[spread_name]["short_strike"]
+    if st.session_state.language == 'en':
+        long_label = f"Long Leg (C{K1})"
+        short_label = f"Short Leg (C{K2})"
+    else:
+        long_label = f"多头 (C{K1})"
+        short_label = f"空头 (C{K2})"
+
+    render_metric(c2, long_label, cur_long, d_long, cur_l_vol, oi=cur_l_oi)
+    render_metric(c3, short_label, cur_short, d_short, cur_s_vol, oi=cur_s_oi)
+    render_metric(c4, t('net_spread'), cur_spread, d_spread)
+
+    # 3. VALUATION LINE
+    if z_score <= -1.0: status = t('cheap')
+    elif z_score >= 1.0: status = t('expensive')
+    else: status = t('fair')
+
+    if st.session_state.language == 'en':
+        stat_tooltip_label = "How to read this"
+        stat_tooltip_line1 = "<b>Z-score:</b> Distance from average (in std deviations)"
+        stat_tooltip_line2 = "<b>Percentile:</b> % of historical prices that were lower"
+        stat_tooltip_line3 = "<b>CHEAP:</b> Z ≤ -1 | <b>FAIR:</b> -1 to 1 | <b>RICH:</b> Z ≥ 1"
+    else:
+        stat_tooltip_label = "如何解读"
+        stat_tooltip_line1 = "<b>Z分数:</b> 与均值的距离（以标准差计）"
+        stat_tooltip_line2 = "<b>百分位:</b> 历史上低于当前价格的比例"
+        stat_tooltip_line3 = "<b>低估:</b> Z ≤ -1 | <b>合理:</b> -1 到 1 | <b>高估:</b> Z ≥ 1"
+
+    st.markdown(f"""
+    <div style="text-align: left; margin-top: 8px; margin-bottom: 16px;">
+        <span class="tooltip-container">
+            <span class="volume-text" style="cursor: help;">
+                {t('valuation_title')}: <b>{status}</b> (Z-score: {z_score:.1f}σ | Percentile: {int(percentile)}%) ⓘ
+            </span>
+            <span class="tooltip-text" style="width: 280px;">
+                <div class="tooltip-label">{stat_tooltip_label}</div>
+                <div style="font-size: 11px; line-height: 1.8;">{stat_tooltip_line1}</div>
+                <div style="font-size: 11px; line-height: 1.8;">{stat_tooltip_line2}</div>
+                <div class="tooltip-hint">{stat_tooltip_line3}</div>
+            </span>
+        </span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # --- GREEKS SECTION (spread-level net Greeks + leg IVs) ---
+    def _latest_greek(col):
+        if col not in full_df.columns:
+            return None
+        v = latest.get(col)
+        if v is None or pd.isna(v):
+            return None
+        try:
+            fv = float(v)
+        except (TypeError, ValueError):
+            return None
+        return fv if fv != 0 else None
+
+    net_delta = _latest_greek(cols["Net_Delta"])
+    net_gamma = _latest_greek(cols["Net_Gamma"])
+    net_vega  = _latest_greek(cols["Net_Vega"])
+    net_theta = _latest_greek(cols["Net_Theta"])
+    long_iv   = _latest_greek(cols["Long_IV"])
+    short_iv  = _latest_greek(cols["Short_IV"])
+
+    if any(g is not None for g in (net_delta, net_gamma, net_vega, net_theta, long_iv, short_iv)):
+        st.markdown(f"""
+        <div style="margin-top:8px; margin-bottom:6px;">
+            <span class="tooltip-container">
+                <span style="font-weight:600; cursor:help; font-size:13px;">🔢 {t('greeks_title')} ⓘ</span>
+                <span class="tooltip-text" style="width:280px;">
+                    <div class="tooltip-label">{t('greeks_title')}</div>
+                    <div style="font-size:11px; line-height:1.6;">{t('greeks_tooltip')}</div>
                 </span>
-                """, unsafe_allow_html=True)
-                
-                # Note about futures vs spot
-                st.caption(f"ℹ️ {t('futures_note')}")
-                
-                default_entry = trade_conf["entry_price"] if trade_conf else float(cur_spread)
-                sim_key = f"sim_{prefix}"
-                
-                if sim_key not in st.session_state:
-                    st.session_state[sim_key] = default_entry
-                
-                sim_entry = st.number_input(
-                    t('entry_price'), 
-                    min_value=0.0, max_value=10.0, 
-                    value=st.session_state[sim_key], step=0.05, format="%.2f", 
-                    key=f"sim_input_{prefix}"
-                )
-                st.session_state[sim_key] = sim_entry
-                
-                # Dynamic strikes from config
-                K1 = SPREADS_CONFIG[spread_name]["long_strike"]
-                K2 = SPREADS_CONFIG[spread_name]["short_strike"]
-                spread_width = float(K2 - K1)
-                max_profit = spread_width - sim_entry
-                max_loss = sim_entry
-                rr_ratio = max_profit / max_loss if max_loss > 0 else 0
-                breakeven = K1 + sim_entry
-                
-                # --- UPDATED: Calculate P&L at current FUTURES (not spot) ---
-                if current_futures is not None:
-                    if current_futures <= K1:
-                        pnl_at_futures = -sim_entry
-                    elif current_futures >= K2:
-                        pnl_at_futures = spread_width - sim_entry
-                    else:
-                        pnl_at_futures = (current_futures - K1) - sim_entry
-                    pnl_color = "#26a69a" if pnl_at_futures >= 0 else "#ef5350"
-                    pnl_sign = "+" if pnl_at_futures >= 0 else ""
-                else:
-                    pnl_at_futures = None
+            </span>
+        </div>
+        """, unsafe_allow_html=True)
 
-                st.markdown(f"""
-                <div style="font-size: 13px; margin: 8px 0; line-height: 1.6;">
-                    <span style="color: #26a69a;">{t('max_profit')}: <b>+{max_profit:.2f}</b></span>
-                    <span style="opacity: 0.4; margin: 0 8px;">|</span>
-                    <span style="color: #ef5350;">{t('max_risk')}: <b>-{max_loss:.2f}</b></span>
-                    <span style="opacity: 0.4; margin: 0 8px;">|</span>
-                    <span>R/R: <b>1:{rr_ratio:.1f}</b></span>
-                    <span style="opacity: 0.4; margin: 0 8px;">|</span>
-                    <span style="color: #ffa726;">BE: <b>{breakeven:.2f}</b></span>
+        g1, g2, g3, g4, g5 = st.columns(5)
+
+        def _render_greek(col, label, val, fmt="{:+.3f}", good_sign=None):
+            if val is None:
+                col.markdown(f"""
+                <div class="metric-card" style="padding:14px;">
+                    <div class="metric-label">{label}</div>
+                    <div style="font-family:'JetBrains Mono', monospace; font-size:20px; opacity:0.4;">—</div>
                 </div>
                 """, unsafe_allow_html=True)
-                
-                # Show P&L at current FUTURES
-                if pnl_at_futures is not None:
-                    st.markdown(f"""
-                    <div style="font-size: 12px; margin: 4px 0 8px 0; opacity: 0.8;">
-                        {t('current_pnl')} ({futures_ticker}: {current_futures:.2f}): <span style="color: {pnl_color}; font-weight: 600;">{pnl_sign}{pnl_at_futures:.2f}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # --- UPDATED: Payoff chart uses futures price ---
-                payoff_fig = create_payoff_chart(sim_entry, st.session_state.language, current_futures, long_strike=K1, short_strike=K2)
-                payoff_fig.update_layout(height=220, margin=dict(t=10, b=20))
-                st.plotly_chart(payoff_fig, use_container_width=True, key=f"payoff_{prefix}")
+                return
+            if good_sign is None:
+                color = "#ffffff"
+            elif good_sign == "pos":
+                color = "#26a69a" if val >= 0 else "#ef5350"
+            elif good_sign == "neg":
+                color = "#26a69a" if val <= 0 else "#ef5350"
+            col.markdown(f"""
+            <div class="metric-card" style="padding:14px;">
+                <div class="metric-label">{label}</div>
+                <div style="font-family:'JetBrains Mono', monospace; font-size:20px; font-weight:700; color:{color};">{fmt.format(val)}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        _render_greek(g1, t('net_delta'), net_delta, "{:+.3f}", "pos")
+        _render_greek(g2, t('net_gamma'), net_gamma, "{:+.4f}")
+        _render_greek(g3, t('net_vega'),  net_vega,  "{:+.3f}", "pos")
+        _render_greek(g4, t('net_theta'), net_theta, "{:+.3f}", None)
+
+        # IV cell shows both legs
+        if long_iv is not None or short_iv is not None:
+            li = f"{long_iv:.1f}" if long_iv is not None else "—"
+            si = f"{short_iv:.1f}" if short_iv is not None else "—"
+            g5.markdown(f"""
+            <div class="metric-card" style="padding:14px;">
+                <div class="metric-label">{t('iv_long_short')}</div>
+                <div style="font-family:'JetBrains Mono', monospace; font-size:20px; font-weight:700;">{li} / {si}</div>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            g5.markdown(f"""
+            <div class="metric-card" style="padding:14px;">
+                <div class="metric-label">{t('iv_long_short')}</div>
+                <div style="font-family:'JetBrains Mono', monospace; font-size:20px; opacity:0.4;">—</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # --- P&L TRACKING + CHART ---
+    render_position(spread_name, df_chart, cur_spread, current_futures, long_iv, short_iv)
+
+    # --- ANALYTICS SECTION ---
+    with st.expander(f"📊 {t('analytics')}", expanded=True):
+        col_hist, col_calc = st.columns(2)
+
+        with col_hist:
+            lookback_label = f"{lookback_days} {t('days')}" if lookback_days < 9999 else t('since_listing')
+            st.markdown(f"""
+            <span class="tooltip-container">
+                <span style="font-weight: 600; cursor: help;">{t('dist_title')} ({lookback_label}) ⓘ</span>
+                <span class="tooltip-text" style="width: 260px;">
+                    <div class="tooltip-label">{t('dist_title')}</div>
+                    <div style="font-size: 11px; line-height: 1.6;">{t('dist_tooltip')}</div>
+                </span>
+            </span>
+            """, unsafe_allow_html=True)
+            hist_fig = cached_figure("distribution", figure_key(prefix, cur_spread),
+                                     lambda: create_distribution_chart(df_chart, prefix, cur_spread, st.session_state.language))
+            st.plotly_chart(hist_fig, use_container_width=True, key=f"hist_{prefix}")
+
+        with col_calc:
+            render_payoff_calculator(spread_name, cur_spread, current_futures)
+
+    # --- STRIKE EXPLORER: any call vertical of this expiry, priced from the stored chain ---
+    render_strike_explorer(spread_name, df_chart)
+
+
+@st.cache_data(max_entries=16)
+def spread_summaries(data_version, lookback_days, as_of, spreads, _df_chart, _latest, _prev):
+    """
+    {spread: (spread, daily change, z-score, percentile)} for the summary cards of the tabs
+    that aren't rendered. Keyed on the store version, the day the lookback window was cut
+    for and the spread selection, so it is computed once per data update, date roll or
+    selection change. Current / previous marks come
+    from the latest and previous rows, as in render_spread_tab, so card and tab P&L agree.
+    """
+    out = {}
+    for name in spreads:
+        col = SPREADS_CONFIG[name]["columns"]["Spread"]
+        series = _df_chart[col].dropna()
+        if series.empty:
+            continue
+        cur = get_val(_latest, col)
+        prev_val = get_val(_prev, col)
+        z_score, percentile = calculate_valuation(series, cur)
+        out[name] = (cur, cur - prev_val, z_score, percentile)
+    return out
+
+def render_spread_summaries(names):
+    """One compact card per spread: net spread, daily change, valuation and position P&L."""
+    summaries = spread_summaries(st.session_state.get("data_version"), lookback_days, today.isoformat(),
+                                 tuple(active_spreads), df_chart, latest, prev)
+    for col, name in zip(st.columns(len(names)), names):
+        if name not in summaries:
+            continue
+        cur, delta, z_score, percentile = summaries[name]
+        delta_cls = "positive" if delta > 0 else "negative" if delta < 0 else "neutral"
+        arrow = "▲" if delta > 0 else "▼" if delta < 0 else "−"
+        status = t('cheap') if z_score <= -1.0 else t('expensive') if z_score >= 1.0 else t('fair')
+        trade_conf = trade_config(name)
+        if trade_conf:
+            pnl = cur - trade_conf["entry_price"]
+            pnl_color = "#26a69a" if pnl > 0.01 else "#ef5350" if pnl < -0.01 else "#9e9e9e"
+            pnl_html = f'{t("pnl")}: <span style="color:{pnl_color};">{pnl:+.2f}</span>'
+        else:
+            pnl_html = "&nbsp;"
+        col.markdown(f"""
+        <div class="metric-card" style="padding:14px;">
+            <div class="metric-label">{SPREADS_CONFIG_NAMES[st.session_state.language][name]}</div>
+            <div class="metric-value" style="font-size:20px;">{cur:.2f}</div>
+            <div class="metric-delta delta-{delta_cls}">{arrow} {delta:+.2f}</div>
+            <div class="volume-text">{status} ({z_score:.1f}σ | {int(percentile)}%) &nbsp;|&nbsp; {pnl_html}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+if LAZY_TABS:
+    # Only the selected spread is rendered in full; the rest are summary cards
+    if st.session_state.get("selected_spread") not in active_spreads:
+        st.session_state.pop("selected_spread", None)
+    selected = st.radio(
+        t('select_spread'), active_spreads, horizontal=True, key="selected_spread",
+        format_func=lambda s: SPREADS_CONFIG_NAMES[st.session_state.language][s],
+        label_visibility="collapsed",
+    )
+    others = [s for s in active_spreads if s != selected]
+    if others:
+        render_spread_summaries(others)
+    if selected is not None:
+        render_spread_tab(selected)
+else:
+    tab_names = [SPREADS_CONFIG_NAMES[st.session_state.language][s] for s in active_spreads]
+    tabs = st.tabs(tab_names)
+    for tab, spread_name in zip(tabs, active_spreads):
+        with tab:
+            render_spread_tab(spread_name)
 
 # --- DATA TABLE ---
 st.markdown("---")
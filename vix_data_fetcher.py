@@ -1,64 +1,57 @@
-import blpapi
+try:
+    import blpapi
+except ImportError:  # No Terminal SDK on this box - only the replay transport can be used
+    from vix_bbg_replay import blpapi_shim as blpapi
 import pandas as pd
+import numpy as np
 import datetime
+import json
+import os
 import time
-import subprocess
+import sys
 from pathlib import Path
 
+from vix_store import write_store, read_long, write_long, merge_long, to_long, long_to_history, RAW_FIELDS
+from vix_store import read_chain, write_chain, merge_chain, CHAIN_STORE_PATH, CHAIN_RIGHTS
+from vix_store import QF_NO_PRICE, QF_NOT_TRADED, QF_NO_VOLUME, QF_WIDE_QUOTE, QF_STALE, QF_OUT_OF_RANGE
+from vix_store import describe_quality
+from vix_publisher import publish_async
+from vix_metrics import RunMetrics
+from vix_spread_registry import build_registry, unique_instruments, shared_instruments, leg_sources, LEG_GREEKS
+from vix_spread_registry import option_ticker
+from vix_bar_store import BAR_DTYPE, BAR_INTERVALS, append_bars, last_bar_time, last_sync
+from vix_fetch_cache import FetchCache, split_window
+
 # --- CONFIGURATION ---
-CSV_PATH = Path("data/vix_spread_data.csv")
+LONG_STORE_PATH = Path("data/vix_history_long.parquet")  # (Date, Ticker, Field) history - source of truth
+STORE_PATH = Path("data/vix_spread_data.parquet")  # Wide per-spread view the dashboard reads
+CSV_PATH = Path("data/vix_spread_data.csv")         # Human/git-readable export of the same frame
+PUBLISH_PATHS = [CSV_PATH]  # Pushed to GitHub in the background (vix_publisher.py) - text only
 START_DATE = "20251001"  # Adjusted for 90-day lookback
 
+# Incremental mode - only fetch days missing from the long store (plus an overlap
+# window so Bloomberg revisions to recent settles are picked up). Tickers with
+# no stored history yet (e.g. a newly added spread) are backfilled from START_DATE.
+# Pass --full on the command line to force a re-download from START_DATE.
+INCREMENTAL_MODE = True
+INCREMENTAL_OVERLAP_DAYS = 5  # Business days re-fetched before the last stored date
+
+# Send fetches through vix_gateway.py's warmed session when it's running
+# (falls back to a direct session otherwise)
+USE_GATEWAY = True
+
+# Answer repeated HistoricalDataRequests (same tickers, fields, window) from the on-disk
+# cache in vix_fetch_cache.py - closed history never expires, today's tail is always
+# requested live. Live sessions only; --no-cache turns it off for a run.
+USE_FETCH_CACHE = True
+
 # Debug mode - set to True to see what Bloomberg returns
 DEBUG_MODE = False
 
-# --- CHANGE 1: Replace VIX Spot with VIX Futures ---
-# Each spread should reference its corresponding VIX futures contract
-# Bloomberg VIX Futures format: UX + month code + year digits + " Index"
-# Month codes: F=Jan, G=Feb, H=Mar, J=Apr, K=May, M=Jun, N=Jul, Q=Aug, U=Sep, V=Oct, X=Nov, Z=Dec
-
-SPREADS_CONFIG = {
-    "Feb 2026": {
-        "expiry": "02/18/26",
-        "long": "VIX US 02/18/26 C20 Index",
-        "short": "VIX US 02/18/26 C25 Index",
-        "long_strike": 20,
-        "short_strike": 25,
-        "futures": "UXG26 Index",  # Feb 2026 VIX Futures (G = February)
-    },
-    "Mar 2026": {
-        "expiry": "03/18/26",
-        "long": "VIX US 03/18/26 C20 Index",
-        "short": "VIX US 03/18/26 C25 Index",
-        "long_strike": 20,
-        "short_strike": 25,
-        "futures": "UXH26 Index",  # Mar 2026 VIX Futures (H = March)
-    },
-    "Mar 2026 20-40": {
-        "expiry": "03/18/26",
-        "long": "VIX US 03/18/26 C20 Index",
-        "short": "VIX US 03/18/26 C40 Index",
-        "long_strike": 20,
-        "short_strike": 40,
-        "futures": "UXH26 Index",  # Same Mar 2026 VIX Futures
-    },
-    "May 2026": {
-        "expiry": "05/19/26",
-        "long": "VIX US 05/19/26 C25 Index",
-        "short": "VIX US 05/19/26 C35 Index",
-        "long_strike": 25,
-        "short_strike": 35,
-        "futures": "UXK26 Index",  # May 2026 VIX Futures (K = May)
-    },
-    "Jun 2026": {
-        "expiry": "06/17/26",
-        "long": "VIX US 06/17/26 C20 Index",
-        "short": "VIX US 06/17/26 C25 Index",
-        "long_strike": 20,
-        "short_strike": 25,
-        "futures": "UXM26 Index",  # Jun 2026 VIX Futures (M = June)
-    },
-}
+# --- SPREADS ---
+# Defined once in vix_spread_registry.SPREAD_DEFS as (expiry, long strike, short strike);
+# option / UX futures tickers and column names are generated from that.
+SPREADS_CONFIG = build_registry()
 
 # Optional: Also track VIX spot for reference (contango analysis)
 VIX_SPOT_TICKER = "VIX Index"
@@ -72,11 +65,257 @@ TERM_STRUCTURE_TICKERS = [f"UX{i} Index" for i in range(1, 9)]
 VVIX_TICKER = "VVIX Index"
 
 
+# --- HISTORY FIELDS ---
+# PX_LAST: Last traded price (most accurate for options)
+# PX_MID: Mid of bid/ask (useful when no recent trades)
+# PX_SETTLE: Settlement price (may not exist for options)
+# PX_BID / PX_ASK: For spread calculation if needed
+# VOLUME (PX_VOLUME as backup), OPEN_INT: liquidity gauges
+# *_MID Greeks: only populated for option tickers; futures/indices return nothing
+HISTORY_FIELDS = [
+    "PX_LAST", "PX_MID", "PX_BID", "PX_ASK", "PX_SETTLE",
+    "VOLUME", "PX_VOLUME", "OPEN_INT",
+    "IVOL_MID", "DELTA_MID", "GAMMA_MID", "VEGA_MID", "THETA_MID",
+]
+HISTORY_GREEKS = {"IV": "IVOL_MID", "Delta": "DELTA_MID", "Gamma": "GAMMA_MID", "Vega": "VEGA_MID", "Theta": "THETA_MID"}
+
+# PriceSource categories (stored as codes). STORED = resolved before raw fields were kept.
+PRICE_SOURCES = ["NONE", "PX_LAST", "PX_MID", "CALC_MID", "PX_SETTLE", "STORED"]
+
+# --- QUALITY FLAGS (vix_store QF_*) ---
+# Each leg mark is flagged when the wide view is built; the dashboard masks on the flags.
+MAX_QUOTE_WIDTH = 0.5  # (ask - bid) / mid above this -> QF_WIDE_QUOTE
+STALE_RUN_DAYS = 3     # Same price this many days in a row (incl. today) -> QF_STALE
+
+HISTORY_CHUNK_SIZE = 10       # Securities per HistoricalDataRequest (chunks run concurrently)
+GREEKS_SNAPSHOT_TIMEOUT = 10  # Seconds to wait for the ReferenceDataRequest snapshot
+
+# Bounded latency: a stalled Terminal or one slow security can't hang the scheduled run.
+# Tickers that time out or hit a transient securityError are re-requested on their own
+# with exponential backoff; whatever arrived before a timeout is kept.
+HISTORY_REQUEST_TIMEOUT = 60  # Seconds per HistoricalDataRequest
+HISTORY_MAX_RETRIES = 2
+HISTORY_RETRY_BACKOFF = 2.0   # Seconds before the first retry, doubled each time
+FETCH_DEADLINE = 300          # Seconds - no retry is started past this point of a fetch
+PERMANENT_ERROR_CATEGORIES = {"BAD_SEC", "BAD_FLD", "NOT_AUTHORIZED"}  # Not worth retrying
+
+# Interned once - blpapi.Name comparisons are much cheaper than string lookups
+HISTORY_FIELD_INDEX = {blpapi.Name(f): i for i, f in enumerate(HISTORY_FIELDS)}
+NAME_SECURITY_DATA = blpapi.Name("securityData")
+NAME_SECURITY = blpapi.Name("security")
+NAME_FIELD_DATA = blpapi.Name("fieldData")
+NAME_DATE = blpapi.Name("date")
+NAME_SECURITY_ERROR = blpapi.Name("securityError")
+NAME_FIELD_EXCEPTIONS = blpapi.Name("fieldExceptions")
+NAME_FIELD_ID = blpapi.Name("fieldId")
+NAME_ERROR_INFO = blpapi.Name("errorInfo")
+NAME_CATEGORY = blpapi.Name("category")
+NAME_MESSAGE = blpapi.Name("message")
+SESSION_DOWN = {blpapi.Name("SessionTerminated"), blpapi.Name("SessionConnectionDown")}
+
+# --- OPTION CHAIN (--chain) ---
+# Every call/put strike of each tracked expiry -> CHAIN_STORE_PATH, so any vertical can be
+# priced from stored data. Tickers are generated over CHAIN_STRIKES (the VIX listing grid);
+# strikes that aren't listed come back BAD_SEC and are dropped.
+# 1-pt strikes to 30, 2.5-pt to 50, then 5-pt
+CHAIN_STRIKES = list(range(10, 30)) + [k / 2 for k in range(60, 100, 5)] + list(range(50, 105, 5))
+CHAIN_CHUNK_SIZE = 50  # Securities per HistoricalDataRequest for the chain
+
+# --- INTRADAY BARS (--bars) ---
+# 1m / 5m TRADE bars for every leg and futures contract -> vix_bar_store (data/bars/).
+# Bloomberg keeps roughly 140 days of intraday bars; each run appends what's new.
+BAR_BACKFILL_DAYS = 140
+BAR_REQUEST_DAYS = 20  # Split longer windows into several IntradayBarRequests (all in flight together)
+BAR_REQUEST_TIMEOUT = 120
+NAME_BAR_DATA = blpapi.Name("barData")
+NAME_BAR_TICK_DATA = blpapi.Name("barTickData")
+NAME_RESPONSE_ERROR = blpapi.Name("responseError")
+NAME_TIME = blpapi.Name("time")
+BAR_FIELD_NAMES = [(blpapi.Name(f), f) for f in ("open", "high", "low", "close", "volume")]
+NAME_NUM_EVENTS = blpapi.Name("numEvents")
+
+# --- STREAMING (//blp/mktdata) ---
+# `python vix_data_fetcher.py --stream` subscribes to every leg, future, UX1..UX8
+# and VVIX and keeps LIVE_MARKS_PATH updated for the dashboard.
+STREAM_FIELDS = ["BID", "ASK", "LAST_PRICE"]
+STREAM_MAX_SNAPSHOTS_PER_SEC = 2  # Coalesce ticks - at most this many file writes per second
+LIVE_MARKS_PATH = Path("data/vix_live_marks.json")
+NAME_SUBSCRIPTION_FAILURE = blpapi.Name("SubscriptionFailure")
+NAME_SUBSCRIPTION_TERMINATED = blpapi.Name("SubscriptionTerminated")
+STREAM_FIELD_NAMES = {blpapi.Name(f): f for f in STREAM_FIELDS}
+
+
+def history_frame(chunks):
+    """
+    Assemble the long history frame (Date, Ticker, Price, PriceSource, Volume, OI,
+    Greeks, raw RAW_FIELDS) straight from the per-security arrays built by get_history.
+    """
+    chunks = [c for c in chunks if len(c[1])]
+    if not chunks:
+        return pd.DataFrame()
+    if len({t for t, _, _ in chunks}) < len(chunks):
+        chunks = _dedupe_chunks(chunks)
+
+    dates = np.concatenate([d for _, d, _ in chunks])
+    values = np.concatenate([v for _, _, v in chunks], axis=1)
+    raw = dict(zip(HISTORY_FIELDS, values))
+
+    frame = {
+        "Date": dates.astype(str),
+        "Ticker": np.repeat([t for t, _, _ in chunks], [len(d) for _, d, _ in chunks]),
+    }
+    for col, fld in HISTORY_GREEKS.items():
+        frame[col] = raw[fld]
+    for fld in RAW_FIELDS:
+        frame[fld] = raw[fld]
+    return resolve_prices(pd.DataFrame(frame))
+
+
+def resolve_prices(history):
+    """
+    Price / PriceSource / Volume / OI from the raw field columns, in one vectorized pass
+    (the first positive field wins):
+      Price:  PX_LAST > PX_MID > CALC_MID ((BID + ASK) / 2) > PX_SETTLE, else 0
+      Volume: VOLUME > PX_VOLUME, else 0;  OI: OPEN_INT, else 0
+    Rows without any raw field (long-store rows written before they were kept) keep
+    their stored Price / Volume / OI. Works on get_history frames and long_to_history().
+    """
+    n = len(history)
+    raw = {f: history[f].to_numpy(dtype=float) if f in history.columns else np.full(n, np.nan) for f in RAW_FIELDS}
+    bid, ask = raw["PX_BID"], raw["PX_ASK"]
+    calc_mid = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, np.nan)
+
+    # --- PRICE LOGIC (Priority: LAST > MID > CALC_MID > SETTLE) ---
+    candidates = [raw["PX_LAST"], raw["PX_MID"], calc_mid, raw["PX_SETTLE"]]
+    conditions = [c > 0 for c in candidates]
+    price = np.select(conditions, candidates, 0.0)
+    source = np.select(conditions, [1, 2, 3, 4], 0)
+
+    # --- VOLUME LOGIC (Priority: VOLUME > PX_VOLUME) ---
+    volume = np.select([raw["VOLUME"] > 0, raw["PX_VOLUME"] > 0], [raw["VOLUME"], raw["PX_VOLUME"]], 0.0)
+    oi = np.where(raw["OPEN_INT"] > 0, raw["OPEN_INT"], 0.0)
+
+    has_raw = ~np.isnan(np.vstack(list(raw.values()))).all(axis=0)
+    if not has_raw.all() and "Price" in history.columns:
+        stored = history["Price"].notna().to_numpy()
+        price = np.where(has_raw, price, history["Price"].to_numpy(dtype=float))
+        source = np.where(has_raw, source, np.where(stored, PRICE_SOURCES.index("STORED"), 0))
+        volume = np.where(has_raw, volume, history["Volume"].to_numpy(dtype=float))
+        oi = np.where(has_raw, oi, history["OI"].to_numpy(dtype=float))
+
+    out = history.drop(columns=["Price", "PriceSource", "Volume", "OI"], errors="ignore")
+    resolved = pd.DataFrame({
+        "Price": price,
+        "PriceSource": pd.Categorical.from_codes(source, categories=PRICE_SOURCES),
+        "Volume": volume,
+        "OI": oi,
+    }, index=out.index)
+    keys = ["Date", "Ticker"]
+    return pd.concat([out[keys], resolved, out.drop(columns=keys)], axis=1)
+
+
+def quality_flags(history):
+    """
+    uint8 QF_* bitmask per row of a resolved history frame (see resolve_prices):
+    no price, non-trade PriceSource, zero volume, wide bid/ask, and the run
+    length of an unchanged price per ticker. Vectorized over all tickers at once.
+    """
+    n = len(history)
+    price = history["Price"].to_numpy(dtype=float)
+    volume = history["Volume"].to_numpy(dtype=float)
+    source = history["PriceSource"].cat.codes.to_numpy() if "PriceSource" in history.columns else np.zeros(n)
+    nan = np.full(n, np.nan)
+    bid = history["PX_BID"].to_numpy(dtype=float) if "PX_BID" in history.columns else nan
+    ask = history["PX_ASK"].to_numpy(dtype=float) if "PX_ASK" in history.columns else nan
+
+    has_price = price > 0
+    mid = (bid + ask) / 2
+    flags = np.where(has_price, 0, QF_NO_PRICE)
+    traded_elsewhere = np.isin(source, [PRICE_SOURCES.index(s) for s in ("PX_MID", "CALC_MID", "PX_SETTLE")])
+    flags |= np.where(traded_elsewhere, QF_NOT_TRADED, 0)
+    flags |= np.where(~(volume > 0), QF_NO_VOLUME, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flags |= np.where((bid > 0) & (ask > 0) & ((ask - bid) / mid > MAX_QUOTE_WIDTH), QF_WIDE_QUOTE, 0)
+
+    # Run length of an unchanged price, per ticker in date order
+    order = np.lexsort((history["Date"].to_numpy(), history["Ticker"].to_numpy()))
+    p, tk = price[order], history["Ticker"].to_numpy()[order]
+    idx = np.arange(n)
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (p[1:] != p[:-1]) | (tk[1:] != tk[:-1])
+    run_len = idx - np.maximum.accumulate(np.where(new_run, idx, 0)) + 1
+    stale = np.empty(n, dtype=bool)
+    stale[order] = (run_len >= STALE_RUN_DAYS) & (p > 0)
+    flags |= np.where(stale, QF_STALE, 0)
+    return flags.astype(np.uint8)
+
+
+def _dedupe_chunks(chunks):
+    """
+    A ticker can have several blocks (PARTIAL_RESPONSE splits, or a retry after
+    a timeout). Merge them per ticker; on a repeated date the later block wins,
+    so a retry refreshes what a timed-out attempt salvaged.
+    """
+    merged = {}
+    for ticker, dates, values in chunks:
+        if ticker not in merged:
+            merged[ticker] = (dates, values)
+            continue
+        d0, v0 = merged[ticker]
+        keep = ~np.isin(d0, dates)
+        merged[ticker] = (np.concatenate([d0[keep], dates]), np.concatenate([v0[:, keep], values], axis=1))
+    out = []
+    for ticker, (dates, values) in merged.items():
+        order = np.argsort(dates, kind="stable")
+        out.append((ticker, dates[order], values[:, order]))
+    return out
+
+
+def _new_history_status():
+    return {"requested": [], "complete": set(), "errors": {}, "field_exceptions": {}}
+
+
+def _error_info(el):
+    """(category, message) from a securityError / errorInfo element."""
+    category = el.getElementAsString(NAME_CATEGORY) if el.hasElement(NAME_CATEGORY) else "UNKNOWN"
+    message = el.getElementAsString(NAME_MESSAGE) if el.hasElement(NAME_MESSAGE) else ""
+    return category, message
+
+
+def _debug_history_chunk(ticker, dates, values):
+    """DEBUG_MODE: show which fields Bloomberg returned on the first point of a ticker."""
+    print(f"\n=== DEBUG: {ticker} ({len(dates)} points) ===")
+    if len(dates):
+        for fld, val in zip(HISTORY_FIELDS, values[:, 0]):
+            print(f"  {fld:<10} exists: {not np.isnan(val)}" + (f" -> {val}" if not np.isnan(val) else ""))
+    print("=" * 40)
+
+
 # --- BLOOMBERG ENGINE ---
 class BloombergEngine:
-    def __init__(self):
-        self.session = None
-        self._connect()
+    """
+    session:   an already-started session-like transport (e.g. vix_bbg_replay.ReplaySession);
+               None connects to the live Terminal.
+    record_to: when connecting live, also capture every response to this JSON fixture.
+    metrics:   a vix_metrics.RunMetrics to record per-phase timings to (None = off).
+    cache:     a vix_fetch_cache.FetchCache for history requests; None = the default on-disk
+               cache when connecting live without recording (USE_FETCH_CACHE), else off.
+    """
+    def __init__(self, session=None, record_to=None, metrics=None, cache=None):
+        if cache is None and session is None and record_to is None and USE_FETCH_CACHE:
+            cache = FetchCache()
+        self.session = session
+        self.metrics = metrics
+        self.cache = cache
+        self._next_cid = 0
+        self._inflight = {}  # correlation id -> {handler, label, phase, sent, deadline}
+        if self.session is None:
+            start = time.perf_counter()
+            self._connect()
+            self._metric("connect", time.perf_counter() - start)
+            if record_to:
+                from vix_bbg_replay import RecordingSession
+                self.session = RecordingSession(self.session, record_to)
     
     def _connect(self):
         print("Connecting to Bloomberg Terminal...")
@@ -90,189 +329,264 @@ class BloombergEngine:
             raise ConnectionError("Failed to open //blp/refdata service")
         print("Connected.\n")
 
-    def get_history(self, tickers: list, start_date: str) -> pd.DataFrame:
-        print(f"Fetching history for {len(tickers)} tickers from {start_date}...")
+    def _metric(self, phase, seconds, **counts):
+        if self.metrics is not None:
+            self.metrics.record(phase, seconds, **counts)
+
+    def _parse_history_block(self, sec_data):
+        """
+        Parse one securityData element into (ticker, dates, values) where
+        values is a preallocated (len(HISTORY_FIELDS), n_points) float array.
+        Only the elements actually present on each point are visited, and
+        they are matched against the interned blpapi.Name objects.
+        """
+        ticker = sec_data.getElementAsString(NAME_SECURITY)
+        if not sec_data.hasElement(NAME_FIELD_DATA):
+            return ticker, np.empty(0, dtype="datetime64[D]"), np.empty((len(HISTORY_FIELDS), 0))
+
+        field_data = sec_data.getElement(NAME_FIELD_DATA)
+        n = field_data.numValues()
+        dates = np.empty(n, dtype="datetime64[D]")
+        values = np.full((len(HISTORY_FIELDS), n), np.nan)
+        field_index = HISTORY_FIELD_INDEX
+
+        for i in range(n):
+            point = field_data.getValueAsElement(i)
+            for el in point.elements():
+                name = el.name()
+                if name == NAME_DATE:
+                    dates[i] = el.getValueAsDatetime()
+                    continue
+                row = field_index.get(name)
+                if row is None:
+                    continue
+                try:
+                    values[row, i] = el.getValueAsFloat()
+                except Exception:
+                    pass  # Non-numeric value - leave as NaN
+        return ticker, dates, values
+
+    # --- REQUEST DISPATCH ---
+    # Every request is sent with its own CorrelationId and registered in
+    # self._inflight; _wait_all() pumps the single session event queue and
+    # routes each message to its request's handler, so several requests can
+    # be outstanding at once and total latency is that of the slowest one.
+
+    def _send(self, request, on_message, label, timeout=None, on_done=None, phase="request"):
+        """
+        Send with a fresh CorrelationId. on_done(timed_out) runs once the request is finished.
+        Its send-to-final-response latency is recorded under `phase`.
+        """
+        self._next_cid += 1
+        key = self._next_cid
+        self._inflight[key] = {
+            "handler": on_message,
+            "label": label,
+            "phase": phase,
+            "sent": time.perf_counter(),
+            "deadline": time.time() + timeout if timeout else None,
+            "on_done": on_done,
+        }
+        self.session.sendRequest(request, correlationId=blpapi.CorrelationId(key))
+        return key
+
+    def _finish(self, key, timed_out):
+        job = self._inflight.pop(key)
+        if timed_out:
+            self.session.cancel(blpapi.CorrelationId(key))
+        self._metric(job["phase"], time.perf_counter() - job["sent"], label=job["label"], timed_out=timed_out)
+        if job["on_done"]:
+            job["on_done"](timed_out)
+
+    def _wait_all(self):
+        """Block until every in-flight request has received its final RESPONSE (or timed out)."""
+        n_requests = len(self._inflight)
+        start = time.perf_counter()
+        first_event = None
+        events = messages = 0
+        parse_time = 0.0
+        try:
+            while self._inflight:
+                event = self.session.nextEvent(500)
+                event_type = event.eventType()
+                if event_type != blpapi.Event.TIMEOUT:
+                    events += 1
+                    if first_event is None:
+                        first_event = time.perf_counter() - start
+                is_final = event_type == blpapi.Event.RESPONSE
+                for msg in event:
+                    messages += 1
+                    if event_type == blpapi.Event.SESSION_STATUS and msg.messageType() in SESSION_DOWN:
+                        print(f"⚠️ Bloomberg session went down ({msg.messageType()}) - keeping partial results")
+                        for key in list(self._inflight):
+                            self._finish(key, timed_out=True)
+                        return
+                    for cid in msg.correlationIds():
+                        job = self._inflight.get(cid.value())
+                        if job is None:
+                            continue
+                        t = time.perf_counter()
+                        job["handler"](msg)
+                        parse_time += time.perf_counter() - t
+                        if is_final:
+                            self._finish(cid.value(), timed_out=False)
+
+                now = time.time()
+                for key, job in list(self._inflight.items()):
+                    if job["deadline"] is not None and now > job["deadline"]:
+                        print(f"⚠️ {job['label']} timed out - keeping partial results")
+                        self._finish(key, timed_out=True)
+        finally:
+            if n_requests:
+                if first_event is not None:
+                    self._metric("first_event", first_event, requests=n_requests)
+                self._metric("receive", time.perf_counter() - start, requests=n_requests,
+                             events=events, messages=messages)
+                self._metric("parse", parse_time, messages=messages)
+
+    # --- FETCH CACHE ---
+    def _from_cache(self, tickers: list, fields: list, start_date: str, end_date: str):
+        """
+        ({ticker: (dates, values)} for the closed part of the window answered by the cache,
+        [(tickers, start, end)] still to request live). Cache hits still need the open tail
+        from today on; misses need the whole window.
+        """
+        if self.cache is None:
+            return {}, [(tickers, start_date, end_date)]
+        closed_end, open_start = split_window(start_date, end_date)
+        if closed_end is None:
+            return {}, [(tickers, start_date, end_date)]
+        start = time.perf_counter()
+        hits = {}
+        for tk in tickers:
+            entry = self.cache.get(tk, fields, start_date, closed_end)
+            if entry is not None:
+                hits[tk] = entry
+        self._metric("cache_read", time.perf_counter() - start, tickers=len(tickers), hits=len(hits))
+        if hits:
+            print(f"💾 {len(hits)}/{len(tickers)} tickers from the fetch cache ({start_date}-{closed_end})")
+        live = [([tk for tk in tickers if tk not in hits], start_date, end_date)]
+        if open_start is not None:
+            live.append((list(hits), open_start, end_date))
+        return hits, [group for group in live if group[0]]
+
+    def _to_cache(self, blocks: list, fields: list, start_date: str, end_date: str):
+        """Store the closed part of each ticker's merged (ticker, dates, values) blocks of a completed request."""
+        if self.cache is None:
+            return
+        closed_end, _ = split_window(start_date, end_date)
+        if closed_end is None:
+            return
+        last = np.datetime64(datetime.datetime.strptime(closed_end, "%Y%m%d").date(), "D")
+        for tk, dates, values in _dedupe_chunks(blocks):
+            keep = dates <= last
+            self.cache.put(tk, fields, start_date, closed_end, dates[keep], values[:, keep])
+
+    def _send_history(self, tickers: list, start_date: str, chunks: list, status=None,
+                      chunk_size=HISTORY_CHUNK_SIZE):
+        """
+        Queue one HistoricalDataRequest per chunk_size tickers; parsed blocks land in chunks.
+        status (see _new_history_status) collects completed tickers, securityErrors and fieldExceptions.
+        Closed history the fetch cache can answer goes straight into chunks; only today's tail
+        of those tickers is requested.
+        """
         service = self.session.getService("//blp/refdata")
-        request = service.createRequest("HistoricalDataRequest")
-        
-        for ticker in tickers:
-            request.append("securities", ticker)
-        
-        # --- FIELD PRIORITY FOR VIX OPTIONS ---
-        # PX_LAST: Last traded price (most accurate for options)
-        # PX_MID: Mid of bid/ask (useful when no recent trades)
-        # PX_SETTLE: Settlement price (may not exist for options)
-        # PX_BID / PX_ASK: For spread calculation if needed
-        
-        request.append("fields", "PX_LAST")
-        request.append("fields", "PX_MID")
-        request.append("fields", "PX_BID")
-        request.append("fields", "PX_ASK")
-        request.append("fields", "PX_SETTLE")
-        request.append("fields", "VOLUME")        # Try VOLUME instead of PX_VOLUME
-        request.append("fields", "PX_VOLUME")     # Keep as backup
-        request.append("fields", "OPEN_INT")      # Open interest (standing contracts; better liquidity gauge than daily volume)
-
-        # --- GREEKS (only populated for option tickers; futures/indices return nothing) ---
-        request.append("fields", "IVOL_MID")      # Implied vol (mid)
-        request.append("fields", "DELTA_MID")     # Delta
-        request.append("fields", "GAMMA_MID")     # Gamma
-        request.append("fields", "VEGA_MID")      # Vega (per 1% vol)
-        request.append("fields", "THETA_MID")     # Theta (per day)
-        
-        request.set("startDate", start_date)
-        request.set("endDate", datetime.datetime.now().strftime("%Y%m%d"))
-        request.set("periodicitySelection", "DAILY")
-        
-        self.session.sendRequest(request)
-        
-        records = []
-        debug_shown = set()  # Track which tickers we've shown debug for
-        
-        while True:
-            event = self.session.nextEvent(500)
-            for msg in event:
-                if msg.hasElement("securityData"):
-                    sec_data = msg.getElement("securityData")
-                    ticker = sec_data.getElementAsString("security")
-                    
-                    if sec_data.hasElement("fieldData"):
-                        field_data = sec_data.getElement("fieldData")
-                        
-                        for i in range(field_data.numValues()):
-                            point = field_data.getValueAsElement(i)
-                            raw_date = point.getElementAsDatetime("date")
-                            
-                            # --- DEBUG OUTPUT (first occurrence per ticker) ---
-                            if DEBUG_MODE and ticker not in debug_shown:
-                                debug_shown.add(ticker)
-                                print(f"\n=== DEBUG: {ticker} ===")
-                                print(f"  PX_LAST exists:   {point.hasElement('PX_LAST')}", end="")
-                                if point.hasElement('PX_LAST'):
-                                    print(f" -> {point.getElementAsFloat('PX_LAST')}")
-                                else:
-                                    print()
-                                print(f"  PX_MID exists:    {point.hasElement('PX_MID')}", end="")
-                                if point.hasElement('PX_MID'):
-                                    print(f" -> {point.getElementAsFloat('PX_MID')}")
-                                else:
-                                    print()
-                                print(f"  PX_BID exists:    {point.hasElement('PX_BID')}", end="")
-                                if point.hasElement('PX_BID'):
-                                    print(f" -> {point.getElementAsFloat('PX_BID')}")
-                                else:
-                                    print()
-                                print(f"  PX_ASK exists:    {point.hasElement('PX_ASK')}", end="")
-                                if point.hasElement('PX_ASK'):
-                                    print(f" -> {point.getElementAsFloat('PX_ASK')}")
-                                else:
-                                    print()
-                                print(f"  PX_SETTLE exists: {point.hasElement('PX_SETTLE')}", end="")
-                                if point.hasElement('PX_SETTLE'):
-                                    print(f" -> {point.getElementAsFloat('PX_SETTLE')}")
-                                else:
-                                    print()
-                                print(f"  VOLUME exists:    {point.hasElement('VOLUME')}", end="")
-                                if point.hasElement('VOLUME'):
-                                    print(f" -> {point.getElementAsFloat('VOLUME')}")
-                                else:
-                                    print()
-                                print(f"  PX_VOLUME exists: {point.hasElement('PX_VOLUME')}", end="")
-                                if point.hasElement('PX_VOLUME'):
-                                    print(f" -> {point.getElementAsFloat('PX_VOLUME')}")
-                                else:
-                                    print()
-                                print("=" * 40)
-                            
-                            # --- PRICE LOGIC (Priority: LAST > MID > SETTLE) ---
-                            price = 0.0
-                            price_source = "NONE"
-                            
-                            if point.hasElement("PX_LAST"):
-                                val = point.getElementAsFloat("PX_LAST")
-                                if val > 0:
-                                    price = val
-                                    price_source = "PX_LAST"
-                            
-                            if price == 0 and point.hasElement("PX_MID"):
-                                val = point.getElementAsFloat("PX_MID")
-                                if val > 0:
-                                    price = val
-                                    price_source = "PX_MID"
-                            
-                            # Calculate mid from bid/ask if PX_MID doesn't exist
-                            if price == 0:
-                                bid = 0.0
-                                ask = 0.0
-                                if point.hasElement("PX_BID"):
-                                    bid = point.getElementAsFloat("PX_BID")
-                                if point.hasElement("PX_ASK"):
-                                    ask = point.getElementAsFloat("PX_ASK")
-                                if bid > 0 and ask > 0:
-                                    price = (bid + ask) / 2
-                                    price_source = "CALC_MID"
-                            
-                            if price == 0 and point.hasElement("PX_SETTLE"):
-                                val = point.getElementAsFloat("PX_SETTLE")
-                                if val > 0:
-                                    price = val
-                                    price_source = "PX_SETTLE"
-                            
-                            # --- VOLUME LOGIC (Priority: VOLUME > PX_VOLUME) ---
-                            volume = 0.0
-                            
-                            if point.hasElement("VOLUME"):
-                                vol = point.getElementAsFloat("VOLUME")
-                                if vol > 0:
-                                    volume = vol
-                            
-                            if volume == 0 and point.hasElement("PX_VOLUME"):
-                                vol = point.getElementAsFloat("PX_VOLUME")
-                                if vol > 0:
-                                    volume = vol
-
-                            # --- OPEN INTEREST ---
-                            oi = 0.0
-                            if point.hasElement("OPEN_INT"):
-                                oi_val = point.getElementAsFloat("OPEN_INT")
-                                if oi_val > 0:
-                                    oi = oi_val
-
-                            # --- GREEKS (may be absent for non-options) ---
-                            def _g(fld):
-                                if point.hasElement(fld):
-                                    try:
-                                        return point.getElementAsFloat(fld)
-                                    except Exception:
-                                        return None
-                                return None
-
-                            records.append({
-                                "Date": pd.Timestamp(raw_date).strftime("%Y-%m-%d"),
-                                "Ticker": ticker,
-                                "Price": price,
-                                "PriceSource": price_source,
-                                "Volume": volume,
-                                "OI": oi,
-                                "IV": _g("IVOL_MID"),
-                                "Delta": _g("DELTA_MID"),
-                                "Gamma": _g("GAMMA_MID"),
-                                "Vega": _g("VEGA_MID"),
-                                "Theta": _g("THETA_MID"),
-                            })
-                            
-            if event.eventType() == blpapi.Event.RESPONSE:
-                break
-        
-        return pd.DataFrame(records)
+        end_date = datetime.datetime.now().strftime("%Y%m%d")
+        status = status if status is not None else _new_history_status()
+        hits, live = self._from_cache(tickers, HISTORY_FIELDS, start_date, end_date)
+        chunks.extend((tk, dates, values) for tk, (dates, values) in hits.items())
 
-    def get_greeks_snapshot(self, tickers: list) -> dict:
+        def on_message(msg):
+            if not msg.hasElement(NAME_SECURITY_DATA):
+                return
+            sec_data = msg.getElement(NAME_SECURITY_DATA)
+            if sec_data.hasElement(NAME_SECURITY_ERROR):
+                ticker = sec_data.getElementAsString(NAME_SECURITY)
+                status["errors"][ticker] = _error_info(sec_data.getElement(NAME_SECURITY_ERROR))
+                return
+            if sec_data.hasElement(NAME_FIELD_EXCEPTIONS):
+                exceptions = sec_data.getElement(NAME_FIELD_EXCEPTIONS)
+                ticker = sec_data.getElementAsString(NAME_SECURITY)
+                for i in range(exceptions.numValues()):
+                    exc = exceptions.getValueAsElement(i)
+                    field = exc.getElementAsString(NAME_FIELD_ID)
+                    status["field_exceptions"].setdefault(ticker, {})[field] = _error_info(exc.getElement(NAME_ERROR_INFO))
+            chunk = self._parse_history_block(sec_data)
+            if DEBUG_MODE:
+                _debug_history_chunk(*chunk)
+            chunks.append(chunk)
+
+        n = 0
+        for group, group_start, group_end in live:
+            for start in range(0, len(group), chunk_size):
+                n += 1
+                batch = group[start:start + chunk_size]
+                request = service.createRequest("HistoricalDataRequest")
+                for ticker in batch:
+                    request.append("securities", ticker)
+                for fld in HISTORY_FIELDS:
+                    request.append("fields", fld)
+                request.set("startDate", group_start)
+                request.set("endDate", group_end)
+                request.set("periodicitySelection", "DAILY")
+
+                def on_done(timed_out, batch=batch, group_start=group_start):
+                    if not timed_out:
+                        status["complete"].update(batch)
+                        ok = set(batch) - set(status["errors"])
+                        self._to_cache([c for c in chunks if c[0] in ok], HISTORY_FIELDS, group_start, end_date)
+
+                status["requested"].extend((tk, group_start) for tk in batch)
+                self._send(request, on_message, f"History chunk {n} ({group_start})",
+                           timeout=HISTORY_REQUEST_TIMEOUT, on_done=on_done, phase="history_request")
+
+    def _retry_history(self, chunks: list, status: dict, deadline: float):
         """
-        Fetch CURRENT Greeks via ReferenceDataRequest.
-        Historical Greeks are unreliable on Bloomberg; snapshot works.
-        Returns: {ticker: {iv, delta, gamma, vega, theta}}
+        Re-request tickers that timed out or hit a transient securityError, one
+        exponential-backoff round at a time, until everything is in, retries run
+        out or the fetch deadline is near. Blocks from every attempt stay in chunks.
         """
-        print(f"Fetching Greek snapshot for {len(tickers)} tickers...")
+        for attempt in range(1, HISTORY_MAX_RETRIES + 1):
+            retry = {}
+            for tk, start_date in status["requested"]:
+                category = status["errors"].get(tk, (None,))[0]
+                if tk in status["complete"] and category is None:
+                    continue
+                if category in PERMANENT_ERROR_CATEGORIES:
+                    continue
+                retry.setdefault(start_date, []).append(tk)
+            if not retry:
+                return
+            delay = HISTORY_RETRY_BACKOFF * 2 ** (attempt - 1)
+            if time.time() + delay + HISTORY_REQUEST_TIMEOUT > deadline:
+                print("⚠️ Fetch deadline reached - not retrying")
+                return
+            n_retry = sum(len(v) for v in retry.values())
+            print(f"🔁 Retry {attempt}/{HISTORY_MAX_RETRIES} in {delay:.1f}s for {n_retry} tickers: "
+                  f"{[tk for v in retry.values() for tk in v]}")
+            time.sleep(delay)
+            status["requested"] = []
+            for start_date, tickers in retry.items():
+                for tk in tickers:
+                    status["errors"].pop(tk, None)
+                self._send_history(list(dict.fromkeys(tickers)), start_date, chunks, status)
+            self._wait_all()
+
+    def _report_history_status(self, status: dict):
+        """One line per ticker that still has no complete history, plus field exceptions in debug mode."""
+        for tk, (category, message) in status["errors"].items():
+            print(f"⚠️ {tk}: securityError {category} {message}".rstrip())
+        incomplete = {tk for tk, _ in status["requested"]} - status["complete"] - set(status["errors"])
+        if incomplete:
+            print(f"⚠️ Partial history (timed out) for {sorted(incomplete)}")
+        if DEBUG_MODE:
+            for tk, fields in status["field_exceptions"].items():
+                print(f"  fieldExceptions {tk}: {fields}")
+
+    def _send_greeks_snapshot(self, tickers: list, results: dict):
+        """Queue the ReferenceDataRequest Greek snapshot; parsed values land in results."""
+        if not tickers:
+            return  # Every spread has expired - nothing to snapshot
         service = self.session.getService("//blp/refdata")
         request = service.createRequest("ReferenceDataRequest")
 
@@ -282,159 +596,682 @@ class BloombergEngine:
         for fld in ["IVOL_MID", "IVOL_LAST", "DELTA_MID", "GAMMA_MID", "VEGA_MID", "THETA_MID"]:
             request.append("fields", fld)
 
-        self.session.sendRequest(request)
+        def on_message(msg):
+            if not msg.hasElement(NAME_SECURITY_DATA):
+                return
+            sd = msg.getElement(NAME_SECURITY_DATA)
+            for i in range(sd.numValues()):
+                item = sd.getValueAsElement(i)
+                tk = item.getElementAsString(NAME_SECURITY)
+                if not item.hasElement(NAME_FIELD_DATA):
+                    continue
+                fd = item.getElement(NAME_FIELD_DATA)
+
+                def _f(fields):
+                    for f in fields:
+                        if fd.hasElement(f):
+                            try:
+                                return fd.getElementAsFloat(f)
+                            except Exception:
+                                continue
+                    return None
+
+                results[tk] = {
+                    "iv":    _f(["IVOL_MID", "IVOL_LAST"]),
+                    "delta": _f(["DELTA_MID"]),
+                    "gamma": _f(["GAMMA_MID"]),
+                    "vega":  _f(["VEGA_MID"]),
+                    "theta": _f(["THETA_MID"]),
+                }
+
+        self._send(request, on_message, "Greek snapshot", timeout=GREEKS_SNAPSHOT_TIMEOUT, phase="greek_snapshot")
+
+    def _send_raw_history(self, tickers: list, fields: list, start_date: str, end_date: str, records: list):
+        """Queue a HistoricalDataRequest for arbitrary fields; one {Date, Ticker, field...} dict per point."""
+        service = self.session.getService("//blp/refdata")
+        hits, live = self._from_cache(tickers, fields, start_date, end_date)
+        for tk, (dates, values) in hits.items():
+            for i, date in enumerate(dates.astype(str)):
+                records.append({"Date": date, "Ticker": tk, **dict(zip(fields, values[:, i].tolist()))})
+        failed = set()
+
+        def on_message(msg):
+            if not msg.hasElement(NAME_SECURITY_DATA):
+                return
+            sec_data = msg.getElement(NAME_SECURITY_DATA)
+            ticker = sec_data.getElementAsString(NAME_SECURITY)
+            if sec_data.hasElement(NAME_SECURITY_ERROR):
+                failed.add(ticker)
+            if not sec_data.hasElement(NAME_FIELD_DATA):
+                return
+            field_data = sec_data.getElement(NAME_FIELD_DATA)
+            for i in range(field_data.numValues()):
+                point = field_data.getValueAsElement(i)
+                row = {"Date": pd.Timestamp(point.getElementAsDatetime(NAME_DATE)).strftime("%Y-%m-%d"),
+                       "Ticker": ticker}
+                for f in fields:
+                    row[f] = point.getElementAsFloat(f) if point.hasElement(f) else np.nan
+                records.append(row)
+
+        for group, group_start, group_end in live:
+            request = service.createRequest("HistoricalDataRequest")
+            for ticker in group:
+                request.append("securities", ticker)
+            for f in fields:
+                request.append("fields", f)
+            request.set("startDate", group_start)
+            request.set("endDate", group_end)
+            request.set("periodicitySelection", "DAILY")
+
+            def on_done(timed_out, requested=set(group), group_start=group_start):
+                if timed_out or self.cache is None:
+                    return
+                rows = {tk: [] for tk in requested - failed}
+                for r in records:
+                    if r["Ticker"] in rows:
+                        rows[r["Ticker"]].append(r)
+                self._to_cache([(tk, np.array([r["Date"] for r in rs], dtype="datetime64[D]"),
+                                 np.array([[r[f] for r in rs] for f in fields], dtype=float).reshape(len(fields), -1))
+                                for tk, rs in rows.items()], fields, group_start, end_date)
+
+            self._send(request, on_message, f"History {fields} {group_start}-{group_end}",
+                       timeout=HISTORY_REQUEST_TIMEOUT, on_done=on_done, phase="raw_history_request")
 
+    def get_raw_history(self, tickers: list, fields: list, start_date: str, end_date: str) -> pd.DataFrame:
+        """Daily history for any field list (missing values NaN) - used by the analysis scripts."""
+        records = []
+        self._send_raw_history(tickers, fields, start_date, end_date, records)
+        self._wait_all()
+        return pd.DataFrame(records, columns=["Date", "Ticker"] + list(fields))
+
+    def get_history(self, tickers: list, start_date: str) -> pd.DataFrame:
+        print(f"Fetching history for {len(tickers)} tickers from {start_date}...")
+        deadline = time.time() + FETCH_DEADLINE
+        chunks = []  # (ticker, dates, values) per securityData block
+        status = _new_history_status()
+        self._send_history(tickers, start_date, chunks, status)
+        self._wait_all()
+        self._retry_history(chunks, status, deadline)
+        self._report_history_status(status)
+        return history_frame(chunks)
+
+    def get_greeks_snapshot(self, tickers: list) -> dict:
+        """
+        Fetch CURRENT Greeks via ReferenceDataRequest.
+        Historical Greeks are unreliable on Bloomberg; snapshot works.
+        Returns: {ticker: {iv, delta, gamma, vega, theta}}
+        """
+        print(f"Fetching Greek snapshot for {len(tickers)} tickers...")
         results = {}
-        timeout = time.time() + 10
-        while time.time() < timeout:
-            event = self.session.nextEvent(500)
-            for msg in event:
-                if msg.hasElement("securityData"):
-                    sd = msg.getElement("securityData")
-                    for i in range(sd.numValues()):
-                        item = sd.getValueAsElement(i)
-                        tk = item.getElementAsString("security")
-                        if not item.hasElement("fieldData"):
-                            continue
-                        fd = item.getElement("fieldData")
-
-                        def _f(fields):
-                            for f in fields:
-                                if fd.hasElement(f):
-                                    try:
-                                        return fd.getElementAsFloat(f)
-                                    except Exception:
-                                        continue
-                            return None
-
-                        results[tk] = {
-                            "iv":    _f(["IVOL_MID", "IVOL_LAST"]),
-                            "delta": _f(["DELTA_MID"]),
-                            "gamma": _f(["GAMMA_MID"]),
-                            "vega":  _f(["VEGA_MID"]),
-                            "theta": _f(["THETA_MID"]),
-                        }
-            if event.eventType() == blpapi.Event.RESPONSE:
-                break
+        self._send_greeks_snapshot(tickers, results)
+        self._wait_all()
         return results
 
+    def fetch_all(self, history_tickers: list, start_date: str, snapshot_tickers: list,
+                  backfill_tickers=(), backfill_start=START_DATE):
+        """
+        History (split into ticker chunks) and the Greek snapshot in flight together.
+        backfill_tickers get their history from backfill_start instead of start_date.
+        Finishes within about FETCH_DEADLINE: failed tickers are retried, anything
+        still missing after that is reported and left out rather than failing the run.
+        Returns (raw history DataFrame, {ticker: greeks}).
+        """
+        print(f"Fetching history for {len(history_tickers)} tickers from {start_date} "
+              f"+ Greek snapshot for {len(snapshot_tickers)} tickers...")
+        deadline = time.time() + FETCH_DEADLINE
+        chunks, greeks = [], {}
+        status = _new_history_status()
+        start = time.perf_counter()
+        self._send_history(history_tickers, start_date, chunks, status)
+        if backfill_tickers:
+            print(f"Backfilling {len(backfill_tickers)} new tickers from {backfill_start}: {list(backfill_tickers)}")
+            self._send_history(list(backfill_tickers), backfill_start, chunks, status)
+        self._send_greeks_snapshot(snapshot_tickers, greeks)
+        self._metric("send", time.perf_counter() - start, requests=len(self._inflight),
+                     tickers=len(history_tickers) + len(backfill_tickers), snapshot_tickers=len(snapshot_tickers))
+        self._wait_all()
+        start = time.perf_counter()
+        self._retry_history(chunks, status, deadline)
+        self._metric("retry", time.perf_counter() - start)
+        self._report_history_status(status)
+        return history_frame(chunks), greeks
+
+    def get_option_chain(self, expiries: list, start_date: str) -> pd.DataFrame:
+        """
+        Daily history for every listed call and put of each expiry (datetime.date), in
+        CHAIN_CHUNK_SIZE batches all in flight together. Returns the get_history frame.
+        """
+        tickers = [option_ticker(exp, k, right) for exp in expiries for right in CHAIN_RIGHTS for k in CHAIN_STRIKES]
+        print(f"Fetching option chain for {len(expiries)} expiries ({len(tickers)} candidate strikes) "
+              f"from {start_date}...")
+        deadline = time.time() + FETCH_DEADLINE
+        chunks, status = [], _new_history_status()
+        self._send_history(tickers, start_date, chunks, status, chunk_size=CHAIN_CHUNK_SIZE)
+        self._wait_all()
+        # Generated strikes that aren't listed - expected, not worth one line each
+        unlisted = [tk for tk, (category, _) in status["errors"].items() if category == "BAD_SEC"]
+        for tk in unlisted:
+            del status["errors"][tk]
+            status["complete"].add(tk)
+        if unlisted:
+            print(f"   {len(unlisted)} generated strikes not listed - skipped")
+        self._retry_history(chunks, status, deadline)
+        self._report_history_status(status)
+        return history_frame(chunks)
+
+    def _send_intraday_bars(self, ticker: str, interval: int, start, end, out: list):
+        """Queue one IntradayBarRequest (TRADE bars, naive-UTC datetimes); BAR_DTYPE rows land in out."""
+        service = self.session.getService("//blp/refdata")
+        request = service.createRequest("IntradayBarRequest")
+        request.set("security", ticker)
+        request.set("eventType", "TRADE")
+        request.set("interval", interval)
+        request.set("startDateTime", start)
+        request.set("endDateTime", end)
+
+        def on_message(msg):
+            if msg.hasElement(NAME_RESPONSE_ERROR):
+                print(f"⚠️ {ticker} {interval}m bars: {_error_info(msg.getElement(NAME_RESPONSE_ERROR))}")
+                return
+            if not msg.hasElement(NAME_BAR_DATA):
+                return
+            ticks = msg.getElement(NAME_BAR_DATA).getElement(NAME_BAR_TICK_DATA)
+            rows = np.zeros(ticks.numValues(), dtype=BAR_DTYPE)
+            for i in range(len(rows)):
+                bar = ticks.getValueAsElement(i)
+                t = bar.getElementAsDatetime(NAME_TIME)
+                if t.tzinfo is not None:
+                    t = t.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+                rows["time"][i] = (t - datetime.datetime(1970, 1, 1)) // datetime.timedelta(seconds=1)
+                for name, field in BAR_FIELD_NAMES:
+                    rows[field][i] = bar.getElementAsFloat(name)
+                rows["num_events"][i] = bar.getElementAsFloat(NAME_NUM_EVENTS)
+            out.append(rows)
+
+        self._send(request, on_message, f"{interval}m bars {ticker} {start:%Y-%m-%d}",
+                   timeout=BAR_REQUEST_TIMEOUT, phase="bar_request")
+
+    def get_intraday_bars(self, jobs: list) -> dict:
+        """
+        jobs: [(ticker, interval, start, end)] with naive-UTC datetimes. Windows longer than
+        BAR_REQUEST_DAYS are split; every request is in flight at once.
+        Returns {(ticker, interval): BAR_DTYPE array sorted by time}.
+        """
+        parts = {}
+        for ticker, interval, start, end in jobs:
+            out = parts.setdefault((ticker, interval), [])
+            lo = start
+            while lo < end:
+                hi = min(end, lo + datetime.timedelta(days=BAR_REQUEST_DAYS))
+                self._send_intraday_bars(ticker, interval, lo, hi, out)
+                lo = hi
+        print(f"Fetching intraday bars: {len(jobs)} series in {len(self._inflight)} requests...")
+        self._wait_all()
+        return {key: np.sort(np.concatenate(rows), order="time") if rows else np.empty(0, dtype=BAR_DTYPE)
+                for key, rows in parts.items()}
+
+    # --- STREAMING ---
+    def stream(self, tickers: list, on_quote, on_poll=None, duration=None):
+        """
+        Subscribe to STREAM_FIELDS for tickers on //blp/mktdata and call
+        on_quote(ticker, {field: value}) for every tick. on_poll() runs after each
+        event (or 100ms idle) so the caller can publish coalesced snapshots.
+        Runs until Ctrl+C, or for `duration` seconds.
+        """
+        if not self.session.openService("//blp/mktdata"):
+            raise RuntimeError("Failed to open //blp/mktdata")
+
+        subscriptions = blpapi.SubscriptionList()
+        by_cid = {}
+        for tk in tickers:
+            self._next_cid += 1
+            key = self._next_cid
+            by_cid[key] = tk
+            subscriptions.add(tk, STREAM_FIELDS, "", blpapi.CorrelationId(key))
+        self.session.subscribe(subscriptions)
+        print(f"📡 Streaming {len(tickers)} tickers ({', '.join(STREAM_FIELDS)}) - Ctrl+C to stop")
+
+        stop_at = time.time() + duration if duration else None
+        try:
+            while stop_at is None or time.time() < stop_at:
+                event = self.session.nextEvent(100)
+                event_type = event.eventType()
+                if event_type in (blpapi.Event.SUBSCRIPTION_DATA, blpapi.Event.SUBSCRIPTION_STATUS):
+                    for msg in event:
+                        tk = by_cid.get(msg.correlationIds()[0].value())
+                        if tk is None:
+                            continue
+                        if event_type == blpapi.Event.SUBSCRIPTION_STATUS:
+                            if msg.messageType() in (NAME_SUBSCRIPTION_FAILURE, NAME_SUBSCRIPTION_TERMINATED):
+                                print(f"⚠️ Subscription {msg.messageType()} for {tk}")
+                            continue
+                        quote = {}
+                        for name, field in STREAM_FIELD_NAMES.items():
+                            if msg.hasElement(name):
+                                el = msg.getElement(name)
+                                if not el.isNull():
+                                    quote[field] = el.getValueAsFloat()
+                        if quote:
+                            on_quote(tk, quote)
+                if on_poll:
+                    on_poll()
+        except KeyboardInterrupt:
+            print("\nStopping stream...")
+        finally:
+            self.session.unsubscribe(subscriptions)
+
     def close(self):
         if self.session:
             self.session.stop()
 
-# --- GIT AUTOMATION FUNCTION ---
-def push_to_github(file_path):
+# --- PIVOT ENGINE ---
+ZERO_FILL_FIELDS = {"Price", "Volume", "OI"}  # Missing -> 0.0; missing Greeks stay NaN (Quality -> QF_NO_PRICE)
+SNAPSHOT_GREEK_KEYS = {"IV": "iv", "Delta": "delta", "Gamma": "gamma", "Vega": "vega", "Theta": "theta"}
+
+
+def build_wide_frame(raw_df, spreads=None):
     """
-    Commits and pushes the specific file to GitHub.
+    Turn the long (Date, Ticker) history into the wide one-row-per-date layout
+    for `spreads` (default: SPREADS_CONFIG), named by each spread's registry column map.
+    One unstack, then every derived column (Spread, Total_Volume, Total_OI, Net Greeks,
+    Futures_to_Cx, Quality flags) is whole-column arithmetic.
+    Missing prices/volumes/OI are 0.0, missing Greeks / Spread are NaN.
     """
-    import os
-    print(f"\n🚀 Starting Git Push for {file_path}...")
-    print(f"   CWD: {os.getcwd()}")
-    print(f"   File exists: {Path(file_path).exists()}")
-    
-    try:
-        # 0. Verify we're inside a git repo
-        check_repo = subprocess.run(
-            ["git", "rev-parse", "--git-dir"],
-            capture_output=True, text=True
-        )
-        if check_repo.returncode != 0:
-            print(f"❌ Not inside a git repository! stderr: {check_repo.stderr.strip()}")
-            return
-        print(f"   Git repo: {check_repo.stdout.strip()}")
-        
-        # 1. Show git status before adding
-        status = subprocess.run(["git", "status", "--short"], capture_output=True, text=True)
-        print(f"   Git status: {status.stdout.strip() or '(clean)'}")
-        
-        # 2. Add the specific file
-        add_result = subprocess.run(
-            ["git", "add", str(file_path)],
-            capture_output=True, text=True
-        )
-        if add_result.returncode != 0:
-            print(f"❌ git add failed: {add_result.stderr.strip()}")
+    spreads = SPREADS_CONFIG if spreads is None else spreads
+    if "Quality" not in raw_df.columns:
+        raw_df = raw_df.assign(Quality=quality_flags(raw_df))
+    raw = raw_df.drop(columns=["PriceSource"] + RAW_FIELDS, errors="ignore")  # Already resolved into Price/Volume/OI
+    raw = raw.drop_duplicates(subset=["Date", "Ticker"], keep="first")
+    wide = raw.set_index(["Date", "Ticker"]).unstack("Ticker").sort_index()
+    dates = wide.index
+
+    def field(name, ticker):
+        if (name, ticker) in wide.columns:
+            return wide[(name, ticker)].astype(float)
+        return pd.Series(np.nan, index=dates)
+
+    def present(ticker):
+        # Price is always filled by get_history, so NaN after unstack == no row that date
+        return field("Price", ticker).notna()
+
+    cols = {}
+
+    if INCLUDE_VIX_SPOT:
+        cols["VIX_Spot"] = field("Price", VIX_SPOT_TICKER).fillna(0.0)
+
+    # --- VIX TERM STRUCTURE (UX1..UX8) + VVIX ---
+    for i, tk in enumerate(TERM_STRUCTURE_TICKERS, start=1):
+        cols[f"UX{i}"] = field("Price", tk).fillna(0.0)
+    cols["VVIX"] = field("Price", VVIX_TICKER).fillna(0.0)
+
+    # Each (ticker, field) series is built once, however many spreads share the instrument
+    series = {}
+
+    def source(ticker, name):
+        if (ticker, name) not in series:
+            values = field(name, ticker)
+            if name == "Quality":
+                values = values.fillna(QF_NO_PRICE).astype(np.uint8)
+            elif name in ZERO_FILL_FIELDS:
+                values = values.fillna(0.0)
+            series[(ticker, name)] = values
+        return series[(ticker, name)]
+
+    for conf in spreads.values():
+        c = conf["columns"]
+        out = {col: source(ticker, name) for col, (ticker, name) in leg_sources(conf).items()}
+
+        futures_price = out[c["VIX_Futures"]]
+        if INCLUDE_VIX_SPOT:
+            spot = cols["VIX_Spot"]
+            out[c["Contango"]] = (futures_price - spot).where((futures_price > 0) & (spot > 0))
+
+        l_price, s_price = out[c["Long_Price"]], out[c["Short_Price"]]
+        both_legs = present(conf["long"]) & present(conf["short"]) & (l_price > 0) & (s_price > 0)
+        out[c["Spread"]] = (l_price - s_price).where(both_legs)
+        out[c["Total_Volume"]] = out[c["Long_Volume"]] + out[c["Short_Volume"]]
+        out[c["Total_OI"]] = out[c["Long_OI"]] + out[c["Short_OI"]]
+
+        # --- QUALITY: either leg's flags, plus a spread outside [0, K2 - K1] (no-arbitrage bounds) ---
+        width = conf["short_strike"] - conf["long_strike"]
+        out_of_range = (out[c["Spread"]] < 0) | (out[c["Spread"]] > width)
+        out[c["Spread_Quality"]] = (out[c["Long_Quality"]] | out[c["Short_Quality"]]
+                                    | np.where(out_of_range, QF_OUT_OF_RANGE, 0).astype(np.uint8))
+
+        # --- AGGREGATED NET GREEKS (long - short) ---
+        for g in LEG_GREEKS[1:]:
+            out[c[f"Net_{g}"]] = out[c[f"Long_{g}"]] - out[c[f"Short_{g}"]]
+
+        # --- Moneyness (distance from futures to strikes) ---
+        for k in (conf["long_strike"], conf["short_strike"]):
+            out[c[f"Futures_to_C{k:g}"]] = (futures_price - k).where(futures_price > 0)
+
+        # Registry column order
+        cols.update((col, out[col]) for col in c.values() if col in out)
+
+    final_df = pd.DataFrame(cols, index=dates)
+    final_df.index.name = "Date"
+    return final_df.reset_index()
+
+
+def greeks_to_long(greek_snap, date, option_tickers):
+    """
+    Snapshot Greeks as long rows for `date` (HistoricalDataRequest doesn't return
+    current Greeks reliably). Missing values are NaN rows, which merge_long turns
+    into deletions - the same as overwriting the latest row with NaN.
+    """
+    rows = []
+    for tk in option_tickers:
+        snap = greek_snap.get(tk, {})
+        for g, key in SNAPSHOT_GREEK_KEYS.items():
+            v = snap.get(key)
+            rows.append((date, tk, g, np.nan if v is None else float(v)))
+        if DEBUG_MODE:
+            print(f"  Greeks snapshot for {tk}: {snap}")
+    out = pd.DataFrame(rows, columns=["Date", "Ticker", "Field", "Value"])
+    out["Date"] = pd.to_datetime(out["Date"])
+    return out
+
+
+def materialize_wide(spreads=None, long_df=None, long_path=LONG_STORE_PATH):
+    """
+    Wide view for any set of spreads ({name: conf}, default SPREADS_CONFIG), built
+    from the long store. Only the tickers those spreads need are read.
+    """
+    spreads = SPREADS_CONFIG if spreads is None else spreads
+    tickers = list(TERM_STRUCTURE_TICKERS) + [VVIX_TICKER] + ([VIX_SPOT_TICKER] if INCLUDE_VIX_SPOT else [])
+    for conf in spreads.values():
+        tickers += [conf["futures"], conf["long"], conf["short"]]
+    tickers = list(dict.fromkeys(tickers))
+
+    if long_df is None:
+        long_df = read_long(long_path, tickers=tickers)
+    else:
+        long_df = long_df[long_df["Ticker"].isin(tickers)]
+    if long_df is None or long_df.empty:
+        return pd.DataFrame()
+    return build_wide_frame(resolve_prices(long_to_history(long_df)), spreads)
+
+
+# --- INCREMENTAL STORE HELPERS ---
+def resolve_fetch_start(existing_long):
+    """Start date (YYYYMMDD) for the history request: last stored Date minus the overlap window."""
+    if existing_long is None or existing_long.empty:
+        return START_DATE
+    last_date = existing_long["Date"].max()
+    start = last_date - pd.offsets.BDay(INCREMENTAL_OVERLAP_DAYS)
+    return max(start.strftime("%Y%m%d"), START_DATE)
+
+
+# --- STREAMING MODE ---
+def _quote_mid(q):
+    """Mid if both sides are quoted, else last trade, else None."""
+    if q is None:
+        return None
+    bid, ask = q.get("BID"), q.get("ASK")
+    if bid and ask and bid > 0 and ask >= bid:
+        return round((bid + ask) / 2, 4)
+    last = q.get("LAST_PRICE")
+    return last if last and last > 0 else None
+
+
+class LiveMarks:
+    """
+    Quote book for streaming mode. A tick only re-marks the spreads that use the
+    ticked instrument (the Mar C20 leg re-marks both Mar spreads, UX1 none).
+    """
+    def __init__(self, spreads=None):
+        self.spreads = SPREADS_CONFIG if spreads is None else spreads
+        self.quotes = {}  # ticker -> {BID, ASK, LAST_PRICE, time}
+        self.marks = {}   # spread name -> {mid, bid, ask, long, short, futures}
+        self._by_ticker = {}
+        for name, conf in self.spreads.items():
+            for tk in (conf["long"], conf["short"], conf["futures"]):
+                self._by_ticker.setdefault(tk, []).append(name)
+        self.ticks = 0
+        self.dirty = False
+
+    def update(self, ticker, quote):
+        q = self.quotes.setdefault(ticker, {})
+        q.update(quote)
+        q["time"] = time.time()
+        for name in self._by_ticker.get(ticker, ()):
+            self._mark(name)
+        self.ticks += 1
+        self.dirty = True
+
+    def _mark(self, name):
+        conf = self.spreads[name]
+        lq, sq = self.quotes.get(conf["long"]), self.quotes.get(conf["short"])
+        l_mid, s_mid = _quote_mid(lq), _quote_mid(sq)
+        fut = _quote_mid(self.quotes.get(conf["futures"]))
+        mark = {
+            "long": l_mid,
+            "short": s_mid,
+            "futures": round(fut, 4) if fut is not None else None,
+            "mid": round(l_mid - s_mid, 4) if l_mid is not None and s_mid is not None else None,
+            "bid": None,
+            "ask": None,
+        }
+        # Crossing the spread: sell long at its bid / buy short at its ask and vice versa
+        if lq and sq and lq.get("BID") and sq.get("ASK"):
+            mark["bid"] = round(lq["BID"] - sq["ASK"], 4)
+        if lq and sq and lq.get("ASK") and sq.get("BID"):
+            mark["ask"] = round(lq["ASK"] - sq["BID"], 4)
+        self.marks[name] = mark
+
+    def snapshot(self):
+        return {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "ticks": self.ticks,
+            "spreads": {self.spreads[name]["prefix"]: mark for name, mark in self.marks.items()},
+            "term_structure": {f"UX{i}": _quote_mid(self.quotes.get(tk))
+                               for i, tk in enumerate(TERM_STRUCTURE_TICKERS, start=1)},
+            "VVIX": _quote_mid(self.quotes.get(VVIX_TICKER)),
+        }
+
+
+class SnapshotPublisher:
+    """Writes LiveMarks snapshots to disk at most max_per_sec times a second (atomic replace)."""
+    def __init__(self, path=LIVE_MARKS_PATH, max_per_sec=STREAM_MAX_SNAPSHOTS_PER_SEC):
+        self.path = Path(path)
+        self.min_interval = 1.0 / max_per_sec
+        self._last = 0.0
+        self.published = 0
+
+    def maybe_publish(self, marks, force=False):
+        now = time.time()
+        if not marks.dirty or (not force and now - self._last < self.min_interval):
             return
-        print("   ✓ git add OK")
-        
-        # 3. Commit with a timestamp
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        commit_message = f"Auto-update VIX Data: {timestamp}"
-        
-        commit_result = subprocess.run(
-            ["git", "commit", "-m", commit_message],
-            capture_output=True, text=True
-        )
-        if commit_result.returncode != 0:
-            # Check if it's just "nothing to commit"
-            if "nothing to commit" in commit_result.stdout:
-                print("   ⚠️ Nothing to commit (no changes detected)")
-                return
-            else:
-                print(f"❌ git commit failed:")
-                print(f"   stdout: {commit_result.stdout.strip()}")
-                print(f"   stderr: {commit_result.stderr.strip()}")
-                return
-        print(f"   ✓ git commit OK: {commit_result.stdout.strip()}")
-        
-        # 4. Push to remote
-        push_result = subprocess.run(
-            ["git", "push"],
-            capture_output=True, text=True,
-            timeout=30  # Fail fast if network is down
-        )
-        
-        if push_result.returncode == 0:
-            print("✅ Successfully pushed to GitHub!")
-        else:
-            print(f"❌ git push failed:")
-            print(f"   stdout: {push_result.stdout.strip()}")
-            print(f"   stderr: {push_result.stderr.strip()}")
-            # Common fixes
-            if "Authentication" in push_result.stderr or "403" in push_result.stderr:
-                print("   💡 Fix: Your GitHub token may have expired. Regenerate at github.com/settings/tokens")
-            elif "Could not resolve host" in push_result.stderr:
-                print("   💡 Fix: No network connection")
-            elif "rejected" in push_result.stderr:
-                print("   💡 Fix: Remote has changes. Try 'git pull --rebase' first")
-                
-    except subprocess.TimeoutExpired:
-        print("❌ git push timed out after 30s — check your network connection")
-    except Exception as e:
-        print(f"❌ Git Automation Failed: {type(e).__name__}: {e}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(marks.snapshot(), indent=1))
+        os.replace(tmp, self.path)
+        marks.dirty = False
+        self._last = now
+        self.published += 1
+
+
+def stream_main(session=None, duration=None):
+    """Streaming mode: live marks for every configured spread -> LIVE_MARKS_PATH."""
+    engine = BloombergEngine(session=session)
+    try:
+        all_tickers, _ = collect_tickers()
+        marks = LiveMarks()
+        publisher = SnapshotPublisher()
+        engine.stream(all_tickers, marks.update, lambda: publisher.maybe_publish(marks), duration=duration)
+        publisher.maybe_publish(marks, force=True)
+        print(f"✅ Stream stopped: {marks.ticks} ticks -> {publisher.published} snapshots in {LIVE_MARKS_PATH}")
+    finally:
+        engine.close()
+
+
+# --- OPTION CHAIN MODE ---
+def chain_main(session=None, start_date=START_DATE):
+    """
+    Chain mode: full strike chain for every tracked expiry -> CHAIN_STORE_PATH.
+    Expiries that are already stored and have expired are not re-fetched.
+    """
+    existing = read_chain(CHAIN_STORE_PATH)
+    stored = set(existing["expiries"].astype(object)) if existing is not None else set()
+    today = datetime.date.today()
+    expiries = sorted(exp for exp in expiry_dates() if exp >= today or exp not in stored)
+    if not expiries:
+        print(f"Option chain up to date in {CHAIN_STORE_PATH} (all tracked expiries expired and stored)")
+        return True
+
+    engine = BloombergEngine(session=session)
+    try:
+        history = engine.get_option_chain(expiries, start_date)
+    finally:
+        engine.close()
+    if history.empty:
+        print("No chain data received.")
+        return False
+    chain = merge_chain(existing, history[["Date", "Ticker", "Price", "Volume", "OI"]])
+    write_chain(chain, CHAIN_STORE_PATH)
+    e, k, d = chain["C_Price"].shape
+    print(f"✅ Option chain saved to {CHAIN_STORE_PATH}: {e} expiries x {k} strikes x {d} days "
+          f"({history['Ticker'].nunique()} listed options fetched)")
+    return True
+
+
+# --- INTRADAY BAR MODE ---
+def bars_main(session=None, intervals=BAR_INTERVALS):
+    """
+    Bar mode: append new 1m / 5m bars for every leg and futures contract to the bar store.
+    Each series resumes after its last stored bar; series already synced after their
+    expiry are skipped.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    expiry_of = {}
+    for conf in SPREADS_CONFIG.values():
+        expiry = datetime.datetime.strptime(conf["expiry_date"], "%Y-%m-%d") + datetime.timedelta(days=1)
+        for tk in (conf["futures"], conf["long"], conf["short"]):
+            expiry_of[tk] = max(expiry_of.get(tk, expiry), expiry)
+
+    jobs = []
+    for tk, expires in expiry_of.items():
+        for interval in intervals:
+            synced = last_sync(tk, interval)
+            if synced is not None and synced > expires:
+                continue
+            last = last_bar_time(tk, interval)
+            start = (datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=last + 60 * interval)
+                     if last is not None else now - datetime.timedelta(days=BAR_BACKFILL_DAYS))
+            end = min(now, expires)
+            if start < end:
+                jobs.append((tk, interval, start, end))
+    if not jobs:
+        print("Intraday bars up to date (every series is past expiry and stored)")
+        return True
+
+    engine = BloombergEngine(session=session)
+    try:
+        bars = engine.get_intraday_bars(jobs)
+    finally:
+        engine.close()
+    written = 0
+    for (tk, interval), rows in bars.items():
+        n = append_bars(tk, interval, rows)
+        written += n
+        if DEBUG_MODE:
+            print(f"  {tk} {interval}m: +{n} bars")
+    print(f"✅ {written} new bars appended for {len(bars)} series")
+    return True
+
 
 # --- MAIN LOGIC ---
-def main():
+def collect_tickers():
+    """
+    Returns (all history tickers, option legs for the Greek snapshot), each instrument
+    once even when several spreads share it (e.g. the Mar 2026 C20 leg and UXH26).
+    """
+    futures, option_tickers = unique_instruments(SPREADS_CONFIG)
+    all_tickers = ([VIX_SPOT_TICKER] if INCLUDE_VIX_SPOT else []) + futures + option_tickers
+    all_tickers += TERM_STRUCTURE_TICKERS + [VVIX_TICKER]
+    shared = shared_instruments(SPREADS_CONFIG)
+    if shared:
+        print(f"{len(SPREADS_CONFIG)} spreads -> {len(futures) + len(option_tickers)} instruments "
+              f"({len(shared)} shared: {', '.join(shared)})")
+    return list(dict.fromkeys(all_tickers)), option_tickers
+
+
+def expiry_dates():
+    """{expiry date: spread names} from SPREADS_CONFIG."""
+    out = {}
+    for name, conf in SPREADS_CONFIG.items():
+        out.setdefault(datetime.datetime.strptime(conf["expiry"], "%m/%d/%y").date(), []).append(name)
+    return out
+
+
+def expired_tickers(as_of):
+    """Legs + futures of spreads that expired before `as_of` (a date) - they never settle again."""
+    expired = set()
+    for name, conf in SPREADS_CONFIG.items():
+        if datetime.datetime.strptime(conf["expiry"], "%m/%d/%y").date() < as_of:
+            expired.update([conf["long"], conf["short"], conf["futures"]])
+    return expired
+
+
+def main(full_refresh=False, session=None, record_to=None, engine=None, publish=publish_async):
+    """
+    One fetch run. Returns True once the data is saved.
+    engine:  an already-connected engine to reuse (left open) - e.g. the scheduler's warm session
+    publish: called with PUBLISH_PATHS after saving
+    Per-phase timings go to vix_metrics.METRICS_PATH (python vix_metrics.py for p50/p95).
+    """
+    metrics = RunMetrics()
+    run_start = time.perf_counter()
+    own_engine = engine is None
+    ok = False
     try:
-        engine = BloombergEngine()
-        
-        # --- CHANGE 2: Collect all tickers including VIX futures for each spread ---
-        all_tickers = []
-        
-        # Optionally include VIX spot for contango reference
-        if INCLUDE_VIX_SPOT:
-            all_tickers.append(VIX_SPOT_TICKER)
-        
-        # Add futures and options for each spread
-        for conf in SPREADS_CONFIG.values():
-            all_tickers.append(conf["futures"])  # VIX Futures
-            all_tickers.append(conf["long"])      # Long option leg
-            all_tickers.append(conf["short"])     # Short option leg
-
-        # Add VIX term structure (UX1..UX8) and VVIX
-        all_tickers.extend(TERM_STRUCTURE_TICKERS)
-        all_tickers.append(VVIX_TICKER)
-
-        # Remove duplicates while preserving order
-        all_tickers = list(dict.fromkeys(all_tickers))
-        
+        if engine is None and USE_GATEWAY and session is None and record_to is None:
+            from vix_gateway import connect_gateway
+            engine = connect_gateway()
+            if engine is not None:
+                print("Using running Bloomberg gateway")
+        if engine is None:
+            engine = BloombergEngine(session=session, record_to=record_to, metrics=metrics)
+        elif isinstance(engine, BloombergEngine):
+            engine.metrics = metrics  # Reused warm session - this run's records get this run's id
+
+        all_tickers, option_tickers = collect_tickers()
         print(f"Tickers to fetch: {all_tickers}")
-            
-        # 1. Get Raw History
-        raw_df = engine.get_history(all_tickers, START_DATE)
+
+        # 0. Incremental mode: only ask for days we don't have yet (+ overlap),
+        #    and backfill tickers the long store has never seen
+        existing_long = None
+        if INCREMENTAL_MODE and not full_refresh:
+            try:
+                existing_long = read_long(LONG_STORE_PATH)
+            except Exception as e:
+                print(f"⚠️ Could not read long store ({e}) - doing full fetch")
+        fetch_start = resolve_fetch_start(existing_long)
+        if existing_long is not None and not existing_long.empty:
+            stored = set(existing_long["Ticker"].unique())
+            # Stored contracts that expired before the re-fetch window can't have new settlements
+            expired = expired_tickers(pd.Timestamp(fetch_start).date()) & stored
+            refresh_tickers = [tk for tk in all_tickers if tk in stored and tk not in expired]
+            backfill_tickers = [tk for tk in all_tickers if tk not in stored]
+            option_tickers = [tk for tk in option_tickers if tk not in expired]
+            print(f"Incremental fetch: {existing_long['Date'].nunique()} stored days for {len(stored)} tickers, "
+                  f"last {existing_long['Date'].max():%Y-%m-%d}, re-fetching from {fetch_start}")
+            if expired:
+                print(f"Skipping {len(expired)} expired tickers: {sorted(expired)}")
+        else:
+            refresh_tickers, backfill_tickers = all_tickers, []
+            print(f"Full fetch from {fetch_start}")
+
+        # 1. Get Raw History + Greek snapshot (all requests in flight together)
+        with metrics.phase("fetch", tickers=len(refresh_tickers) + len(backfill_tickers),
+                           snapshot_tickers=len(option_tickers)) as m:
+            raw_df, greek_snap = engine.fetch_all(refresh_tickers, fetch_start, option_tickers,
+                                                  backfill_tickers=backfill_tickers)
+            m["rows"] = len(raw_df)
         if raw_df.empty:
             print("No data received.")
-            return
+            return False
 
         # 2. Show price source summary
         if DEBUG_MODE:
@@ -442,158 +1279,27 @@ def main():
             print(raw_df.groupby(["Ticker", "PriceSource"]).size())
             print("=" * 40 + "\n")
 
-        # 3. Pivot and Format Data
+        # 3. Merge into the long store; the latest date's Greeks come from the snapshot
         print("Processing data...")
-        dates = raw_df["Date"].unique()
-        final_rows = []
-        
-        for date in sorted(dates):
-            date_df = raw_df[raw_df["Date"] == date]
-            row = {"Date": date}
-            
-            # --- CHANGE 3: Get VIX Spot (optional, for contango analysis) ---
-            if INCLUDE_VIX_SPOT:
-                vix_row = date_df[date_df["Ticker"] == VIX_SPOT_TICKER]
-                vix_spot = vix_row["Price"].values[0] if not vix_row.empty else 0.0
-                row["VIX_Spot"] = vix_spot
-
-            # --- VIX TERM STRUCTURE (UX1..UX8) ---
-            for i, tk in enumerate(TERM_STRUCTURE_TICKERS, start=1):
-                ts_row = date_df[date_df["Ticker"] == tk]
-                row[f"UX{i}"] = ts_row["Price"].values[0] if not ts_row.empty else 0.0
-
-            # --- VVIX ---
-            vvix_row = date_df[date_df["Ticker"] == VVIX_TICKER]
-            row["VVIX"] = vvix_row["Price"].values[0] if not vvix_row.empty else 0.0
-
-            for name, conf in SPREADS_CONFIG.items():
-                prefix = name.replace(" ", "_")
-                
-                # --- CHANGE 4: Get VIX Futures price for this spread's expiry ---
-                futures_row = date_df[date_df["Ticker"] == conf["futures"]]
-                futures_price = futures_row["Price"].values[0] if not futures_row.empty else 0.0
-                row[f"{prefix}_VIX_Futures"] = futures_price
-                
-                # Calculate contango (futures - spot) if spot is included
-                if INCLUDE_VIX_SPOT and futures_price > 0 and row.get("VIX_Spot", 0) > 0:
-                    row[f"{prefix}_Contango"] = futures_price - row["VIX_Spot"]
-                
-                # Get Long Leg
-                l_row = date_df[date_df["Ticker"] == conf["long"]]
-                l_price = l_row["Price"].values[0] if not l_row.empty else 0.0
-                l_vol = l_row["Volume"].values[0] if not l_row.empty else 0.0
-                l_oi = l_row["OI"].values[0] if not l_row.empty else 0.0
-
-                # Get Short Leg
-                s_row = date_df[date_df["Ticker"] == conf["short"]]
-                s_price = s_row["Price"].values[0] if not s_row.empty else 0.0
-                s_vol = s_row["Volume"].values[0] if not s_row.empty else 0.0
-                s_oi = s_row["OI"].values[0] if not s_row.empty else 0.0
-
-                # Calculate Spread
-                if not l_row.empty and not s_row.empty and l_price > 0 and s_price > 0:
-                    spread = l_price - s_price
-                else:
-                    spread = None
-
-                row[f"{prefix}_Long_Price"] = l_price
-                row[f"{prefix}_Short_Price"] = s_price
-                row[f"{prefix}_Long_Volume"] = l_vol
-                row[f"{prefix}_Short_Volume"] = s_vol
-                row[f"{prefix}_Long_OI"] = l_oi
-                row[f"{prefix}_Short_OI"] = s_oi
-                row[f"{prefix}_Spread"] = spread
-                row[f"{prefix}_Total_Volume"] = l_vol + s_vol
-                row[f"{prefix}_Total_OI"] = l_oi + s_oi
-
-                # --- GREEKS per leg ---
-                def _leg_greek(leg_row, field):
-                    if leg_row.empty:
-                        return None
-                    val = leg_row[field].values[0]
-                    return None if pd.isna(val) else float(val)
-
-                long_iv    = _leg_greek(l_row, "IV")
-                long_dlt   = _leg_greek(l_row, "Delta")
-                long_gma   = _leg_greek(l_row, "Gamma")
-                long_vga   = _leg_greek(l_row, "Vega")
-                long_tht   = _leg_greek(l_row, "Theta")
-                short_iv   = _leg_greek(s_row, "IV")
-                short_dlt  = _leg_greek(s_row, "Delta")
-                short_gma  = _leg_greek(s_row, "Gamma")
-                short_vga  = _leg_greek(s_row, "Vega")
-                short_tht  = _leg_greek(s_row, "Theta")
-
-                row[f"{prefix}_Long_IV"]     = long_iv
-                row[f"{prefix}_Long_Delta"]  = long_dlt
-                row[f"{prefix}_Long_Gamma"]  = long_gma
-                row[f"{prefix}_Long_Vega"]   = long_vga
-                row[f"{prefix}_Long_Theta"]  = long_tht
-                row[f"{prefix}_Short_IV"]    = short_iv
-                row[f"{prefix}_Short_Delta"] = short_dlt
-                row[f"{prefix}_Short_Gamma"] = short_gma
-                row[f"{prefix}_Short_Vega"]  = short_vga
-                row[f"{prefix}_Short_Theta"] = short_tht
-
-                # --- AGGREGATED NET GREEKS (long - short) ---
-                def _net(a, b):
-                    return (a - b) if (a is not None and b is not None) else None
-                row[f"{prefix}_Net_Delta"] = _net(long_dlt, short_dlt)
-                row[f"{prefix}_Net_Gamma"] = _net(long_gma, short_gma)
-                row[f"{prefix}_Net_Vega"]  = _net(long_vga, short_vga)
-                row[f"{prefix}_Net_Theta"] = _net(long_tht, short_tht)
-
-                # --- CHANGE 5: Calculate moneyness (distance from futures to strikes) ---
-                if futures_price > 0:
-                    long_k = conf.get("long_strike", 20)
-                    short_k = conf.get("short_strike", 25)
-                    row[f"{prefix}_Futures_to_C{long_k}"] = futures_price - long_k
-                    row[f"{prefix}_Futures_to_C{short_k}"] = futures_price - short_k
-
-            final_rows.append(row)
-            
-        # 3b. Snapshot current Greeks (HistoricalDataRequest doesn't return them reliably)
-        option_tickers = []
-        for conf in SPREADS_CONFIG.values():
-            option_tickers.extend([conf["long"], conf["short"]])
-        option_tickers = list(dict.fromkeys(option_tickers))
-
-        greek_snap = engine.get_greeks_snapshot(option_tickers)
-
-        # Patch the latest row with snapshot Greeks
-        last_idx = len(final_rows) - 1
-        for name, conf in SPREADS_CONFIG.items():
-            prefix = name.replace(" ", "_")
-            lg = greek_snap.get(conf["long"], {})
-            sg = greek_snap.get(conf["short"], {})
-
-            final_rows[last_idx][f"{prefix}_Long_IV"]    = lg.get("iv")
-            final_rows[last_idx][f"{prefix}_Long_Delta"] = lg.get("delta")
-            final_rows[last_idx][f"{prefix}_Long_Gamma"] = lg.get("gamma")
-            final_rows[last_idx][f"{prefix}_Long_Vega"]  = lg.get("vega")
-            final_rows[last_idx][f"{prefix}_Long_Theta"] = lg.get("theta")
-            final_rows[last_idx][f"{prefix}_Short_IV"]    = sg.get("iv")
-            final_rows[last_idx][f"{prefix}_Short_Delta"] = sg.get("delta")
-            final_rows[last_idx][f"{prefix}_Short_Gamma"] = sg.get("gamma")
-            final_rows[last_idx][f"{prefix}_Short_Vega"]  = sg.get("vega")
-            final_rows[last_idx][f"{prefix}_Short_Theta"] = sg.get("theta")
-
-            def _net(a, b):
-                return (a - b) if (a is not None and b is not None) else None
-            final_rows[last_idx][f"{prefix}_Net_Delta"] = _net(lg.get("delta"), sg.get("delta"))
-            final_rows[last_idx][f"{prefix}_Net_Gamma"] = _net(lg.get("gamma"), sg.get("gamma"))
-            final_rows[last_idx][f"{prefix}_Net_Vega"]  = _net(lg.get("vega"),  sg.get("vega"))
-            final_rows[last_idx][f"{prefix}_Net_Theta"] = _net(lg.get("theta"), sg.get("theta"))
+        with metrics.phase("merge") as m:
+            new_long = to_long(raw_df)
+            greek_long = greeks_to_long(greek_snap, raw_df["Date"].max(), option_tickers)
+            if not greek_long.empty:
+                new_long = pd.concat([new_long, greek_long], ignore_index=True)
+            long_df = merge_long(existing_long, new_long, fetch_start)
+            m["rows"] = len(long_df)
+        with metrics.phase("long_write", rows=len(long_df)):
+            write_long(long_df, LONG_STORE_PATH)
 
-            if DEBUG_MODE:
-                print(f"  Greeks patched for {name}: long={lg}, short={sg}")
-
-        # 4. Save to CSV
-        final_df = pd.DataFrame(final_rows)
-        final_df.to_csv(CSV_PATH, index=False)
+        # 4. Materialize the wide per-spread view and save (Parquet + CSV export)
+        with metrics.phase("pivot", spreads=len(SPREADS_CONFIG)) as m:
+            final_df = materialize_wide(long_df=long_df)
+            m["rows"], m["columns"] = final_df.shape
+        with metrics.phase("store_write", rows=len(final_df), columns=final_df.shape[1]):
+            write_store(final_df, STORE_PATH, csv_path=CSV_PATH)
         
-        print(f"\n✅ Success! Data saved to {CSV_PATH}")
-        print(f"   Total Days: {len(final_df)}")
+        print(f"\n✅ Success! Data saved to {LONG_STORE_PATH} + view {STORE_PATH} (CSV export: {CSV_PATH})")
+        print(f"   Total Days: {len(final_df)} ({raw_df['Date'].nunique()} fetched this run)")
         print(f"\n   Latest data point:")
         latest = final_df.iloc[-1]
         print(f"   Date: {latest['Date']}")
@@ -602,34 +1308,54 @@ def main():
             print(f"   VIX Spot: {latest['VIX_Spot']:.2f}")
         
         for name, conf in SPREADS_CONFIG.items():
-            prefix = name.replace(" ", "_")
-            long_k = conf.get("long_strike", 20)
-            short_k = conf.get("short_strike", 25)
-            futures_val = latest.get(f'{prefix}_VIX_Futures', 0)
+            c = conf["columns"]
+            long_k = conf["long_strike"]
+            short_k = conf["short_strike"]
+            futures_val = latest.get(c["VIX_Futures"], 0)
             print(f"\n   {name} (C{long_k}/C{short_k}):")
             print(f"     VIX Futures ({conf['futures']}): {futures_val:.2f}")
             if INCLUDE_VIX_SPOT and futures_val > 0:
-                contango = latest.get(f'{prefix}_Contango', 0)
+                contango = latest.get(c["Contango"], 0)
                 print(f"     Contango: {contango:+.2f}")
-            long_px = latest[f'{prefix}_Long_Price']
-            short_px = latest[f'{prefix}_Short_Price']
-            spread_px = latest[f'{prefix}_Spread']
+            long_px = latest[c["Long_Price"]]
+            short_px = latest[c["Short_Price"]]
+            spread_px = latest[c["Spread"]]
             print(f"     Long (C{long_k}): {long_px:.2f}" if pd.notna(long_px) else f"     Long (C{long_k}): N/A")
             print(f"     Short (C{short_k}): {short_px:.2f}" if pd.notna(short_px) else f"     Short (C{short_k}): N/A")
             print(f"     Spread: {spread_px:.2f}" if pd.notna(spread_px) else f"     Spread: N/A")
+            if latest[c["Spread_Quality"]]:
+                print(f"     Quality flags: {describe_quality(latest[c['Spread_Quality']])}")
             if futures_val > 0:
-                print(f"     Futures distance to C{long_k}: {latest.get(f'{prefix}_Futures_to_C{long_k}', 0):+.2f}")
-                print(f"     Futures distance to C{short_k}: {latest.get(f'{prefix}_Futures_to_C{short_k}', 0):+.2f}")
+                print(f"     Futures distance to C{long_k}: {latest.get(c[f'Futures_to_C{long_k}'], 0):+.2f}")
+                print(f"     Futures distance to C{short_k}: {latest.get(c[f'Futures_to_C{short_k}'], 0):+.2f}")
         
-        engine.close()
-
-        # 5. Push to GitHub
-        push_to_github(CSV_PATH)
+        # 5. Push to GitHub in the background - this run is done once the data is on disk
+        #    (the publisher records its own git_commit / git_push timings)
+        with metrics.phase("publish_handoff"):
+            publish(PUBLISH_PATHS)
+        ok = True
+        return True
         
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
+        return False
+    finally:
+        if own_engine and engine is not None:
+            engine.close()
+        metrics.record("total", time.perf_counter() - run_start, ok=ok, spreads=len(SPREADS_CONFIG))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # --record <file.json> captures this run's Bloomberg responses as a replay fixture
+    record_to = sys.argv[sys.argv.index("--record") + 1] if "--record" in sys.argv[:-1] else None
+    if "--no-cache" in sys.argv:
+        USE_FETCH_CACHE = False  # Always ask the Terminal this run
+    if "--stream" in sys.argv:
+        stream_main()
+    elif "--chain" in sys.argv:
+        chain_main()
+    elif "--bars" in sys.argv:
+        bars_main()
+    else:
+        main(full_refresh="--full" in sys.argv, record_to=record_to)
\ No newline at end of file
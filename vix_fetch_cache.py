@@ -0,0 +1,164 @@
+"""
+On-disk cache of Bloomberg HistoricalDataRequest results, one file per security.
+
+Entries are content-addressed: the file name is a hash of the normalized request
+(security, fields, start, end, periodicity), so any rerun over the same window -
+the fetcher while debugging, analysis/post_mortem.py - is answered from disk
+instead of the Terminal's request quota.
+
+  - Only closed history is cached, and it never expires. A window that reaches
+    today is split (split_window): the days before today are looked up / stored
+    as their own closed entry, and the open tail from today on (intraday marks,
+    not yet settled) always goes to the Terminal.
+  - The cache is LRU-bounded to MAX_BYTES: a hit bumps the file's mtime, and the
+    least recently used files are deleted once the total size is over the limit.
+
+Used by vix_data_fetcher.BloombergEngine when it connects to the live Terminal.
+
+Usage:
+  python vix_fetch_cache.py            # entries / size
+  python vix_fetch_cache.py --clear
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+FETCH_CACHE_DIR = Path("data/cache/fetch")
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def request_key(security, fields, start_date, end_date, periodicity="DAILY"):
+    """Hash of the normalized per-security request (field order and date format don't matter)."""
+    norm = {
+        "security": security.strip(),
+        "fields": sorted(fields),
+        "start": str(start_date).replace("-", ""),
+        "end": str(end_date).replace("-", ""),
+        "periodicity": periodicity.upper(),
+    }
+    return hashlib.sha1(json.dumps(norm, sort_keys=True).encode()).hexdigest()
+
+
+def _as_date(value):
+    return datetime.datetime.strptime(str(value).replace("-", ""), "%Y%m%d").date()
+
+
+def split_window(start_date, end_date, today=None):
+    """
+    Split a request window at today -> (closed_end, open_start), both YYYYMMDD.
+    [start_date, closed_end] is settled history (closed_end None if the window starts
+    today or later); [open_start, end_date] can still change and must be requested
+    live (open_start None if the window ended before today).
+    """
+    today = today or datetime.date.today()
+    start, end = _as_date(start_date), _as_date(end_date)
+    if end < today:
+        return end.strftime("%Y%m%d"), None
+    closed_end = today - datetime.timedelta(days=1) if start < today else None
+    return (closed_end.strftime("%Y%m%d") if closed_end else None), today.strftime("%Y%m%d")
+
+
+class FetchCache:
+    """
+    get() / put() per security: (dates datetime64[D] array, values (len(fields), n) float array).
+    Rows of `values` follow the `fields` order the caller passes, whatever order was cached.
+    """
+
+    def __init__(self, root=FETCH_CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._size = None  # Total bytes on disk, scanned on first put
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.npz"
+
+    def get(self, security, fields, start_date, end_date, periodicity="DAILY"):
+        path = self._path(request_key(security, fields, start_date, end_date, periodicity))
+        try:
+            with np.load(path) as entry:
+                fetched = datetime.datetime.fromtimestamp(float(entry["fetched"]))
+                cached_fields = [str(f) for f in entry["fields"]]
+                dates, values = entry["dates"], entry["values"]
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        if fetched.date() <= _as_date(end_date):
+            self.misses += 1  # Fetched while the window was still open - never trusted
+            return None
+        os.utime(path)  # LRU: most recently used = newest mtime
+        self.hits += 1
+        rows = [cached_fields.index(f) for f in fields]
+        return dates, values[rows]
+
+    def put(self, security, fields, start_date, end_date, dates, values, periodicity="DAILY"):
+        if _as_date(end_date) >= datetime.date.today():
+            return  # Open window - see split_window
+        path = self._path(request_key(security, fields, start_date, end_date, periodicity))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, dates=np.asarray(dates, dtype="datetime64[D]"), values=np.asarray(values, dtype=float),
+                         fields=np.array(list(fields)), fetched=np.array(time.time()))
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not write fetch cache ({e})")
+            return
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += path.stat().st_size - old
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        return list(self.root.glob("*/*.npz"))
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.entries())
+
+    def evict(self, target=None):
+        """Delete least recently used entries until the cache is under `target` bytes (90% of max)."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        files = sorted(((p.stat().st_mtime, p.stat().st_size, p) for p in self.entries()), key=lambda x: x[0])
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bloomberg fetch cache")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    parser.add_argument("--path", default=str(FETCH_CACHE_DIR))
+    args = parser.parse_args()
+
+    cache = FetchCache(args.path)
+    if args.clear:
+        n = cache.evict(target=0)
+        print(f"🗑️ Removed {n} cached responses from {args.path}")
+        return
+    files = cache.entries()
+    print(f"{len(files)} cached responses, {cache.size() / 1e6:.1f} MB in {args.path} "
+          f"(limit {cache.max_bytes / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+BLOOMBERG GATEWAY
+=================
+Long-lived local process that owns ONE warmed blpapi session and serves
+fetch jobs to the fetcher and the analysis scripts over a local socket,
+so short requests don't pay session start + openService every time.
+
+The socket is local-only and authenticated: the authkey comes from the
+VIX_GATEWAY_AUTHKEY environment variable or the untracked per-user file
+~/.vix_gateway_key (create it with --new-key); without one the gateway
+refuses to start and clients fall back to their own session. Jobs and
+results travel as JSON (frames encoded column-wise), never pickle.
+
+Jobs are queued to a single worker that owns the session. Everything
+queued since the last round trip is sent together (one CorrelationId
+each) and waited on once. Identical jobs that are already queued or in
+flight are deduplicated - the second caller just waits for the first
+caller's result.
+
+Usage:
+  python vix_gateway.py --new-key    # once: write a random authkey to ~/.vix_gateway_key
+  python vix_gateway.py              # start (leave running)
+  python vix_gateway.py --replay     # serve synthetic replay data, no Terminal needed
+
+Clients:
+  gw = connect_gateway()             # None if no gateway is running
+  raw_df, greeks = gw.fetch_all(tickers, start, option_tickers)
+"""
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+GATEWAY_ADDRESS = ("localhost", 8195)
+AUTHKEY_ENV = "VIX_GATEWAY_AUTHKEY"
+AUTHKEY_FILE = Path.home() / ".vix_gateway_key"
+
+
+class GatewayError(RuntimeError):
+    """A job failed inside the gateway (message carries the remote error)."""
+
+
+# Errors raised by a job's own arguments or data - they fail that job, not the session
+JOB_ERRORS = (ValueError, KeyError, TypeError)
+
+# op -> {arg: accepted type(s)}; list args must hold strings
+GATEWAY_OPS = {
+    "history": {"tickers": list, "start_date": str},
+    "greeks_snapshot": {"tickers": list},
+    "fetch_all": {"history_tickers": list, "start_date": str, "snapshot_tickers": list,
+                  "backfill_tickers": list, "backfill_start": (str, type(None))},
+    "raw_history": {"tickers": list, "fields": list, "start_date": str, "end_date": str},
+    "stats": {},
+}
+
+
+def validate_job(op, args):
+    """Raise ValueError unless (op, args) is a known op with exactly its required, well-typed args."""
+    spec = GATEWAY_OPS.get(op) if isinstance(op, str) else None
+    if spec is None:
+        raise ValueError(f"Unknown gateway op {op!r}")
+    if not isinstance(args, dict) or set(args) != set(spec):
+        raise ValueError(f"{op} takes args {sorted(spec)}, got {sorted(args) if isinstance(args, dict) else args!r}")
+    for name, kind in spec.items():
+        value = args[name]
+        if not isinstance(value, kind) or (kind is list and not all(isinstance(v, str) for v in value)):
+            raise ValueError(f"{op}: bad value for {name!r}: {value!r}")
+
+
+# --- AUTH ---
+def load_authkey():
+    """Authkey from $VIX_GATEWAY_AUTHKEY or ~/.vix_gateway_key; None if neither is set."""
+    key = os.environ.get(AUTHKEY_ENV, "").strip()
+    if not key and AUTHKEY_FILE.exists():
+        key = AUTHKEY_FILE.read_text(encoding="utf-8").strip()
+    return key.encode() if key else None
+
+
+def write_new_authkey(path=AUTHKEY_FILE):
+    """Write a random authkey readable only by the current user."""
+    path.write_text(secrets.token_hex(32) + "\n", encoding="utf-8")
+    os.chmod(path, 0o600)
+    return path
+
+
+# --- WIRE FORMAT (JSON; frames go column-wise with their dtypes) ---
+def _encode_default(obj):
+    if isinstance(obj, pd.DataFrame):
+        dtypes = [{"categories": obj[c].cat.categories.tolist()} if isinstance(t, pd.CategoricalDtype) else str(t)
+                  for c, t in obj.dtypes.items()]
+        data = [obj[c].astype(object).where(obj[c].notna(), None).tolist() for c in obj.columns]
+        return {"__frame__": {"columns": [str(c) for c in obj.columns], "dtypes": dtypes, "data": data}}
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not gateway-serializable")
+
+
+def _decode_hook(obj):
+    if "__frame__" not in obj:
+        return obj
+    spec = obj["__frame__"]
+    frame = pd.DataFrame(dict(zip(spec["columns"], spec["data"])), columns=spec["columns"])
+    for col, dtype in zip(spec["columns"], spec["dtypes"]):
+        if isinstance(dtype, dict):
+            frame[col] = pd.Categorical(frame[col], categories=dtype["categories"])
+        elif dtype != "object":
+            frame[col] = frame[col].astype(dtype)
+    return frame
+
+
+def _send_json(conn, obj):
+    conn.send_bytes(json.dumps(obj, default=_encode_default).encode("utf-8"))
+
+
+def _recv_json(conn):
+    return json.loads(conn.recv_bytes().decode("utf-8"), object_hook=_decode_hook)
+
+
+# --- SERVER ---
+class Gateway:
+    def __init__(self, engine_factory):
+        self._engine_factory = engine_factory
+        self.engine = engine_factory()
+        self._jobs = queue.Queue()
+        self._pending = {}  # dedup key -> Future
+        self._lock = threading.Lock()
+        self.stats = {"jobs": 0, "deduplicated": 0, "batches": 0, "reconnects": 0}
+
+    def submit(self, op, args):
+        """
+        Future for (op, args); joins an identical queued / in-flight job if there is one.
+        A malformed job fails only its own Future and never reaches the worker.
+        """
+        try:
+            validate_job(op, args)
+        except ValueError as e:
+            fut = Future()
+            fut.set_exception(e)
+            return fut
+        key = (op, json.dumps(args, sort_keys=True))
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is not None:
+                self.stats["deduplicated"] += 1
+                return fut
+            fut = Future()
+            self._pending[key] = fut
+            self.stats["jobs"] += 1
+        self._jobs.put((key, op, args, fut))
+        return fut
+
+    # --- WORKER (the only thread that touches the session) ---
+    def run_worker(self):
+        while True:
+            batch = [self._jobs.get()]
+            while True:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """
+        Send every job, wait once, then finish each job. Errors from one job's own data fail
+        only that job; anything else (session / transport) fails the rest and reconnects.
+        """
+        self.stats["batches"] += 1
+        finishers = []
+        try:
+            for key, op, args, fut in batch:
+                try:
+                    finishers.append((fut, self._send(op, args)))
+                except JOB_ERRORS as e:
+                    fut.set_exception(e)
+            self.engine._wait_all()
+            for fut, finish in finishers:
+                try:
+                    fut.set_result(finish())
+                except JOB_ERRORS as e:
+                    fut.set_exception(e)
+        except Exception as e:
+            print(f"❌ Batch of {len(batch)} jobs failed: {e} - reconnecting")
+            for key, op, args, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            self._reconnect()
+        finally:
+            with self._lock:
+                for key, op, args, fut in batch:
+                    self._pending.pop(key, None)
+
+    def _send(self, op, args):
+        """Queue the job's requests on the engine; returns a callable producing its result."""
+        from vix_data_fetcher import history_frame, _new_history_status, START_DATE, FETCH_DEADLINE
+
+        engine = self.engine
+        deadline = time.time() + FETCH_DEADLINE
+
+        def finish_history(chunks, status):
+            # Runs on the worker after the batch's _wait_all - retries only this job's failures
+            engine._retry_history(chunks, status, deadline)
+            engine._report_history_status(status)
+            return history_frame(chunks)
+
+        if op == "history":
+            chunks, status = [], _new_history_status()
+            engine._send_history(args["tickers"], args["start_date"], chunks, status)
+            return lambda: finish_history(chunks, status)
+        if op == "greeks_snapshot":
+            greeks = {}
+            engine._send_greeks_snapshot(args["tickers"], greeks)
+            return lambda: greeks
+        if op == "fetch_all":
+            chunks, greeks, status = [], {}, _new_history_status()
+            engine._send_history(args["history_tickers"], args["start_date"], chunks, status)
+            if args["backfill_tickers"]:
+                engine._send_history(args["backfill_tickers"], args["backfill_start"] or START_DATE, chunks, status)
+            engine._send_greeks_snapshot(args["snapshot_tickers"], greeks)
+            return lambda: (finish_history(chunks, status), greeks)
+        if op == "raw_history":
+            records = []
+            engine._send_raw_history(args["tickers"], args["fields"], args["start_date"], args["end_date"], records)
+            return lambda: pd.DataFrame(records, columns=["Date", "Ticker"] + list(args["fields"]))
+        if op == "stats":
+            return lambda: dict(self.stats)
+        raise ValueError(f"Unknown gateway op {op!r}")
+
+    def _reconnect(self):
+        try:
+            self.engine.close()
+        except Exception:
+            pass
+        try:
+            self.engine = self._engine_factory()
+            self.stats["reconnects"] += 1
+        except Exception as e:
+            print(f"❌ Reconnect failed: {e} - will retry on the next job")
+
+    # --- CONNECTIONS ---
+    def serve(self, address=GATEWAY_ADDRESS, authkey=None):
+        authkey = authkey or load_authkey()
+        if not authkey:
+            raise SystemExit(f"No gateway authkey: set {AUTHKEY_ENV} or run "
+                             f"'python vix_gateway.py --new-key' to create {AUTHKEY_FILE}")
+        threading.Thread(target=self.run_worker, daemon=True, name="bbg-worker").start()
+        with Listener(address, authkey=authkey) as listener:
+            print(f"🛰️ Gateway listening on {address[0]}:{address[1]} - Ctrl+C to stop")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = _recv_json(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError as e:
+                    print(f"❌ Dropping connection after a malformed message: {e}")
+                    return
+                try:
+                    op, args = message
+                except (TypeError, ValueError):
+                    _send_json(conn, (False, f"ValueError: expected [op, args], got {message!r:.200}"))
+                    continue
+                start = time.time()
+                try:
+                    reply = (True, self.submit(op, args).result())
+                except Exception as e:
+                    reply = (False, f"{type(e).__name__}: {e}")
+                print(f"   {op} done in {time.time() - start:.2f}s")
+                try:
+                    _send_json(conn, reply)
+                except TypeError as e:
+                    _send_json(conn, (False, f"TypeError: {e}"))
+
+
+# --- CLIENT ---
+class GatewayClient:
+    """Same fetch surface as BloombergEngine, answered by the running gateway."""
+
+    def __init__(self, address=GATEWAY_ADDRESS, authkey=None):
+        self._conn = Client(address, authkey=authkey or load_authkey())
+
+    def _call(self, op, **args):
+        _send_json(self._conn, (op, args))
+        ok, result = _recv_json(self._conn)
+        if not ok:
+            raise GatewayError(result)
+        return result
+
+    def get_history(self, tickers, start_date):
+        return self._call("history", tickers=list(tickers), start_date=start_date)
+
+    def get_greeks_snapshot(self, tickers):
+        return self._call("greeks_snapshot", tickers=list(tickers))
+
+    def get_raw_history(self, tickers, fields, start_date, end_date):
+        return self._call("raw_history", tickers=list(tickers), fields=list(fields),
+                          start_date=start_date, end_date=end_date)
+
+    def fetch_all(self, history_tickers, start_date, snapshot_tickers, backfill_tickers=(), backfill_start=None):
+        print(f"Fetching via gateway: {len(history_tickers)} tickers from {start_date} "
+              f"+ Greek snapshot for {len(snapshot_tickers)} tickers...")
+        return self._call("fetch_all", history_tickers=list(history_tickers), start_date=start_date,
+                          snapshot_tickers=list(snapshot_tickers), backfill_tickers=list(backfill_tickers),
+                          backfill_start=backfill_start)
+
+    def stats(self):
+        return self._call("stats")
+
+    def close(self):
+        self._conn.close()
+
+
+def connect_gateway(address=GATEWAY_ADDRESS, authkey=None):
+    """Client for the running gateway, or None if there isn't one (or no authkey is configured)."""
+    authkey = authkey or load_authkey()
+    if not authkey:
+        return None
+    try:
+        return GatewayClient(address, authkey)
+    except (OSError, EOFError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent Bloomberg session gateway")
+    parser.add_argument("--port", type=int, default=GATEWAY_ADDRESS[1])
+    parser.add_argument("--replay", action="store_true", help="Serve synthetic replay data instead of the Terminal")
+    parser.add_argument("--new-key", action="store_true", help=f"Write a new random authkey to {AUTHKEY_FILE} and exit")
+    args = parser.parse_args()
+
+    if args.new_key:
+        print(f"🔑 Wrote gateway authkey to {write_new_authkey()}")
+        return
+
+    from vix_data_fetcher import BloombergEngine
+
+    if args.replay:
+        from vix_bbg_replay import ReplaySession
+        factory = lambda: BloombergEngine(session=ReplaySession(synthetic=True))
+    else:
+        factory = BloombergEngine
+
+    try:
+        Gateway(factory).serve((GATEWAY_ADDRESS[0], args.port))
+    except KeyboardInterrupt:
+        print("\nGateway stopped.")
+
+
+if __name__ == "__main__":
+    main()
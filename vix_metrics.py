@@ -0,0 +1,109 @@
+"""
+FETCH METRICS
+=============
+Per-phase timing records for the fetch pipeline, one JSON object per line in
+logs/fetch_metrics.jsonl:
+
+  {"run": "20260317-173012-4242", "time": "2026-03-17T17:30:14", "phase": "parse",
+   "seconds": 0.412, "messages": 57, ...counts}
+
+The fetcher records connect, send, first event, receive (events/messages),
+parse, per-request latency (history chunks, Greek snapshot), pivot and store
+writes; the publisher records git commit and push.
+
+Usage:
+  python vix_metrics.py              # p50/p95 per phase across all recorded runs
+  python vix_metrics.py --last 20    # ... only the last 20 runs
+"""
+
+import argparse
+import datetime
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+METRICS_PATH = Path("logs/fetch_metrics.jsonl")
+REPORT_COUNTS = ["tickers", "messages", "rows"]  # Counts shown (as medians) next to each phase's timings
+
+
+class RunMetrics:
+    """Appends timing records for one run (all records share a run id)."""
+
+    def __init__(self, path=METRICS_PATH, run_id=None):
+        self.path = Path(path)
+        self.run_id = run_id or f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+    def record(self, phase, seconds, **counts):
+        rec = {"run": self.run_id, "time": datetime.datetime.now().isoformat(timespec="seconds"),
+               "phase": phase, "seconds": round(seconds, 4), **counts}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # One short append per record - safe with the publisher process writing too
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write metrics ({e})")
+
+    @contextmanager
+    def phase(self, name, **counts):
+        """Time the with-block; the yielded dict can be filled with counts known only at the end."""
+        extra = dict(counts)
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(name, time.perf_counter() - start, **extra)
+
+
+# --- REPORT ---
+def load_metrics(path=METRICS_PATH, last_runs=None):
+    import pandas as pd
+
+    path = Path(path)
+    if not path.exists():
+        return None
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                pass  # Truncated line from a killed run
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return None
+    if last_runs:
+        runs = list(dict.fromkeys(df["run"]))[-last_runs:]
+        df = df[df["run"].isin(runs)]
+    return df
+
+
+def summarize(df):
+    """One row per phase: n, p50/p95/max seconds, and the median of each REPORT_COUNTS column."""
+    counts = [c for c in REPORT_COUNTS if c in df.columns]
+    grouped = df.groupby("phase", sort=False)
+    out = grouped["seconds"].agg(n="count", p50=lambda s: s.quantile(0.5), p95=lambda s: s.quantile(0.95),
+                                 max="max")
+    for c in counts:
+        out[f"{c} (p50)"] = grouped[c].median()
+    return out.dropna(axis=1, how="all")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize fetch timing metrics")
+    parser.add_argument("--path", default=str(METRICS_PATH))
+    parser.add_argument("--last", type=int, default=None, metavar="N", help="Only the last N runs")
+    args = parser.parse_args()
+
+    df = load_metrics(args.path, args.last)
+    if df is None:
+        print(f"No metrics recorded yet in {args.path}")
+        return
+    print(f"{df['run'].nunique()} runs, {len(df)} records ({df['time'].min()} .. {df['time'].max()})\n")
+    print(summarize(df).round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+ASYNC GIT PUBLISHER
+===================
+Takes git commit/push off the fetch critical path. The fetcher drops a
+publish request into PUBLISH_QUEUE_DIR and returns as soon as its data is
+on local disk; a detached `python vix_publisher.py` process (or the
+resident Publisher thread in a long-running service) then:
+
+  - coalesces every queued request into ONE commit,
+  - skips the commit when the files' content hash is unchanged since the
+    last publish,
+  - pushes with exponential-backoff retries (a failed push leaves the
+    commit local and its requests spooled - the next drain pushes it).
+
+Only text exports are published. Git stores successive versions of an
+append-mostly CSV as deltas in its packs, so each run adds roughly the
+appended rows to the repository, where re-committing the binary Parquet
+stores would add a full snapshot every time.
+
+Usage:
+  python vix_publisher.py            # drain the queue now (what publish_async spawns)
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from vix_metrics import RunMetrics
+
+PUBLISH_QUEUE_DIR = Path("data/.publish_queue")
+PUBLISH_STATE_PATH = Path("data/.publish_state.json")  # content hash of each file at its last commit
+PUBLISH_LOCK_PATH = Path("data/.publish.lock")
+PUBLISH_LOG_PATH = Path("logs/publish_log.txt")
+
+COALESCE_WINDOW = 5     # Seconds to wait for more requests before committing
+PUSH_TIMEOUT = 30       # Seconds per git push attempt
+PUSH_RETRIES = 4
+PUSH_BACKOFF = 15       # Seconds before the first retry, doubled each time
+DRAIN_PASSES = 3        # Lock/drain/release rounds per drain() before leaving the rest to the next run
+
+
+def _git(*args, timeout=None):
+    return subprocess.run(["git", *args], capture_output=True, text=True, timeout=timeout)
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# --- QUEUE ---
+def enqueue(paths):
+    """Spool a publish request for `paths` (atomic write, one file per request)."""
+    PUBLISH_QUEUE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = f"{time.time():.6f}-{os.getpid()}"
+    tmp = PUBLISH_QUEUE_DIR / f"{stamp}.tmp"
+    tmp.write_text(json.dumps({"time": time.time(), "paths": [str(p) for p in paths]}))
+    os.replace(tmp, PUBLISH_QUEUE_DIR / f"{stamp}.json")
+
+
+def _take_queue():
+    """All spooled requests -> (ordered unique paths, request files to delete once handled)."""
+    files = sorted(PUBLISH_QUEUE_DIR.glob("*.json")) if PUBLISH_QUEUE_DIR.exists() else []
+    paths = []
+    for f in files:
+        try:
+            paths.extend(json.loads(f.read_text())["paths"])
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable request - drop it
+    return list(dict.fromkeys(paths)), files
+
+
+def publish_async(paths):
+    """Queue `paths` for publishing and make sure a drain process is running. Returns immediately."""
+    enqueue(paths)
+    if _lock_holder_alive():
+        print("📤 Publish queued (publisher already running)")
+        return
+    PUBLISH_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    kwargs = {"stderr": subprocess.STDOUT, "stdin": subprocess.DEVNULL, "close_fds": True}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    # The child keeps its own copy of the log descriptor - close ours once it has started
+    with open(PUBLISH_LOG_PATH, "a", encoding="utf-8") as log:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve())], env=env, stdout=log, **kwargs)
+    print(f"📤 Publish queued - background publisher started (log: {PUBLISH_LOG_PATH})")
+
+
+# --- SINGLE-DRAINER LOCK ---
+def _pid_alive(pid):
+    if os.name == "nt":
+        out = subprocess.run(["tasklist", "/FI", f"PID eq {pid}"], capture_output=True, text=True).stdout
+        return str(pid) in out
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_holder_alive():
+    try:
+        return _pid_alive(int(PUBLISH_LOCK_PATH.read_text().strip()))
+    except (OSError, ValueError):
+        return False
+
+
+def _acquire_lock():
+    PUBLISH_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(PUBLISH_LOCK_PATH, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _lock_holder_alive():
+                return False
+            PUBLISH_LOCK_PATH.unlink(missing_ok=True)  # Stale lock from a crashed drain
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _release_lock():
+    PUBLISH_LOCK_PATH.unlink(missing_ok=True)
+
+
+# --- COMMIT + PUSH ---
+def _load_state():
+    try:
+        return json.loads(PUBLISH_STATE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def publish_batch(paths, runs=1):
+    """
+    One commit for every path whose content changed since its last publish, then
+    push with retries. Returns True if there was nothing to do or the push went through.
+    """
+    metrics = RunMetrics()
+    check_repo = _git("rev-parse", "--git-dir")
+    if check_repo.returncode != 0:
+        print(f"❌ Not inside a git repository! stderr: {check_repo.stderr.strip()}")
+        return False
+
+    state = _load_state()
+    hashes = {str(p): file_hash(p) for p in paths if Path(p).exists()}
+    changed = [p for p, h in hashes.items() if state.get(p) != h]
+    if not changed:
+        print(f"   ⚠️ Content unchanged for {list(hashes)} - skipping commit")
+        return push_with_retry(metrics) if _ahead_of_upstream() else True
+
+    start = time.perf_counter()
+    add_result = _git("add", *changed)
+    if add_result.returncode != 0:
+        print(f"❌ git add failed: {add_result.stderr.strip()}")
+        return False
+
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    message = f"Auto-update VIX Data: {timestamp}" + (f" ({runs} runs)" if runs > 1 else "")
+    commit_result = _git("commit", "-m", message, "--", *changed)
+    if commit_result.returncode != 0 and "nothing to commit" not in commit_result.stdout:
+        print("❌ git commit failed:")
+        print(f"   stdout: {commit_result.stdout.strip()}")
+        print(f"   stderr: {commit_result.stderr.strip()}")
+        return False
+    print(f"   ✓ git commit OK: {commit_result.stdout.strip().splitlines()[0] if commit_result.stdout else ''}")
+    metrics.record("git_commit", time.perf_counter() - start, files=len(changed), runs=runs)
+
+    state.update({p: hashes[p] for p in changed})
+    PUBLISH_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    PUBLISH_STATE_PATH.write_text(json.dumps(state, indent=1))
+    return push_with_retry(metrics)
+
+
+def _ahead_of_upstream():
+    out = _git("rev-list", "--count", "@{u}..HEAD")
+    return out.returncode == 0 and out.stdout.strip() not in ("", "0")
+
+
+def push_with_retry(metrics=None):
+    start = time.perf_counter()
+    ok = _push_with_retry()
+    if metrics is not None:
+        metrics.record("git_push", time.perf_counter() - start, ok=ok)
+    return ok
+
+
+def _push_with_retry():
+    delay = PUSH_BACKOFF
+    for attempt in range(1, PUSH_RETRIES + 2):
+        try:
+            push_result = _git("push", timeout=PUSH_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            print(f"❌ git push timed out after {PUSH_TIMEOUT}s (attempt {attempt})")
+        else:
+            if push_result.returncode == 0:
+                print("✅ Successfully pushed to GitHub!")
+                return True
+            print(f"❌ git push failed (attempt {attempt}): {push_result.stderr.strip()}")
+            # Not fixable by waiting
+            if "Authentication" in push_result.stderr or "403" in push_result.stderr:
+                print("   💡 Fix: Your GitHub token may have expired. Regenerate at github.com/settings/tokens")
+                return False
+            if "rejected" in push_result.stderr:
+                print("   💡 Fix: Remote has changes. Try 'git pull --rebase' first")
+                return False
+        if attempt <= PUSH_RETRIES:
+            print(f"   🔁 Retrying push in {delay}s...")
+            time.sleep(delay)
+            delay *= 2
+    print("❌ Giving up on push - the commit stays local and goes out with the next publish")
+    return False
+
+
+def drain(coalesce_window=COALESCE_WINDOW):
+    """Publish everything queued (waiting coalesce_window for stragglers) until the queue is empty."""
+    for _ in range(DRAIN_PASSES):
+        if not _acquire_lock():
+            print("Publisher already running - nothing to do")
+            return
+        try:
+            ok = _drain_locked(coalesce_window)
+        finally:
+            _release_lock()
+        # A request queued between the last check and the release saw the lock held
+        # and didn't start a drain - pick it up instead of stranding it. After a failed
+        # batch, stop: its requests stay spooled for the next run.
+        if not ok or not _take_queue()[1]:
+            return
+
+
+def _drain_locked(coalesce_window):
+    """Drain while holding the lock. False if a batch failed (its request files are kept)."""
+    while True:
+        time.sleep(coalesce_window)
+        paths, files = _take_queue()
+        if not files:
+            return True
+        print(f"\n🚀 [{datetime.datetime.now():%Y-%m-%d %H:%M:%S}] Publishing {len(files)} queued "
+              f"run(s): {paths}")
+        try:
+            ok = publish_batch(paths, runs=len(files))
+        except Exception as e:
+            print(f"❌ Publish failed: {type(e).__name__}: {e}")
+            ok = False
+        if not ok:
+            print(f"   Keeping {len(files)} queued request(s) for the next run")
+            return False
+        for f in files:
+            f.unlink(missing_ok=True)
+
+
+# --- RESIDENT PUBLISHER (for long-running services) ---
+class Publisher:
+    """Background thread that drains the spool queue whenever submit() is called."""
+
+    def __init__(self, coalesce_window=COALESCE_WINDOW):
+        self.coalesce_window = coalesce_window
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, daemon=True, name="git-publisher").start()
+
+    def submit(self, paths):
+        enqueue(paths)
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                drain(self.coalesce_window)
+            except Exception as e:
+                print(f"❌ Publisher error: {type(e).__name__}: {e}")
+
+
+if __name__ == "__main__":
+    drain()
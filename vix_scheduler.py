@@ -0,0 +1,220 @@
+"""
+VIX FETCH SCHEDULER
+===================
+Resident replacement for auto_run.bat + Windows Task Scheduler. Start it
+once (e.g. at logon) and leave it running: pandas / blpapi are imported
+once and the Bloomberg session stays warm between runs.
+
+It only triggers the incremental fetch when new settlements can exist:
+  - once per CBOE (CFE) trading day, after the daily settlement
+    (SETTLEMENT_FETCH_TIME, US/Eastern) - never on weekends or exchange holidays
+  - on each configured expiry date, after the VIX SOQ special opening
+    quotation (EXPIRY_FETCH_TIME) so the final settlement lands the same morning
+  - optionally every --intraday N minutes during regular trading hours
+On start it catches up immediately if the last settled day isn't stored yet.
+
+Usage:
+  python vix_scheduler.py                  # daily + expiry runs
+  python vix_scheduler.py --intraday 30    # ... plus every 30 min 09:30-16:15 ET
+  python vix_scheduler.py --show 10        # print the next 10 triggers and exit
+"""
+
+import argparse
+import datetime
+import time
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+import vix_data_fetcher as fetcher
+
+MARKET_TZ = ZoneInfo("America/New_York")
+SETTLEMENT_FETCH_TIME = datetime.time(17, 30)  # ET - daily settles are published by ~17:00
+EXPIRY_FETCH_TIME = datetime.time(10, 0)       # ET - SOQ settlement value is out by ~09:45 on expiry
+SESSION_OPEN = datetime.time(9, 30)            # ET - regular session for --intraday runs
+SESSION_CLOSE = datetime.time(16, 15)
+MAX_SLEEP = 60  # Seconds - wake regularly so clock changes / Ctrl+C are picked up
+
+
+# --- CBOE TRADING CALENDAR ---
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous / Meeus algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return datetime.date(year, month, day)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based) weekday of a month; n=-1 for the last one."""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Saturday holidays are observed Friday, Sunday holidays Monday."""
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def cboe_holidays(year):
+    """Full-day CBOE / CFE holidays (the NYSE schedule, incl. Good Friday and Juneteenth)."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),                       # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                       # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),        # Good Friday
+        _nth_weekday(year, 5, 0, -1),                      # Memorial Day
+        _observed(datetime.date(year, 7, 4)),              # Independence Day
+        _nth_weekday(year, 9, 0, 1),                       # Labor Day
+        _nth_weekday(year, 11, 3, 4),                      # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),            # Christmas
+    }
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:  # A Saturday New Year's Day isn't made up on the Friday before
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(datetime.date(year, 6, 19)))    # Juneteenth
+    return days
+
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in cboe_holidays(day.year)
+
+
+def previous_trading_day(day):
+    day -= datetime.timedelta(days=1)
+    while not is_trading_day(day):
+        day -= datetime.timedelta(days=1)
+    return day
+
+
+# --- TRIGGERS ---
+def _at(day, t):
+    return datetime.datetime.combine(day, t, tzinfo=MARKET_TZ)
+
+
+def triggers_on(day, intraday_minutes=None):
+    """[(when, reason)] for one calendar day (empty on weekends / holidays)."""
+    if not is_trading_day(day):
+        return []
+    out = [(_at(day, SETTLEMENT_FETCH_TIME), "daily settlement")]
+    expiring = fetcher.expiry_dates().get(day)
+    if expiring:
+        out.append((_at(day, EXPIRY_FETCH_TIME), f"expiry settlement ({', '.join(expiring)})"))
+    if intraday_minutes:
+        t = _at(day, SESSION_OPEN)
+        while t <= _at(day, SESSION_CLOSE):
+            out.append((t, "intraday"))
+            t += datetime.timedelta(minutes=intraday_minutes)
+    return sorted(out)
+
+
+def next_trigger(after, intraday_minutes=None):
+    """First (when, reason) strictly after `after` (an aware datetime)."""
+    day = after.astimezone(MARKET_TZ).date()
+    while True:
+        for when, reason in triggers_on(day, intraday_minutes):
+            if when > after:
+                return when, reason
+        day += datetime.timedelta(days=1)
+
+
+def last_stored_date():
+    """Latest Date in the long store (None if there's no store yet)."""
+    try:
+        dates = pd.read_parquet(fetcher.LONG_STORE_PATH, columns=["Date"])["Date"]
+    except Exception:
+        return None
+    return dates.max().date() if len(dates) else None
+
+
+def needs_catch_up(now):
+    """True if the most recent settled trading day isn't in the store yet."""
+    today = now.date()
+    settled = today if is_trading_day(today) and now >= _at(today, SETTLEMENT_FETCH_TIME) \
+        else previous_trading_day(today)
+    stored = last_stored_date()
+    return stored is None or stored < settled
+
+
+# --- RESIDENT LOOP ---
+class Scheduler:
+    def __init__(self, intraday_minutes=None):
+        from vix_publisher import Publisher
+        self.intraday_minutes = intraday_minutes
+        self.publisher = Publisher()
+        self.engine = None
+
+    def _engine(self):
+        if self.engine is None:
+            self.engine = fetcher.BloombergEngine()
+        return self.engine
+
+    def run_fetch(self, reason):
+        print(f"\n{'=' * 42}\n⏰ {datetime.datetime.now(MARKET_TZ):%Y-%m-%d %H:%M %Z} - fetch ({reason})")
+        started = time.time()
+        try:
+            ok = fetcher.main(engine=self._engine(), publish=self.publisher.submit)
+        except Exception as e:
+            print(f"❌ Fetch failed: {e}")
+            ok = False
+        if not ok and self.engine is not None:
+            # Drop the session - the next run reconnects from scratch
+            try:
+                self.engine.close()
+            except Exception:
+                pass
+            self.engine = None
+        print(f"Run {'finished' if ok else 'FAILED'} in {time.time() - started:.1f}s")
+
+    def run_forever(self):
+        now = datetime.datetime.now(MARKET_TZ)
+        if needs_catch_up(now):
+            self.run_fetch("catch-up")
+        while True:
+            now = datetime.datetime.now(MARKET_TZ)
+            when, reason = next_trigger(now, self.intraday_minutes)
+            print(f"💤 Next fetch {when:%a %Y-%m-%d %H:%M %Z} ({reason})")
+            while (wait := (when - datetime.datetime.now(MARKET_TZ)).total_seconds()) > 0:
+                time.sleep(min(wait, MAX_SLEEP))
+            self.run_fetch(reason)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market-calendar-aware VIX fetch scheduler")
+    parser.add_argument("--intraday", type=int, default=None, metavar="MIN",
+                        help="Also fetch every MIN minutes during regular trading hours")
+    parser.add_argument("--show", type=int, default=None, metavar="N", help="Print the next N triggers and exit")
+    args = parser.parse_args()
+
+    if args.show:
+        when = datetime.datetime.now(MARKET_TZ)
+        for _ in range(args.show):
+            when, reason = next_trigger(when, args.intraday)
+            print(f"{when:%a %Y-%m-%d %H:%M %Z}  {reason}")
+        return
+
+    scheduler = Scheduler(args.intraday)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\nScheduler stopped.")
+        if scheduler.engine is not None:
+            scheduler.engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Single spread registry shared by the fetcher and the dashboard.
+
+Each spread is just (expiry, long strike, short strike). Everything else -
+Bloomberg option tickers, the UX futures ticker and its month code, the
+column prefix and every wide-frame column name - is generated here, so
+adding a spread is one line in SPREAD_DEFS.
+
+Closed trades get a post-mortem (analysis/post_mortem.py + the dashboard
+expanders): one line in POST_MORTEM_DEFS with the entry fill.
+
+Spreads that share an expiry share the futures contract (and often a leg):
+unique_instruments() gives the minimal set of tickers to request, and the
+long store holds each instrument once however many spreads use it.
+"""
+import datetime
+import re
+
+# Bloomberg / CFE futures month codes, Jan..Dec
+MONTH_CODES = "FGHJKMNQUVXZ"
+
+# name -> (expiry YYYY-MM-DD, long call strike, short call strike)
+SPREAD_DEFS = {
+    "Feb 2026":       ("2026-02-18", 20, 25),
+    "Mar 2026":       ("2026-03-18", 20, 25),
+    "Mar 2026 20-40": ("2026-03-18", 20, 40),
+    "May 2026":       ("2026-05-19", 25, 35),
+    "Jun 2026":       ("2026-06-17", 20, 25),
+}
+
+# Trade reviews: spread name -> entry date, entry price (debit), and optionally an
+# entry_info caption / spike_threshold (default 2x entry). `key` names the CSV
+# data/{key}_spread_intraday.csv written by analysis/post_mortem.py.
+POST_MORTEM_DEFS = {
+    "Feb 2026":       {"key": "feb", "entry_date": "2026-01-16", "entry_price": 0.63,
+                       "entry_info": "Jan 16 | UXG26: 18.38", "spike_threshold": 1.50},
+    "Mar 2026":       {"key": "mar", "entry_date": "2026-01-16", "entry_price": 0.91},
+    "Mar 2026 20-40": {"key": "mar_2040", "entry_date": "2026-01-16", "entry_price": 1.45},
+    "Jun 2026":       {"key": "jun", "entry_date": "2026-05-28", "entry_price": 0.34},
+}
+
+LEG_FIELDS = ["Price", "Volume", "OI"]
+LEG_GREEKS = ["IV", "Delta", "Gamma", "Vega", "Theta"]
+
+
+def option_ticker(expiry, strike, kind="C"):
+    """'VIX US 02/18/26 C20 Index' for a VIX option expiring on `expiry` (a date)."""
+    return f"VIX US {expiry:%m/%d/%y} {kind}{strike:g} Index"
+
+
+_OPTION_TICKER = re.compile(r"^VIX US (\d\d/\d\d/\d\d) ([CP])(\d+(?:\.\d+)?) Index$")
+
+
+def parse_option_ticker(ticker):
+    """Inverse of option_ticker: (expiry date, 'C'/'P', strike), or None if it isn't a VIX option."""
+    m = _OPTION_TICKER.match(ticker)
+    if m is None:
+        return None
+    return datetime.datetime.strptime(m.group(1), "%m/%d/%y").date(), m.group(2), float(m.group(3))
+
+
+def futures_ticker(expiry):
+    """'UXG26' - the VIX future settling with the options expiring on `expiry`."""
+    return f"UX{MONTH_CODES[expiry.month - 1]}{expiry:%y}"
+
+
+def spread_columns(prefix, long_strike, short_strike):
+    """Wide-frame column names for one spread, keyed by role (e.g. 'Spread', 'Long_Price')."""
+    roles = ["VIX_Futures", "Contango"]
+    roles += [f"{leg}_{f}" for f in LEG_FIELDS for leg in ("Long", "Short")]
+    roles += ["Spread", "Total_Volume", "Total_OI"]
+    roles += [f"{leg}_{g}" for leg in ("Long", "Short") for g in LEG_GREEKS]
+    roles += [f"Net_{g}" for g in LEG_GREEKS[1:]]
+    roles += [f"Futures_to_C{long_strike:g}", f"Futures_to_C{short_strike:g}"]
+    roles += ["Long_Quality", "Short_Quality", "Spread_Quality"]  # vix_store QF_* bitmasks
+    return {role: f"{prefix}_{role}" for role in dict.fromkeys(roles)}
+
+
+def build_spread(name, expiry, long_strike, short_strike):
+    """Full config for one spread (the keys both the fetcher and the dashboard read)."""
+    exp = datetime.date.fromisoformat(expiry)
+    prefix = name.replace(" ", "_")
+    fut = futures_ticker(exp)
+    return {
+        "expiry": f"{exp:%m/%d/%y}",
+        "expiry_date": exp.isoformat(),
+        "prefix": prefix,
+        "long": option_ticker(exp, long_strike),
+        "short": option_ticker(exp, short_strike),
+        "long_strike": long_strike,
+        "short_strike": short_strike,
+        "futures": f"{fut} Index",
+        "futures_ticker": fut,  # For display
+        "futures_col": f"{prefix}_VIX_Futures",
+        "columns": spread_columns(prefix, long_strike, short_strike),
+    }
+
+
+def build_registry(defs=None):
+    defs = SPREAD_DEFS if defs is None else defs
+    return {name: build_spread(name, *spec) for name, spec in defs.items()}
+
+
+def unique_instruments(spreads):
+    """(futures, options) needed by `spreads`, each ticker once, in config order."""
+    futures, options = {}, {}
+    for conf in spreads.values():
+        futures.setdefault(conf["futures"], None)
+        options.setdefault(conf["long"], None)
+        options.setdefault(conf["short"], None)
+    return list(futures), list(options)
+
+
+def shared_instruments(spreads):
+    """{ticker: [spread names]} for every ticker used by more than one spread."""
+    users = {}
+    for name, conf in spreads.items():
+        for tk in dict.fromkeys([conf["futures"], conf["long"], conf["short"]]):
+            users.setdefault(tk, []).append(name)
+    return {tk: names for tk, names in users.items() if len(names) > 1}
+
+
+def leg_sources(conf):
+    """{wide column: (ticker, field)} for the columns copied straight from one instrument."""
+    cols = conf["columns"]
+    out = {cols["VIX_Futures"]: (conf["futures"], "Price")}
+    for leg in ("Long", "Short"):
+        for f in LEG_FIELDS + LEG_GREEKS + ["Quality"]:
+            out[cols[f"{leg}_{f}"]] = (conf[leg.lower()], f)
+    return out
+
+
+def build_post_mortem(name, spread, key, entry_date, entry_price, entry_info=None, spike_threshold=None):
+    """Post-mortem config: the spread's tickers + everything the dashboard expander reads."""
+    exp = datetime.date.fromisoformat(spread["expiry_date"])
+    entry = datetime.date.fromisoformat(entry_date)
+    legs = f"C{spread['long_strike']:g}/C{spread['short_strike']:g}"
+    return {
+        "name": name,
+        "csv": f"data/{key}_spread_intraday.csv",
+        "label_en": f"📋 {exp:%b %Y} {legs} Post-Mortem (Expired)",
+        "label_zh": f"📋 {exp.year}年{exp.month}月 {legs} 交易复盘（已到期）",
+        "entry_date": entry.isoformat(),
+        "entry_price": entry_price,
+        "entry_info": entry_info or f"{entry:%b} {entry.day} | {spread['futures_ticker']}",
+        "spike_threshold": spike_threshold or round(2 * entry_price, 2),
+        "key": key,
+        **{k: spread[k] for k in ("expiry_date", "long", "short", "long_strike", "short_strike",
+                                  "futures", "futures_ticker")},
+    }
+
+
+def build_post_mortems(spreads, defs=None):
+    defs = POST_MORTEM_DEFS if defs is None else defs
+    return [build_post_mortem(name, spreads[name], **spec) for name, spec in defs.items()]
+
+
+SPREADS_CONFIG = build_registry()
+POST_MORTEM_CONFIG = build_post_mortems(SPREADS_CONFIG)
@@ -0,0 +1,494 @@
+"""
+Columnar storage for the wide spread frame.
+
+The fetcher writes data/vix_spread_data.parquet (typed columns, Date as a
+DatetimeIndex) and keeps exporting the CSV next to it for git diffs and
+eyeballing. Readers can project to just the columns they need, e.g. one
+spread's `{prefix}_*` block, without parsing the rest of the file.
+"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STORE_PATH = Path("data/vix_spread_data.parquet")
+CSV_EXPORT_PATH = Path("data/vix_spread_data.csv")
+
+# Shared (non-spread) columns every view needs
+BASE_COLUMNS = ["VIX_Spot"] + [f"UX{i}" for i in range(1, 9)] + ["VVIX"]
+
+# Counts fit exactly in float32 (< 2**24); prices/Greeks stay float64
+FLOAT32_SUFFIXES = ("_Volume", "_OI")
+QUALITY_SUFFIX = "_Quality"  # Bitmask columns (QF_* below) -> uint8
+
+# --- QUALITY FLAGS ---
+# Set by the fetcher at ingest on every leg mark ({prefix}_Long_Quality / _Short_Quality)
+# and spread mark ({prefix}_Spread_Quality = both legs' flags + the range check), so
+# readers mask with one bitwise AND instead of re-deriving heuristics. 0 = clean.
+QF_NO_PRICE = 1        # No usable price that day
+QF_NOT_TRADED = 2      # Price is a mid / settle, not a trade (PriceSource)
+QF_NO_VOLUME = 4       # Zero volume
+QF_WIDE_QUOTE = 8      # Bid/ask wider than the fetcher's MAX_QUOTE_WIDTH of mid
+QF_STALE = 16          # Price unchanged for STALE_RUN_DAYS or more days
+QF_OUT_OF_RANGE = 32   # Spread only: outside [0, K2 - K1]
+QUALITY_FLAGS = {
+    "no_price": QF_NO_PRICE, "not_traded": QF_NOT_TRADED, "no_volume": QF_NO_VOLUME,
+    "wide_quote": QF_WIDE_QUOTE, "stale": QF_STALE, "out_of_range": QF_OUT_OF_RANGE,
+}
+
+
+def describe_quality(flags):
+    """'stale, no_volume' for a bitmask value ('' if clean)."""
+    return ", ".join(name for name, bit in QUALITY_FLAGS.items() if int(flags) & bit)
+
+
+def _typed(df):
+    """Date -> DatetimeIndex, quality flags -> uint8, every other column -> float32/float64."""
+    out = df.set_index(pd.DatetimeIndex(pd.to_datetime(df["Date"]), name="Date")).drop(columns="Date")
+    out = out.apply(pd.to_numeric, errors="coerce")
+    dtypes = {c: np.uint8 if c.endswith(QUALITY_SUFFIX) else np.float32 if c.endswith(FLOAT32_SUFFIXES)
+              else np.float64 for c in out.columns}
+    return out.astype(dtypes).sort_index().copy()  # copy() consolidates the per-column blocks
+
+
+def write_store(df, path=STORE_PATH, csv_path=CSV_EXPORT_PATH):
+    """
+    Write the wide frame (with a `Date` column) to Parquet, plus the CSV export
+    when csv_path is set. Both are written to a temp file and swapped in, so a
+    dashboard reading mid-write never sees a half-written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    _typed(df).to_parquet(tmp, engine="pyarrow", compression="zstd")
+    os.replace(tmp, path)
+
+    if csv_path is not None:
+        csv_path = Path(csv_path)
+        tmp = csv_path.with_suffix(csv_path.suffix + ".tmp")
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, csv_path)
+
+
+def store_columns(path=STORE_PATH):
+    """Column names in the store (schema only - no data is read)."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return [c for c in pq.read_schema(path).names if c != "Date"]
+    return [c for c in pd.read_csv(path, nrows=0).columns if c != "Date"]
+
+
+def project_columns(available, prefixes=None, columns=None):
+    """
+    Columns to read: explicit `columns`, else BASE_COLUMNS plus every
+    `{prefix}_*` column for the given prefixes, else everything.
+    """
+    if columns is not None:
+        return [c for c in columns if c in available]
+    if prefixes is None:
+        return list(available)
+    # A column belongs to the longest spread prefix it starts with, so
+    # "Mar_2026" doesn't also pull in the "Mar_2026_20-40_*" block
+    stored = sorted((c[:-len("_Spread")] for c in available if c.endswith("_Spread")), key=len, reverse=True)
+    wanted = set(prefixes)
+    out = []
+    for c in available:
+        owner = next((p for p in stored if c.startswith(f"{p}_")), None)
+        if c in BASE_COLUMNS or owner in wanted:
+            out.append(c)
+    return out
+
+
+def store_source(path=STORE_PATH):
+    """The file read_store actually reads: the store, else the CSV export, else None."""
+    path = Path(path)
+    if not path.exists() and CSV_EXPORT_PATH.exists():
+        path = CSV_EXPORT_PATH
+    return path if path.exists() else None
+
+
+def read_store(path=STORE_PATH, prefixes=None, columns=None):
+    """
+    Load the store as a frame with a datetime `Date` column, sorted by date.
+    Falls back to the CSV export when the Parquet file doesn't exist yet
+    (e.g. a checkout made before the first Parquet run).
+    """
+    path = store_source(path)
+    if path is None:
+        return None
+
+    wanted = project_columns(store_columns(path), prefixes, columns)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=wanted, engine="pyarrow")
+        return df.reset_index()
+
+    df = pd.read_csv(path, usecols=["Date"] + wanted)
+    return _typed(df).reset_index()
+
+
+# --- SHARED FILE VERSIONS ---
+def file_fingerprint(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist - a cheap change check."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class VersionedFrames:
+    """
+    One shared frame per (file content version, key) for every reader in the process -
+    e.g. all sessions of one dashboard server. get() stats the file on every call and
+    only re-reads it when mtime/size changed AND the content hash is new, so a rewrite
+    with identical content (or a touch) costs one hash, not a reload.
+
+    Readers pass back the version they hold; a version nobody holds any more is evicted
+    once a newer one exists. Readers that vanish without releasing (closed browser tabs)
+    can't pin memory forever: at most max_stale old versions are kept.
+    loader(path, key) builds a frame; callers get a shallow copy (copy-on-write), so
+    the shared frame is never modified.
+    """
+
+    def __init__(self, loader, max_stale=2):
+        self.loader = loader
+        self.max_stale = max_stale
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._stat = {}    # path -> (fingerprint, digest) last seen
+        self._frames = {}  # (path, digest) -> {key: frame}
+        self._refs = {}    # (path, digest) -> readers holding it
+        self._current = {}  # path -> digest
+
+    def version(self, path):
+        """(path, digest) of the file's current content, or None if it doesn't exist."""
+        path = str(path)
+        fp = file_fingerprint(path)
+        if fp is None:
+            return None
+        seen = self._stat.get(path)
+        if seen is None or seen[0] != fp:
+            seen = (fp, file_digest(path))
+            self._stat[path] = seen
+        return path, seen[1]
+
+    def get(self, path, key=None, held=None):
+        """
+        (version, frame) for the current content of `path` (frame None if the file is
+        missing). `held` is the version this reader had before - released if it changed.
+        """
+        with self._lock:
+            version = self.version(path)
+            if version != held:
+                self._release(held)
+                if version is not None:
+                    self._refs[version] = self._refs.get(version, 0) + 1
+            if version is None:
+                return None, None
+            if self._current.get(version[0]) != version[1]:
+                self._current[version[0]] = version[1]
+                self._evict(version[0])
+            frames = self._frames.setdefault(version, {})
+            if key not in frames:
+                frames[key] = self.loader(version[0], key)
+                self.loads += 1
+            frame = frames[key]
+        return version, frame.copy(deep=False) if frame is not None else None
+
+    def release(self, version):
+        with self._lock:
+            self._release(version)
+
+    def _release(self, version):
+        if version is None or version not in self._refs:
+            return
+        self._refs[version] -= 1
+        self._evict(version[0])
+
+    def _evict(self, path):
+        """Drop old versions of `path` nobody holds, then the oldest beyond max_stale."""
+        old = [v for v in self._frames if v[0] == path and v[1] != self._current.get(path)]
+        for v in [v for v in old if self._refs.get(v, 0) <= 0]:
+            self._frames.pop(v, None)
+            self._refs.pop(v, None)
+            old.remove(v)
+        for v in old[:max(0, len(old) - self.max_stale)]:
+            self._frames.pop(v, None)
+            self._refs.pop(v, None)
+
+
+WATCH_INTERVAL = 2.0  # Seconds between FileWatcher stat() rounds
+
+
+class FileWatcher:
+    """
+    Push notifications for file rewrites: ONE daemon thread stats the watched files every
+    `interval` seconds (a content hash only when the stat changes) and calls each
+    subscriber whose file content differs from the digest it registered with. Readers
+    (e.g. dashboard sessions) do no polling of their own.
+
+    watch(key, {path: digest}, callback) registers / replaces a subscriber; callback()
+    is called once per change and returning False drops the subscriber (reader gone).
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers = {}  # key -> ({path: digest}, callback)
+        self._seen = {}         # path -> (fingerprint, digest)
+        self._thread = None
+
+    def watch(self, key, digests, callback):
+        with self._lock:
+            self._subscribers[key] = ({str(p): d for p, d in digests.items()}, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, key):
+        with self._lock:
+            self._subscribers.pop(key, None)
+
+    def current(self, path):
+        """Content digest of `path` (re-hashed only if its stat changed), None if missing."""
+        fp = file_fingerprint(path)
+        if fp is None:
+            return None
+        seen = self._seen.get(path)
+        if seen is None or seen[0] != fp:
+            seen = (fp, file_digest(path))
+            self._seen[path] = seen
+        return seen[1]
+
+    def poll(self):
+        """One round: notify every subscriber whose file changed. Returns subscribers notified."""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        digests = {}
+        notified = 0
+        for key, (wanted, callback) in subscribers:
+            changed = False
+            for path, digest in wanted.items():
+                if path not in digests:
+                    try:
+                        digests[path] = self.current(path)
+                    except OSError:
+                        digests[path] = digest  # Mid-replace - look again next round
+                changed |= digests[path] != digest
+            if not changed:
+                continue
+            for path in wanted:
+                wanted[path] = digests[path]  # Notify once per change
+            notified += 1
+            try:
+                alive = callback() is not False
+            except Exception:
+                alive = False
+            if not alive:
+                self.unwatch(key)
+        return notified
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+
+# --- LONG STORE ---
+# One row per (Date, Ticker, Field): each instrument is stored once no matter how
+# many spreads use it, and adding/removing a spread only adds/ignores tickers.
+# The wide frame above is a view materialized from this.
+LONG_STORE_PATH = Path("data/vix_history_long.parquet")
+# Raw Bloomberg fields behind Price / Volume / OI - stored too, so the fetcher's price
+# priority rules can be re-applied to stored history without re-fetching
+RAW_FIELDS = ["PX_LAST", "PX_MID", "PX_BID", "PX_ASK", "PX_SETTLE", "VOLUME", "PX_VOLUME", "OPEN_INT"]
+LONG_FIELDS = ["Price", "Volume", "OI", "IV", "Delta", "Gamma", "Vega", "Theta"] + RAW_FIELDS
+LONG_KEY = ["Date", "Ticker", "Field"]
+
+
+def to_long(history_df):
+    """(Date, Ticker, Price, Volume, OI, Greeks...) history -> long (Date, Ticker, Field, Value)."""
+    fields = [f for f in LONG_FIELDS if f in history_df.columns]
+    long_df = history_df.melt(id_vars=["Date", "Ticker"], value_vars=fields, var_name="Field", value_name="Value")
+    long_df["Date"] = pd.to_datetime(long_df["Date"])
+    long_df["Value"] = long_df["Value"].astype(np.float64)
+    return long_df
+
+
+def long_to_history(long_df):
+    """Inverse of to_long: one row per (Date, Ticker) with a column per field, Date as YYYY-MM-DD."""
+    wide = long_df.pivot_table(index=["Date", "Ticker"], columns="Field", values="Value",
+                               aggfunc="last", observed=True)
+    wide = wide.reindex(columns=[f for f in LONG_FIELDS if f in wide.columns]).reset_index()
+    wide.columns.name = None
+    wide["Date"] = wide["Date"].dt.strftime("%Y-%m-%d")
+    wide["Ticker"] = wide["Ticker"].astype(str)
+    return wide
+
+
+def read_long(path=LONG_STORE_PATH, tickers=None):
+    """Long store (optionally only `tickers`, pushed down to the Parquet reader), or None."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    filters = [("Ticker", "in", list(tickers))] if tickers is not None else None
+    long_df = pd.read_parquet(path, engine="pyarrow", filters=filters)
+    long_df["Ticker"] = long_df["Ticker"].astype(str)
+    long_df["Field"] = long_df["Field"].astype(str)
+    return long_df
+
+
+def long_tickers(path=LONG_STORE_PATH):
+    """Tickers with any stored history (reads only the Ticker column)."""
+    path = Path(path)
+    if not path.exists():
+        return set()
+    return set(pd.read_parquet(path, columns=["Ticker"], engine="pyarrow")["Ticker"].astype(str))
+
+
+def merge_long(existing, new_long, window_start):
+    """
+    Replace the stored rows of every (Ticker, Date) re-received in new_long from
+    window_start onwards. Days new_long doesn't carry are kept, so a ticker whose
+    history was only partly salvaged loses nothing it didn't get back.
+    Later rows in new_long win on duplicate keys; NaN values are then dropped,
+    so a NaN row deletes a stored value (e.g. a snapshot Greek that's missing).
+    """
+    if existing is not None and not existing.empty:
+        received = pd.MultiIndex.from_frame(new_long[["Ticker", "Date"]].drop_duplicates())
+        refetched = pd.MultiIndex.from_frame(existing[["Ticker", "Date"]]).isin(received)
+        stale = refetched & (existing["Date"] >= pd.Timestamp(window_start)).to_numpy()
+        new_long = pd.concat([existing[~stale], new_long], ignore_index=True)
+    merged = new_long.drop_duplicates(subset=LONG_KEY, keep="last").dropna(subset=["Value"])
+    return merged.sort_values(["Ticker", "Field", "Date"]).reset_index(drop=True)
+
+
+def write_long(long_df, path=LONG_STORE_PATH):
+    """Write the long store sorted by (Ticker, Field, Date) so ticker filters hit contiguous row groups."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = long_df[LONG_KEY + ["Value"]].copy()
+    out["Ticker"] = out["Ticker"].astype("category")
+    out["Field"] = out["Field"].astype("category")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    out.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False, row_group_size=50_000)
+    os.replace(tmp, path)
+
+
+# --- OPTION CHAIN STORE ---
+# Every listed strike for the tracked expiries (vix_data_fetcher.py --chain), as dense
+# float32 cubes indexed [expiry, strike, date] - one per (right, field), e.g. "C_Price".
+# Any vertical is then two array slices, with no Bloomberg round trip.
+CHAIN_STORE_PATH = Path("data/vix_chain.npz")
+CHAIN_FIELDS = ["Price", "Volume", "OI"]
+CHAIN_RIGHTS = ["C", "P"]
+
+
+def history_to_chain(history_df):
+    """(Date, Ticker, Price, Volume, OI) history of VIX options -> chain dict of axis + cube arrays."""
+    from vix_spread_registry import parse_option_ticker
+
+    parsed = {tk: parse_option_ticker(tk) for tk in history_df["Ticker"].unique()}
+    df = history_df[history_df["Ticker"].map(parsed).notna()]
+    keys = df["Ticker"].map(parsed)
+    expiry = pd.to_datetime(keys.str[0]).to_numpy().astype("datetime64[D]")
+    right = keys.str[1].to_numpy()
+    strike = keys.str[2].to_numpy(dtype=np.float64)
+    date = pd.to_datetime(df["Date"]).to_numpy().astype("datetime64[D]")
+
+    expiries, e_idx = np.unique(expiry, return_inverse=True)
+    strikes, k_idx = np.unique(strike, return_inverse=True)
+    dates, d_idx = np.unique(date, return_inverse=True)
+    chain = {"expiries": expiries, "strikes": strikes, "dates": dates}
+    for r in CHAIN_RIGHTS:
+        rows = right == r
+        for f in CHAIN_FIELDS:
+            cube = np.full((len(expiries), len(strikes), len(dates)), np.nan, dtype=np.float32)
+            if f in df.columns:
+                cube[e_idx[rows], k_idx[rows], d_idx[rows]] = df[f].to_numpy(dtype=np.float32)[rows]
+            chain[f"{r}_{f}"] = cube
+    return chain
+
+
+def chain_to_history(chain):
+    """Inverse of history_to_chain (only cells with a Price), for merging runs."""
+    from vix_spread_registry import option_ticker
+
+    frames = []
+    for r in CHAIN_RIGHTS:
+        e, k, d = np.nonzero(~np.isnan(chain[f"{r}_Price"]))
+        if not len(e):
+            continue
+        out = {"Date": chain["dates"][d]}
+        expiries = chain["expiries"].astype(object)
+        out["Ticker"] = [option_ticker(expiries[i], chain["strikes"][j], r) for i, j in zip(e, k)]
+        for f in CHAIN_FIELDS:
+            out[f] = chain[f"{r}_{f}"][e, k, d].astype(np.float64)
+        frames.append(pd.DataFrame(out))
+    if not frames:
+        return pd.DataFrame(columns=["Date", "Ticker"] + CHAIN_FIELDS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_chain(existing, history_df):
+    """Existing chain + newly fetched history; new rows win on (Date, Ticker)."""
+    if existing is not None:
+        history_df = pd.concat([chain_to_history(existing), history_df], ignore_index=True)
+    history_df = history_df.assign(Date=pd.to_datetime(history_df["Date"]))
+    return history_to_chain(history_df.drop_duplicates(subset=["Date", "Ticker"], keep="last"))
+
+
+def write_chain(chain, path=CHAIN_STORE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:  # File object - np.savez would append ".npz" to a str path
+        np.savez_compressed(f, **chain)
+    os.replace(tmp, path)
+
+
+def read_chain(path=CHAIN_STORE_PATH):
+    """Chain dict from the store, or None if there isn't one yet."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as npz:
+        return {k: npz[k] for k in npz.files}
+
+
+def _expiry_index(chain, expiry):
+    hits = np.nonzero(chain["expiries"] == np.datetime64(pd.Timestamp(expiry).date(), "D"))[0]
+    return int(hits[0]) if len(hits) else None
+
+
+def chain_strikes(chain, expiry, right="C"):
+    """Strikes of `expiry` with at least one stored price."""
+    e = _expiry_index(chain, expiry)
+    if e is None:
+        return []
+    has_price = ~np.isnan(chain[f"{right}_Price"][e]).all(axis=1)
+    return chain["strikes"][has_price].tolist()
+
+
+def chain_vertical(chain, expiry, long_strike, short_strike, right="C", field="Price"):
+    """Daily long - short value of a vertical from the chain (NaN where either leg is missing)."""
+    e = _expiry_index(chain, expiry)
+    strikes = chain["strikes"]
+    if e is None or long_strike not in strikes or short_strike not in strikes:
+        return pd.Series(dtype=np.float64)
+    cube = chain[f"{right}_{field}"][e]
+    values = cube[np.searchsorted(strikes, long_strike)] - cube[np.searchsorted(strikes, short_strike)]
+    return pd.Series(values.astype(np.float64), index=pd.DatetimeIndex(chain["dates"], name="Date"))